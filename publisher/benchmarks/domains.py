@@ -0,0 +1,68 @@
+"""
+`get_content_type` before and after the suffix trie classifier:
+
+    python -m benchmarks.domains --urls 100000 --unique 1000
+"""
+
+import argparse
+import random
+import timeit
+from urllib.parse import urlparse
+
+from services.entries import ContentType
+from utils.domains import classifier, classify_many, get_content_type
+
+
+HOSTS = (
+    "www.youtube.com",
+    "m.youtube.com",
+    "youtu.be",
+    "vt.tiktok.com",
+    "vk.com",
+    "clips.twitch.tv",
+    "example.com",
+)
+
+
+def legacy_get_content_type(url: str) -> ContentType | None:
+    domain_map = {
+        "www.youtube.com": ContentType.YOUTUBE,
+        "youtu.be": ContentType.YOUTUBE,
+        "tiktok.com": ContentType.TIKTOK,
+        "www.tiktok.com": ContentType.TIKTOK,
+        "vt.tiktok.com": ContentType.TIKTOK,
+        "vk.com": ContentType.VK,
+        "www.vk.com": ContentType.VK,
+        "twitch.tv": ContentType.TWITCH,
+        "www.twitch.tv": ContentType.TWITCH,
+        "clips.twitch.tv": ContentType.TWITCH,
+    }
+    parsed_url = urlparse(url)
+    return domain_map.get(parsed_url.netloc, None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--urls", type=int, default=100_000)
+    parser.add_argument("--unique", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    unique = [
+        f"https://{random.choice(HOSTS)}/watch?v={i}" for i in range(args.unique)
+    ]
+    urls = [random.choice(unique) for _ in range(args.urls)]
+
+    cases = {
+        "legacy": lambda: [legacy_get_content_type(url) for url in urls],
+        "trie, no cache": lambda: [classifier.classify(url) for url in urls],
+        "trie + lru": lambda: [get_content_type(url) for url in urls],
+        "classify_many": lambda: classify_many(urls),
+    }
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=args.repeat))
+        print(f"{name:>16}: {best / args.urls * 1e9:8.0f} ns/url")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+gRPC server throughput per core with and without the ThreadPoolExecutor.
+
+Each configuration starts a server in a subprocess with a servicer that
+returns a fixed selection page, so the numbers show the cost of the
+server itself and not of the database:
+
+    python -m benchmarks.grpc_load --duration 10 --concurrency 64
+
+Throughput per core is requests divided by the CPU seconds the server
+process used during the run (read from /proc, Linux only).
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from concurrent import futures
+
+import grpc
+
+from protobufs.compiled import publisher_pb2_grpc
+from protobufs.compiled.publisher_pb2 import (
+    PaginationRequest,
+    PublicationResponse,
+    PublicationsSelectionResponse,
+)
+
+
+CONFIGURATIONS = {
+    "before: executor": ["--executor-workers", "10"],
+    "after: no executor": [],
+    "after: no executor, gzip": ["--gzip"],
+    "after: no executor, uvloop": ["--uvloop"],
+}
+
+
+class Servicer(publisher_pb2_grpc.PublisherServicer):
+    def __init__(self, size: int, gzip: bool) -> None:
+        self.gzip = gzip
+        self.response = PublicationsSelectionResponse(
+            items=[
+                PublicationResponse(
+                    id=i,
+                    url=f"https://www.youtube.com/watch?v={i:011d}",
+                    type="YOUTUBE",
+                    believed_count=i,
+                    disbelieved_count=i,
+                    created_at="2024-01-01 00:00:00+00:00",
+                    believed=True,
+                )
+                for i in range(size)
+            ],
+            total=size,
+            page=1,
+            size=size,
+            pages=1,
+        )
+
+    async def publications_selection(self, request, context):
+        if self.gzip:
+            context.set_compression(grpc.Compression.Gzip)
+        return self.response
+
+
+async def serve(args: argparse.Namespace) -> None:
+    executor = (
+        futures.ThreadPoolExecutor(max_workers=args.executor_workers)
+        if args.executor_workers
+        else None
+    )
+    server = grpc.aio.server(
+        executor, options=[("grpc.so_reuseport", int(args.reuse_port))]
+    )
+    publisher_pb2_grpc.add_PublisherServicer_to_server(
+        Servicer(args.size, args.gzip), server
+    )
+    server.add_insecure_port(f"127.0.0.1:{args.port}")
+    await server.start()
+    await server.wait_for_termination()
+
+
+async def load(port: int, duration: float, concurrency: int) -> int:
+    async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+        stub = publisher_pb2_grpc.PublisherStub(channel)
+        await channel.channel_ready()
+        deadline = time.perf_counter() + duration
+        completed = 0
+
+        async def worker():
+            nonlocal completed
+            while time.perf_counter() < deadline:
+                await stub.publications_selection(PaginationRequest(size=20))
+                completed += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return completed
+
+
+def _cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def run(args: argparse.Namespace) -> None:
+    for name, options in CONFIGURATIONS.items():
+        if "--uvloop" in options:
+            try:
+                import uvloop  # noqa: F401
+            except ImportError:
+                print(f"{name:>28}: skipped, uvloop is not installed")
+                continue
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.grpc_load",
+                "--serve",
+                "--port",
+                str(args.port),
+                "--size",
+                str(args.size),
+                *options,
+            ]
+        )
+        try:
+            asyncio.run(load(args.port, 1, args.concurrency))  # warm up
+            cpu = _cpu_seconds(server.pid)
+            requests = asyncio.run(load(args.port, args.duration, args.concurrency))
+            cpu = _cpu_seconds(server.pid) - cpu
+        finally:
+            server.terminate()
+            server.wait()
+        print(
+            f"{name:>28}: {requests / args.duration:9.0f} rps, "
+            f"{requests / cpu:9.0f} requests per CPU second"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=50777)
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--executor-workers", type=int, default=0)
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--uvloop", action="store_true")
+    parser.add_argument("--reuse-port", action="store_true")
+    args = parser.parse_args()
+
+    if not args.serve:
+        run(args)
+        return
+    if args.uvloop:
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Throughput of 1..N server processes sharing one port with SO_REUSEPORT,
+the way `GRPCSupervisor` runs workers:
+
+    python -m benchmarks.grpc_scaling --workers 4 --clients 4 --duration 10
+
+Servers are the stub from `benchmarks.grpc_load`, so the database is not
+involved. The load is generated by `--clients` processes, each with its
+own channel, so that the kernel spreads connections across the servers.
+Run it on a machine with at least 2 * N cores to keep the clients from
+competing with the servers.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import subprocess
+import sys
+import time
+
+from benchmarks.grpc_load import load
+
+
+def _client(port: int, duration: float, concurrency: int) -> int:
+    return asyncio.run(load(port, duration, concurrency))
+
+
+def _start_servers(workers: int, port: int) -> list:
+    return [
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.grpc_load",
+                "--serve",
+                "--reuse-port",
+                "--port",
+                str(port),
+            ]
+        )
+        for _ in range(workers)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--clients", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=50778)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    baseline = None
+    for workers in range(1, args.workers + 1):
+        servers = _start_servers(workers, args.port)
+        try:
+            time.sleep(1)
+            with context.Pool(args.clients) as pool:
+                requests = sum(
+                    pool.starmap(
+                        _client,
+                        [(args.port, args.duration, args.concurrency)] * args.clients,
+                    )
+                )
+        finally:
+            for server in servers:
+                server.terminate()
+            for server in servers:
+                server.wait()
+        rps = requests / args.duration
+        baseline = baseline or rps
+        print(
+            f"{workers:>3} workers: {rps:9.0f} rps, "
+            f"{rps / baseline:5.2f}x, {rps / baseline / workers:5.0%} efficiency"
+        )
+
+
+if __name__ == "__main__":
+    main()
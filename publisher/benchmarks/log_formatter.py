@@ -0,0 +1,66 @@
+"""
+Records per second of JSONLogFormatter and FastJSONLogFormatter:
+
+    python -m benchmarks.log_formatter --records 20000
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+from utils import logging as log_utils
+from utils.logging import FastJSONLogFormatter, JSONLogFormatter
+
+
+def _records(count: int, errors: bool) -> list:
+    exc_info = None
+    if errors:
+        try:
+            raise ValueError("benchmark")
+        except ValueError:
+            exc_info = sys.exc_info()
+    records = []
+    for i in range(count):
+        record = logging.LogRecord(
+            "grpc", logging.ERROR, __file__, 1, "request %s failed", (i,), exc_info
+        )
+        record.duration = i
+        record.request_json_fields = {
+            "request_body": {"password": "secret", "url": "https://youtu.be/x"}
+        }
+        records.append(record)
+    return records
+
+
+def _rate(formatter: logging.Formatter, records: list) -> float:
+    start = time.perf_counter()
+    for record in records:
+        formatter.format(record)
+    return len(records) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=20_000)
+    args = parser.parse_args()
+
+    orjson = log_utils.orjson
+    cases = {
+        "JSONLogFormatter": (JSONLogFormatter(), orjson),
+        "Fast, json": (FastJSONLogFormatter(), None),
+        "Fast, orjson": (FastJSONLogFormatter(), orjson),
+    }
+    for errors in (False, True):
+        print("with tracebacks:" if errors else "without tracebacks:")
+        records = _records(args.records, errors)
+        for name, (formatter, serializer) in cases.items():
+            if name.endswith("orjson") and serializer is None:
+                continue
+            log_utils.orjson = serializer
+            print(f"{name:>20}: {_rate(formatter, records):10.0f} records/s")
+    log_utils.orjson = orjson
+
+
+if __name__ == "__main__":
+    main()
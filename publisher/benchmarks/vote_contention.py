@@ -0,0 +1,107 @@
+"""
+Contention benchmark for votes on a single hot publication.
+
+Every worker casts votes from its own users on the same publication,
+first with counters updated in the vote statement, then through
+`VoteCounterBuffer`. Uses `DATABASE_URL`, so run it against a disposable
+database with migrations applied:
+
+    python -m benchmarks.vote_contention --workers 32 --votes 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from config import settings
+from config.db import Database
+from models.publication import Publication
+from services.entries import ContentType
+from services.publications.entries import CreatePublicationData
+from services.repo import IVoteRepo
+from repo import BufferedVoteRepo, PublicationRepo, VoteCounterBuffer, VoteRepo
+from utils.cache import CachedValue
+
+
+async def _create_publication(db: Database) -> int:
+    async with db.session() as session:
+        publication = await PublicationRepo(counter=CachedValue(ttl=0)).create(
+            session,
+            user_id=0,
+            entry=CreatePublicationData(
+                url="https://www.youtube.com/watch?v=benchmark",
+                type=ContentType.YOUTUBE,
+                canonical_id=str(uuid4()),
+            ),
+        )
+        return publication.id
+
+
+async def _worker(
+    db: Database,
+    repo: IVoteRepo,
+    publication_id: int,
+    first_user_id: int,
+    votes: int,
+    latencies: List[float],
+) -> None:
+    for user_id in range(first_user_id, first_user_id + votes):
+        started = time.perf_counter()
+        async with db.session() as session:
+            await repo.upsert(session, user_id, publication_id, user_id % 3 != 0)
+        latencies.append(time.perf_counter() - started)
+
+
+async def _run(db: Database, repo: IVoteRepo, workers: int, votes: int) -> None:
+    publication_id = await _create_publication(db)
+    latencies: List[float] = []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _worker(db, repo, publication_id, worker * votes + 1, votes, latencies)
+            for worker in range(workers)
+        )
+    )
+    if isinstance(repo, BufferedVoteRepo):
+        await repo.buffer.close()
+    elapsed = time.perf_counter() - started
+
+    async with db.session() as session:
+        publication = (
+            await session.execute(
+                select(Publication).filter(Publication.id == publication_id)
+            )
+        ).scalar_one()
+        counted = publication.believed_count + publication.disbelieved_count
+
+    latencies.sort()
+    print(
+        f"{type(repo).__name__:>16}: {len(latencies) / elapsed:8.1f} votes/s, "
+        f"p50 {statistics.median(latencies) * 1000:7.2f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:7.2f} ms, "
+        f"counted {counted}/{len(latencies)}"
+    )
+
+
+async def main(workers: int, votes: int) -> None:
+    db = Database(settings.DATABASE_URL)
+    await _run(db, VoteRepo(), workers, votes)
+    buffer = VoteCounterBuffer(
+        db,
+        flush_interval=settings.VOTE_BUFFER_FLUSH_INTERVAL,
+        max_events=settings.VOTE_BUFFER_MAX_EVENTS,
+    )
+    await _run(db, BufferedVoteRepo(buffer=buffer), workers, votes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--votes", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.votes))
@@ -0,0 +1,167 @@
+"""
+Query plans and latencies of the vote lookup, the OFFSET selection
+and the keyset (cursor) selection pages without and with the indexes
+from migration 3f9a6d2e8c17.
+
+Seeds `--publications` x `--users` votes (10M by default) into the
+database from `DATABASE_URL`, so run it against a disposable database
+with migrations applied:
+
+    python -m benchmarks.vote_indexes --publications 100000 --users 100
+
+"Before" numbers are taken inside a transaction that drops the indexes
+and is rolled back afterwards.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+from typing import Dict, Tuple
+
+from sqlalchemy import Select, text, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from config import settings
+from repo import PublicationRepo
+from utils.cache import CachedValue
+
+
+INDEXES = (
+    "ix_publisher_vote_publication_id_user_id",
+    "ix_publisher_vote_user_id",
+    "ix_publisher_publication_created_at_id",
+)
+SEED_URL = "https://www.youtube.com/watch?v=index-benchmark"
+
+
+DEEP_PAGE = 500
+PAGE_SIZE = 20
+
+
+def _sql(query: Select) -> str:
+    return str(
+        query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def _queries(
+    publication_id: int, user_id: int, key: Tuple[datetime, int]
+) -> Dict[str, str]:
+    # `key` is the last row before page DEEP_PAGE, as stored in its cursor
+    repo = PublicationRepo(counter=CachedValue(ttl=0))
+    selection = (
+        repo._selection_query(user_id).limit(PAGE_SIZE).offset(PAGE_SIZE * DEEP_PAGE)
+    )
+
+    def keyset(user_id: int | None, segment: int) -> str:
+        return _sql(
+            repo._segments(user_id)[segment]
+            .filter(tuple_(repo.model.created_at, repo.model.id) < tuple_(*key))
+            .limit(PAGE_SIZE + 1)
+        )
+
+    return {
+        "vote lookup": (
+            "SELECT * FROM publisher_vote "
+            f"WHERE publication_id = {publication_id} AND user_id = {user_id}"
+        ),
+        "user votes": (
+            "SELECT publication_id, believed FROM publisher_vote "
+            f"WHERE user_id = {user_id}"
+        ),
+        f"selection page {DEEP_PAGE}": _sql(selection),
+        f"keyset page {DEEP_PAGE}, anonymous": keyset(None, 0),
+        f"keyset page {DEEP_PAGE}, voter, unvoted segment": keyset(user_id, 0),
+        f"keyset page {DEEP_PAGE}, voter, believed segment": keyset(user_id, 1),
+        f"keyset page {DEEP_PAGE}, voter, disbelieved segment": keyset(user_id, 2),
+    }
+
+
+async def _deep_key(conn: AsyncConnection) -> Tuple[datetime, int]:
+    result = await conn.execute(
+        text(
+            "SELECT created_at, id FROM publisher_publication "
+            "ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET :offset"
+        ),
+        {"offset": PAGE_SIZE * DEEP_PAGE - 1},
+    )
+    return tuple(result.one())
+
+
+async def _seed(conn: AsyncConnection, publications: int, users: int) -> int:
+    seeded = (
+        await conn.execute(
+            text("SELECT MIN(id) FROM publisher_publication WHERE url = :url"),
+            {"url": SEED_URL},
+        )
+    ).scalar_one()
+    if seeded is not None:
+        return seeded
+
+    print(f"Seeding {publications} publications and {publications * users} votes...")
+    await conn.execute(
+        text(
+            "INSERT INTO publisher_publication "
+            "(user_id, url, type, believed_count, disbelieved_count, created_at) "
+            "SELECT 0, :url, 'YOUTUBE', 0, 0, now() - n * interval '1 second' "
+            "FROM generate_series(1, :publications) AS n"
+        ),
+        {"url": SEED_URL, "publications": publications},
+    )
+    await conn.execute(
+        text(
+            "INSERT INTO publisher_vote (publication_id, user_id, believed) "
+            "SELECT p.id, u, random() < 0.5 "
+            "FROM publisher_publication AS p "
+            "CROSS JOIN generate_series(1, :users) AS u "
+            "WHERE p.url = :url"
+        ),
+        {"url": SEED_URL, "users": users},
+    )
+    await conn.execute(text("ANALYZE publisher_publication"))
+    await conn.execute(text("ANALYZE publisher_vote"))
+    return await _seed(conn, publications, users)
+
+
+async def _measure(conn: AsyncConnection, label: str, queries: Dict[str, str]) -> None:
+    print(f"===== {label} =====")
+    for name, query in queries.items():
+        plan = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {query}"))
+        latencies = []
+        for _ in range(20):
+            started = time.perf_counter()
+            await conn.execute(text(query))
+            latencies.append(time.perf_counter() - started)
+        print(f"--- {name}: p50 {statistics.median(latencies) * 1000:.2f} ms")
+        print("\n".join(row[0] for row in plan))
+
+
+async def main(publications: int, users: int) -> None:
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as conn:
+        publication_id = await _seed(conn, publications, users)
+        key = await _deep_key(conn)
+        await conn.commit()
+        queries = _queries(publication_id + publications // 2, users // 2, key)
+
+        transaction = await conn.begin()
+        for index in INDEXES:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+        await _measure(conn, "without indexes", queries)
+        await transaction.rollback()
+
+        await _measure(conn, "with indexes", queries)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--publications", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.publications, args.users))
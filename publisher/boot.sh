@@ -1,4 +1,13 @@
 #!/bin/sh
+set -e
 
 alembic upgrade head
-watchmedo auto-restart --recursive --pattern="*.py" --directory="${DEFAULT_SERVICE_DIR}" python -- -m main
+
+if [ "${DEBUG:-0}" = "1" ]; then
+    # Development: restart the server on code changes
+    exec watchmedo auto-restart --recursive --pattern="*.py" --directory="${DEFAULT_SERVICE_DIR}" python -- -m main
+fi
+
+# Production: the server replaces the shell and receives SIGTERM directly,
+# so it can drain in-flight RPCs before the container stops
+exec python -m main
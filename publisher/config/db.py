@@ -1,9 +1,12 @@
 import logging
 import asyncio
+import time
 from contextlib import asynccontextmanager, AbstractAsyncContextManager
-from typing import Callable
+from typing import Callable, Dict, Hashable, Sequence
+from uuid import uuid4
 
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     create_async_engine,
     async_sessionmaker,
@@ -14,14 +17,122 @@ from sqlalchemy.orm import (
 )
 from sqlalchemy.exc import SQLAlchemyError
 
+from utils.metrics import Gauge
+from utils.tracing import QueryTracer, SessionTracer
+
 
 logger = logging.getLogger("orm")
 Base = declarative_base()
 
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+RECENT_WRITES_PRUNE_SIZE = 10_000
+
+pool_size_gauge = Gauge(
+    "db_pool_size", "Connections kept open by the pool.", ["database"]
+)
+pool_checked_out_gauge = Gauge(
+    "db_pool_checked_out", "Connections currently in use.", ["database"]
+)
+pool_overflow_gauge = Gauge(
+    "db_pool_overflow", "Connections opened above pool_size.", ["database"]
+)
+pool_saturation_gauge = Gauge(
+    "db_pool_saturation",
+    "Connections in use divided by pool_size + max_overflow.",
+    ["database"],
+)
+
+
+class _Node:
+    """Движок БД и фабрика read-only сессий к нему"""
+
+    __slots__ = ("name", "engine", "readonly_session_factory")
+
+    def __init__(self, name: str, engine: AsyncEngine) -> None:
+        self.name = name
+        self.engine = engine
+        # No BEGIN/COMMIT round trips for sessions that only read
+        self.readonly_session_factory = async_sessionmaker(
+            class_=AsyncSession,
+            autocommit=False,
+            autoflush=False,
+            bind=engine.execution_options(isolation_level="AUTOCOMMIT"),
+        )
+
 
 class Database:
-    def __init__(self, db_url: str) -> None:
-        self._engine = create_async_engine(db_url, future=True, echo=True)
+    def __init__(
+        self,
+        db_url: str,
+        *,
+        replica_urls: Sequence[str] = (),
+        replica_strategy: str = ROUND_ROBIN,
+        read_your_writes_window: float = 0,
+        echo: bool = False,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        pool_pre_ping: bool = False,
+        pool_recycle: int = -1,
+        statement_cache_size: int = 100,
+        prepared_statement_cache_size: int = 100,
+        unique_prepared_statement_names: bool = False,
+        trace_sessions: bool = False,
+        slow_query_threshold: float = 0.5,
+    ) -> None:
+        """
+        `statement_cache_size` - кеш подготовленных запросов asyncpg,
+        `prepared_statement_cache_size` - кеш SQLAlchemy поверх него.
+        За pgbouncer в режиме транзакций оба кеша нужно выключить (0)
+        и включить `unique_prepared_statement_names`.
+
+        Запросы дольше `slow_query_threshold` секунд пишутся в лог.
+
+        Read-only сессии распределяются по `replica_urls` стратегией
+        `replica_strategy` (`round_robin` или `least_connections`).
+        Пользователь, который записывал данные в последние
+        `read_your_writes_window` секунд, читает с основной БД.
+        Записи запоминаются только в этом процессе и только
+        для сессий с `key`, пакетные запросы без пользователя
+        окно не открывают.
+        """
+        assert replica_strategy in (
+            ROUND_ROBIN,
+            LEAST_CONNECTIONS,
+        ), f"Unknown replica strategy {replica_strategy}."
+        connect_args = {
+            "statement_cache_size": statement_cache_size,
+            "prepared_statement_cache_size": prepared_statement_cache_size,
+        }
+        if unique_prepared_statement_names:
+            connect_args["prepared_statement_name_func"] = (
+                lambda: f"__asyncpg_{uuid4()}__"
+            )
+        engine_options = {
+            "future": True,
+            "echo": echo,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": pool_timeout,
+            "pool_pre_ping": pool_pre_ping,
+            "pool_recycle": pool_recycle,
+            "connect_args": connect_args,
+        }
+        self.max_connections = pool_size + max_overflow
+        self.replica_strategy = replica_strategy
+        self.read_your_writes_window = read_your_writes_window
+        self._query_tracer = QueryTracer(logger, slow_query_threshold)
+
+        self._primary = self._create_node("primary", db_url, engine_options)
+        self._replicas = [
+            self._create_node(f"replica-{i}", url, engine_options)
+            for i, url in enumerate(replica_urls)
+        ]
+        self._next_replica = 0
+        self._recent_writes: Dict[Hashable, float] = {}
+        self._engine = self._primary.engine
+        self._tracer = SessionTracer(logger, enabled=trace_sessions)
         self._session_factory = async_scoped_session(
             async_sessionmaker(
                 class_=AsyncSession,
@@ -35,31 +146,135 @@ class Database:
     def create_database(self) -> None:
         Base.metadata.create_all(self._engine)
 
+    async def warm_up(self, connections: int) -> None:
+        """Открытие соединений пулов заранее, до первых запросов"""
+        await asyncio.gather(
+            *(
+                self._warm_up_engine(node.engine, connections)
+                for node in (self._primary, *self._replicas)
+            )
+        )
+
+    def pool_status(self) -> Dict[str, dict]:
+        return {
+            node.name: self._pool_status(node.engine)
+            for node in (self._primary, *self._replicas)
+        }
+
+    def note_write(self, key: Hashable) -> None:
+        """Чтения по `key` идут в основную БД в течение окна read-your-writes"""
+        if not self._replicas or self.read_your_writes_window <= 0:
+            return
+        now = time.monotonic()
+        if len(self._recent_writes) > RECENT_WRITES_PRUNE_SIZE:
+            self._recent_writes = {
+                k: until for k, until in self._recent_writes.items() if until > now
+            }
+        self._recent_writes[key] = now + self.read_your_writes_window
+
     @asynccontextmanager
-    async def session(self) -> Callable[..., AbstractAsyncContextManager[AsyncSession]]:
+    async def session(
+        self, readonly: bool = False, key: Hashable | None = None
+    ) -> Callable[..., AbstractAsyncContextManager[AsyncSession]]:
+        if readonly:
+            async with self._readonly_session(self._select_node(key)) as session:
+                yield session
+            return
+
         session: AsyncSession = self._session_factory()
+        trace = self._tracer.start(session, self._primary.name)
         try:
-            print("YIELDING...")
             yield session
         except Exception as e:
-            print("ROLLBACKING... ")
+            trace.mark("work")
             await session.rollback()
-            print("ERROR... ", str(e))
+            trace.mark("rollback")
             logger.error(
                 f"Session rollback because of exception - {str(e)}", exc_info=e
             )
             raise
         else:
-            print("COMMITTING... ")
+            trace.mark("work")
             try:
                 await session.commit()
+                trace.mark("commit")
             except SQLAlchemyError as e:
-                print("ERROR COMMITTING...", str(e))
                 await session.rollback()
+                trace.mark("rollback")
                 logger.error(
                     f"Session rollback because of exception on commit - {str(e)}",
                     exc_info=e,
                 )
+            else:
+                if key is not None:
+                    self.note_write(key)
+        finally:
+            await session.close()
+            trace.mark("close")
+            trace.finish()
+
+    @asynccontextmanager
+    async def _readonly_session(
+        self, node: _Node
+    ) -> AbstractAsyncContextManager[AsyncSession]:
+        """
+        Сессия в режиме autocommit: каждый запрос выполняется отдельно,
+        без открытия транзакции и без COMMIT при завершении.
+        """
+        session: AsyncSession = node.readonly_session_factory()
+        trace = self._tracer.start(session, node.name)
+        try:
+            yield session
+            trace.mark("work")
         finally:
-            print("CLOSING... ")
             await session.close()
+            trace.mark("close")
+            trace.finish()
+
+    def _select_node(self, key: Hashable | None) -> _Node:
+        if not self._replicas:
+            return self._primary
+        if key is not None and key in self._recent_writes:
+            if self._recent_writes[key] > time.monotonic():
+                return self._primary
+            del self._recent_writes[key]
+
+        if self.replica_strategy == LEAST_CONNECTIONS:
+            return min(self._replicas, key=lambda node: node.engine.pool.checkedout())
+        node = self._replicas[self._next_replica % len(self._replicas)]
+        self._next_replica += 1
+        return node
+
+    def _create_node(self, name: str, db_url: str, engine_options: dict) -> _Node:
+        node = _Node(name, create_async_engine(db_url, **engine_options))
+        self._query_tracer.instrument(node.engine, name)
+        self._init_pool_metrics(node)
+        return node
+
+    async def _warm_up_engine(self, engine: AsyncEngine, connections: int) -> None:
+        connections = min(connections, engine.pool.size())
+        opened = await asyncio.gather(*(engine.connect() for _ in range(connections)))
+        for connection in opened:
+            await connection.close()
+
+    def _pool_status(self, engine: AsyncEngine) -> dict:
+        pool = engine.pool
+        checked_out = pool.checkedout()
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": checked_out,
+            "overflow": max(pool.overflow(), 0),
+            "saturation": checked_out / self.max_connections,
+        }
+
+    def _init_pool_metrics(self, node: _Node) -> None:
+        pool = node.engine.pool
+        pool_size_gauge.set_function(pool.size, database=node.name)
+        pool_checked_out_gauge.set_function(pool.checkedout, database=node.name)
+        pool_overflow_gauge.set_function(
+            lambda: max(pool.overflow(), 0), database=node.name
+        )
+        pool_saturation_gauge.set_function(
+            lambda: pool.checkedout() / self.max_connections, database=node.name
+        )
@@ -9,7 +9,15 @@ from config.grpc import GRPCConnection
 
 from services.publications import CreatePublication
 from services.votes import Vote
-from repo import PublicationRepo, VoteRepo
+from repo import (
+    PublicationRepo,
+    VoteRepo,
+    BufferedVoteRepo,
+    VoteCounterBuffer,
+    CachedPublicationRepo,
+    SelectionCache,
+)
+from utils.cache import CachedValue, MemoryCache, RedisCache
 
 
 class Container(containers.DeclarativeContainer):
@@ -27,10 +35,65 @@ class Container(containers.DeclarativeContainer):
     )
     auth_grpc = providers.Singleton(AuthStub, connection=_auth_grpc)
 
-    db = providers.Resource(Database, db_url=settings.DATABASE_URL)
+    db = providers.Resource(
+        Database,
+        db_url=settings.DATABASE_URL,
+        replica_urls=settings.DATABASE_REPLICA_URLS,
+        replica_strategy=settings.DB_REPLICA_STRATEGY,
+        read_your_writes_window=settings.DB_READ_YOUR_WRITES_WINDOW,
+        echo=settings.DB_ECHO,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+        prepared_statement_cache_size=settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        unique_prepared_statement_names=settings.DB_UNIQUE_PREPARED_STATEMENT_NAMES,
+        trace_sessions=settings.DB_SESSION_TRACING,
+        slow_query_threshold=settings.DB_SLOW_QUERY_THRESHOLD,
+    )
+
+    selection_cache_backend = (
+        providers.Singleton(RedisCache, url=settings.SELECTION_CACHE_REDIS_URL)
+        if settings.SELECTION_CACHE_BACKEND == "redis"
+        else providers.Singleton(MemoryCache, max_size=settings.SELECTION_CACHE_SIZE)
+    )
+    _selection_cache = (
+        providers.Singleton(
+            SelectionCache,
+            backend=selection_cache_backend,
+            ttl=settings.SELECTION_CACHE_TTL,
+        )
+        if settings.SELECTION_CACHE_ENABLED
+        else providers.Object(None)
+    )
 
-    publication_repo = providers.Singleton(PublicationRepo)
-    _vote_repo = providers.Singleton(VoteRepo)
+    _publication_counter = providers.Singleton(
+        CachedValue, ttl=settings.PUBLICATION_COUNT_CACHE_TTL
+    )
+    publication_repo = (
+        providers.Singleton(
+            CachedPublicationRepo,
+            counter=_publication_counter,
+            cache=_selection_cache,
+        )
+        if settings.SELECTION_CACHE_ENABLED
+        else providers.Singleton(PublicationRepo, counter=_publication_counter)
+    )
+    vote_counter_buffer = providers.Singleton(
+        VoteCounterBuffer,
+        db=db,
+        flush_interval=settings.VOTE_BUFFER_FLUSH_INTERVAL,
+        max_events=settings.VOTE_BUFFER_MAX_EVENTS,
+    )
+    _vote_repo = (
+        providers.Singleton(
+            BufferedVoteRepo, buffer=vote_counter_buffer, cache=_selection_cache
+        )
+        if settings.VOTE_BUFFER_ENABLED
+        else providers.Singleton(VoteRepo, cache=_selection_cache)
+    )
 
     create_publication = providers.Singleton(CreatePublication, repo=publication_repo)
     create_vote = providers.Singleton(
@@ -1,21 +1,55 @@
 import gettext
+from contextvars import ContextVar, Token
+from typing import Dict
 
 
 DEFAULT_LANGUAGE = "en"
 SUPPORTED_LANGUAGES = ["en", "ru"]
 DOMAIN = "base"
 LOCALE_DIR = "locale"
-_lang = DEFAULT_LANGUAGE
 
+# Язык текущего запроса: у каждой задачи event loop свое значение
+_language: ContextVar[str] = ContextVar("language", default=DEFAULT_LANGUAGE)
+_catalogs: Dict[str, gettext.NullTranslations] = {}
 
-def activate_translation(lang: str):
-    global _lang
-    _lang = DEFAULT_LANGUAGE if lang not in SUPPORTED_LANGUAGES else lang
+
+def load_catalogs() -> None:
+    """Загрузка каталогов всех поддерживаемых языков, вызывается при старте"""
+    for lang in SUPPORTED_LANGUAGES:
+        if lang != DEFAULT_LANGUAGE and lang not in _catalogs:
+            _catalogs[lang] = _load_catalog(lang)
+
+
+def reload_catalogs() -> None:
+    """Повторное чтение .mo файлов, например после обновления переводов"""
+    _catalogs.update(
+        {
+            lang: _load_catalog(lang)
+            for lang in SUPPORTED_LANGUAGES
+            if lang != DEFAULT_LANGUAGE
+        }
+    )
+
+
+def activate_translation(lang: str) -> Token[str]:
+    return _language.set(DEFAULT_LANGUAGE if lang not in SUPPORTED_LANGUAGES else lang)
 
 
 def _(message: str) -> str:
-    if _lang == DEFAULT_LANGUAGE:
+    lang = _language.get()
+    if lang == DEFAULT_LANGUAGE:
         return message
-    return gettext.translation(DOMAIN, localedir=LOCALE_DIR, languages=[_lang]).gettext(
-        message
-    )
+    catalog = _catalogs.get(lang)
+    if catalog is None:
+        catalog = _catalogs[lang] = _load_catalog(lang)
+    return catalog.gettext(message)
+
+
+def _load_catalog(lang: str) -> gettext.NullTranslations:
+    # gettext.translation() keeps parsed files in a process-wide cache
+    # keyed by path, so it can not be used to reload a catalog.
+    mofile = gettext.find(DOMAIN, localedir=LOCALE_DIR, languages=[lang])
+    if mofile is None:
+        return gettext.NullTranslations()
+    with open(mofile, "rb") as fp:
+        return gettext.GNUTranslations(fp)
@@ -9,6 +9,48 @@ DB_NAME = os.environ.get("DB_NAME")
 DB_HOST = os.environ.get("DB_HOST")
 DB_PORT = os.environ.get("DB_PORT")
 DATABASE_URL = os.environ.get("DATABASE_URL")
+DATABASE_REPLICA_URLS = [
+    url for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if url
+]
+DB_REPLICA_STRATEGY = os.environ.get("DB_REPLICA_STRATEGY", "round_robin")
+DB_READ_YOUR_WRITES_WINDOW = float(os.environ.get("DB_READ_YOUR_WRITES_WINDOW", 5))
+DB_ECHO = bool(int(os.environ.get("DB_ECHO", 0)))
+# Пул у каждого воркера свой: DB_POOL_SIZE_TOTAL и DB_MAX_OVERFLOW_TOTAL,
+# если заданы, делятся между GRPC_WORKERS процессами
+GRPC_WORKERS = int(os.environ.get("GRPC_WORKERS", 1))
+DB_POOL_SIZE = (
+    max(int(os.environ.get("DB_POOL_SIZE_TOTAL", 0)) // GRPC_WORKERS, 1)
+    if "DB_POOL_SIZE_TOTAL" in os.environ
+    else int(os.environ.get("DB_POOL_SIZE", 10))
+)
+DB_MAX_OVERFLOW = (
+    int(os.environ.get("DB_MAX_OVERFLOW_TOTAL", 0)) // GRPC_WORKERS
+    if "DB_MAX_OVERFLOW_TOTAL" in os.environ
+    else int(os.environ.get("DB_MAX_OVERFLOW", 10))
+)
+# Окно read-your-writes хранится в памяти процесса, и следующий запрос
+# пользователя может попасть в другой воркер, а пакетные запросы без
+# пользователя окно не открывают вовсе, и пользователь не увидел бы
+# свою запись. Поэтому реплики с несколькими воркерами нужно задавать
+# с DB_READ_YOUR_WRITES_WINDOW=0, принимая отставание реплик.
+if DATABASE_REPLICA_URLS and GRPC_WORKERS > 1 and DB_READ_YOUR_WRITES_WINDOW > 0:
+    raise RuntimeError(
+        "DB_READ_YOUR_WRITES_WINDOW=0 is required with DATABASE_REPLICA_URLS "
+        "when GRPC_WORKERS > 1"
+    )
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+DB_POOL_PRE_PING = bool(int(os.environ.get("DB_POOL_PRE_PING", 1)))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_WARM_UP = int(os.environ.get("DB_POOL_WARM_UP", DB_POOL_SIZE))
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", 100))
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(
+    os.environ.get("DB_PREPARED_STATEMENT_CACHE_SIZE", 100)
+)
+DB_UNIQUE_PREPARED_STATEMENT_NAMES = bool(
+    int(os.environ.get("DB_UNIQUE_PREPARED_STATEMENT_NAMES", 0))
+)
+DB_SLOW_QUERY_THRESHOLD = float(os.environ.get("DB_SLOW_QUERY_THRESHOLD", 0.5))
+DB_SESSION_TRACING = bool(int(os.environ.get("DB_SESSION_TRACING", 0)))
 
 TEST_DB_USER = os.environ.get("TEST_DB_USER")
 TEST_DB_PASSWORD = os.environ.get("TEST_DB_PASSWORD")
@@ -22,9 +64,55 @@ AUTH_GRPC_PORT = os.environ.get("AUTH_GRPC_PORT")
 
 PUBLISHER_GRPC_SERVER_HOST = os.environ.get("PUBLISHER_GRPC_SERVER_HOST")
 PUBLISHER_GRPC_SERVER_PORT = os.environ.get("PUBLISHER_GRPC_SERVER_PORT")
+GRPC_SHUTDOWN_GRACE = float(os.environ.get("GRPC_SHUTDOWN_GRACE", 10))
+GRPC_MAXIMUM_CONCURRENT_RPCS = (
+    int(os.environ.get("GRPC_MAXIMUM_CONCURRENT_RPCS", 0)) or None
+)
+GRPC_KEEPALIVE_TIME_MS = int(os.environ.get("GRPC_KEEPALIVE_TIME_MS", 60000))
+GRPC_KEEPALIVE_TIMEOUT_MS = int(os.environ.get("GRPC_KEEPALIVE_TIMEOUT_MS", 20000))
+GRPC_KEEPALIVE_PERMIT_WITHOUT_CALLS = bool(
+    int(os.environ.get("GRPC_KEEPALIVE_PERMIT_WITHOUT_CALLS", 0))
+)
+GRPC_MIN_PING_INTERVAL_MS = int(os.environ.get("GRPC_MIN_PING_INTERVAL_MS", 30000))
+GRPC_MAX_RECEIVE_MESSAGE_LENGTH = int(
+    os.environ.get("GRPC_MAX_RECEIVE_MESSAGE_LENGTH", 4 * 1024 * 1024)
+)
+GRPC_MAX_SEND_MESSAGE_LENGTH = int(
+    os.environ.get("GRPC_MAX_SEND_MESSAGE_LENGTH", 4 * 1024 * 1024)
+)
+GRPC_SELECTION_COMPRESSION = bool(int(os.environ.get("GRPC_SELECTION_COMPRESSION", 1)))
+GRPC_UVLOOP = bool(int(os.environ.get("GRPC_UVLOOP", 0)))
+METRICS_HOST = os.environ.get("METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 0))
 
-PAGINATION_DEFAULT_PAGE_SIZE = os.environ.get("PAGINATION_DEFAULT_PAGE_SIZE", 20)
-PAGINATION_DEFAULT_PAGE = os.environ.get("PAGINATION_DEFAULT_PAGE", 1)
+PAGINATION_DEFAULT_PAGE_SIZE = int(os.environ.get("PAGINATION_DEFAULT_PAGE_SIZE", 20))
+PAGINATION_DEFAULT_PAGE = int(os.environ.get("PAGINATION_DEFAULT_PAGE", 1))
+PUBLICATION_COUNT_CACHE_TTL = int(os.environ.get("PUBLICATION_COUNT_CACHE_TTL", 60))
+PUBLICATION_BATCH_MAX_SIZE = int(os.environ.get("PUBLICATION_BATCH_MAX_SIZE", 1000))
+PUBLICATION_STREAM_BATCH_SIZE = int(
+    os.environ.get("PUBLICATION_STREAM_BATCH_SIZE", 1000)
+)
+
+# Кеш выборок публикаций: memory - в каждом процессе свой,
+# redis - общий для всех воркеров
+SELECTION_CACHE_ENABLED = bool(int(os.environ.get("SELECTION_CACHE_ENABLED", 0)))
+SELECTION_CACHE_BACKEND = os.environ.get("SELECTION_CACHE_BACKEND", "memory")
+SELECTION_CACHE_SIZE = int(os.environ.get("SELECTION_CACHE_SIZE", 10000))
+SELECTION_CACHE_TTL = float(os.environ.get("SELECTION_CACHE_TTL", 30))
+SELECTION_CACHE_REDIS_URL = os.environ.get(
+    "SELECTION_CACHE_REDIS_URL", "redis://localhost:6379/0"
+)
+# Поколение кеша в памяти сбрасывается только в процессе, который
+# записал публикацию или голос, остальные воркеры отдавали бы старые выборки
+if SELECTION_CACHE_ENABLED and SELECTION_CACHE_BACKEND != "redis" and GRPC_WORKERS > 1:
+    raise RuntimeError(
+        "SELECTION_CACHE_BACKEND=redis is required when GRPC_WORKERS > 1"
+    )
+
+VOTE_BUFFER_ENABLED = bool(int(os.environ.get("VOTE_BUFFER_ENABLED", 0)))
+VOTE_BUFFER_FLUSH_INTERVAL = float(os.environ.get("VOTE_BUFFER_FLUSH_INTERVAL", 0.2))
+VOTE_BUFFER_MAX_EVENTS = int(os.environ.get("VOTE_BUFFER_MAX_EVENTS", 1000))
+VOTE_BATCH_MAX_SIZE = int(os.environ.get("VOTE_BATCH_MAX_SIZE", 1000))
 
 APP_NAME = os.environ.get("PUBLISHER_APP_NAME")
 PORT = os.environ.get("PUBLISHER_PORT")
@@ -37,3 +125,7 @@ LOGGING_BACKUP_COUNT = int(os.environ.get("LOGGING_BACKUP_COUNT"))
 LOGGING_LOGGERS = os.environ.get("LOGGING_PUBLISHER_LOGGERS").split(",")
 LOGGING_SENSITIVE_FIELDS = os.environ.get("LOGGING_AUTH_SENSITIVE_FIELDS").split(",")
 LOG_PATH = os.environ.get("LOGGING_PUBLISHER_PATH")
+LOGGING_QUEUE_ENABLED = bool(int(os.environ.get("LOGGING_QUEUE_ENABLED", 1)))
+LOGGING_QUEUE_SIZE = int(os.environ.get("LOGGING_QUEUE_SIZE", 10000))
+LOGGING_QUEUE_OVERFLOW = os.environ.get("LOGGING_QUEUE_OVERFLOW", "drop-oldest")
+LOGGING_QUEUE_SAMPLE_RATE = int(os.environ.get("LOGGING_QUEUE_SAMPLE_RATE", 10))
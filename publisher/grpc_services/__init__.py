@@ -1 +1,2 @@
+from .interceptors import MetricsInterceptor
 from .publisher import GRPCPublisher
@@ -0,0 +1,107 @@
+import time
+from typing import Awaitable, Callable, Dict
+
+import grpc
+
+from utils.metrics import Counter, Gauge, Histogram
+
+
+OK = "ok"
+DETAIL = "detail"
+ERROR = "error"
+
+requests_counter = Counter(
+    "grpc_server_handled_total",
+    "RPCs completed by the server by outcome: ok, detail (error in the "
+    "response detail field) or error (exception).",
+    ["method", "outcome"],
+)
+in_flight_gauge = Gauge(
+    "grpc_server_in_flight", "RPCs currently being handled.", ["method"]
+)
+latency_histogram = Histogram(
+    "grpc_server_handling_seconds", "RPC handling latency.", ["method"]
+)
+
+
+class MetricsInterceptor(grpc.aio.ServerInterceptor):
+    """
+    Метрики unary-unary и unary-stream методов: количество вызовов
+    по результату, число выполняющихся вызовов и время обработки.
+    Для потоковых методов время считается до отправки последнего
+    сообщения, результат `detail` - если он есть в любом из сообщений.
+
+    Обертка над обработчиком метода создается один раз на метод.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: Dict[str, grpc.RpcMethodHandler] = {}
+
+    async def intercept_service(
+        self,
+        continuation: Callable[
+            [grpc.HandlerCallDetails], Awaitable[grpc.RpcMethodHandler]
+        ],
+        handler_call_details: grpc.HandlerCallDetails,
+    ) -> grpc.RpcMethodHandler:
+        method = handler_call_details.method
+        handler = self._handlers.get(method)
+        if handler is not None:
+            return handler
+
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return handler
+        name = method.rsplit("/", 1)[-1]
+        if handler.unary_unary is not None:
+            handler = grpc.unary_unary_rpc_method_handler(
+                self._instrument(name, handler.unary_unary),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        elif handler.unary_stream is not None:
+            handler = grpc.unary_stream_rpc_method_handler(
+                self._instrument_stream(name, handler.unary_stream),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        else:
+            return handler
+        self._handlers[method] = handler
+        return handler
+
+    @staticmethod
+    def _instrument(method: str, behavior: Callable) -> Callable:
+        async def wrapper(request, context):
+            in_flight_gauge.inc(method=method)
+            start = time.perf_counter()
+            outcome = ERROR
+            try:
+                response = await behavior(request, context)
+                outcome = DETAIL if getattr(response, "detail", None) else OK
+                return response
+            finally:
+                latency_histogram.observe(time.perf_counter() - start, method=method)
+                requests_counter.inc(method=method, outcome=outcome)
+                in_flight_gauge.dec(method=method)
+
+        return wrapper
+
+    @staticmethod
+    def _instrument_stream(method: str, behavior: Callable) -> Callable:
+        async def wrapper(request, context):
+            in_flight_gauge.inc(method=method)
+            start = time.perf_counter()
+            outcome = ERROR
+            detail = False
+            try:
+                async for response in behavior(request, context):
+                    detail = detail or bool(getattr(response, "detail", None))
+                    yield response
+                outcome = DETAIL if detail else OK
+            finally:
+                latency_histogram.observe(time.perf_counter() - start, method=method)
+                requests_counter.inc(method=method, outcome=outcome)
+                in_flight_gauge.dec(method=method)
+
+        return wrapper
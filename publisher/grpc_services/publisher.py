@@ -1,10 +1,16 @@
+import grpc
 from dependency_injector.wiring import Provide, inject
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from protobufs.compiled import publisher_pb2_grpc
 from protobufs.compiled.publisher_pb2 import (
+    CountMode as CountModeMessage,
+    CreatePublicationBatchResponse,
     PublicationResponse,
     PublicationsSelectionResponse,
+    SelectionOrder as SelectionOrderMessage,
+    VoteBatchItemResponse,
+    VoteBatchResponse,
 )
 from protobufs.compiled.auth_pb2 import (
     Empty,
@@ -13,7 +19,9 @@ from schemas import (
     CreatePublicationSchema,
     VoteSchema,
 )
+from config import settings
 from config.di import Container
+from services.entries import CountMode, SelectionOrder, VoteData
 from services.publications import ICreatePublication
 from services.votes import IVote
 from services.repo import IPublicationRepo
@@ -46,9 +54,39 @@ class GRPCPublisher(publisher_pb2_grpc.PublisherServicer):
             believed=None,
         )
 
-    @handle_grpc_request_error(PublicationsSelectionResponse)
+    @handle_grpc_request_error(CreatePublicationBatchResponse)
     @inject_session
     @inject
+    async def publications_create_batch(
+        self,
+        request,
+        context,
+        session: AsyncSession,
+        service: ICreatePublication = Provide[Container.create_publication],
+    ):
+        results = await service.many(
+            session=session, user_id=request.user_id, urls=request.urls
+        )
+        return CreatePublicationBatchResponse(
+            items=[
+                PublicationResponse(detail=result.detail)
+                if result.publication is None
+                else PublicationResponse(
+                    id=result.publication.id,
+                    url=result.publication.url,
+                    type=result.publication.type,
+                    believed_count=result.publication.believed_count,
+                    disbelieved_count=result.publication.disbelieved_count,
+                    created_at=result.publication.created_at,
+                    believed=None,
+                )
+                for result in results
+            ]
+        )
+
+    @handle_grpc_request_error(PublicationsSelectionResponse)
+    @inject_session(readonly=True)
+    @inject
     async def publications_selection(
         self,
         request,
@@ -61,7 +99,16 @@ class GRPCPublisher(publisher_pb2_grpc.PublisherServicer):
             user_id=request.user_id,
             size=request.size,
             page=request.page,
+            cursor=request.cursor if request.HasField("cursor") else None,
+            count=CountMode(
+                CountModeMessage.Name(request.count).removeprefix("COUNT_")
+            ),
+            order=SelectionOrder(
+                SelectionOrderMessage.Name(request.order).removeprefix("ORDER_")
+            ),
         )
+        if settings.GRPC_SELECTION_COMPRESSION:
+            context.set_compression(grpc.Compression.Gzip)
         return PublicationsSelectionResponse(
             items=[
                 PublicationResponse(
@@ -73,14 +120,42 @@ class GRPCPublisher(publisher_pb2_grpc.PublisherServicer):
                     created_at=str(publication.created_at),
                     believed=publication.believed,
                 )
-                for publication in selection.__dict__["items"]
+                for publication in selection.items
             ],
-            total=selection.__dict__["total"],
-            page=selection.__dict__["page"],
-            size=selection.__dict__["size"],
-            pages=selection.__dict__["pages"],
+            total=selection.total,
+            page=selection.page,
+            size=selection.size,
+            pages=selection.pages,
+            next_cursor=selection.next_cursor,
         )
 
+    @handle_grpc_request_error(PublicationResponse)
+    @inject_session(readonly=True)
+    @inject
+    async def publications_stream(
+        self,
+        request,
+        context,
+        session: AsyncSession,
+        repo: IPublicationRepo = Provide[Container.publication_repo],
+    ):
+        # Each yield waits until the message is handed to the transport,
+        # so a slow consumer pauses reading from the cursor.
+        async for publication in repo.stream(
+            session=session,
+            user_id=request.user_id,
+            after_id=request.after_id if request.HasField("after_id") else None,
+        ):
+            yield PublicationResponse(
+                id=publication.id,
+                url=publication.url,
+                type=publication.type,
+                believed_count=publication.believed_count,
+                disbelieved_count=publication.disbelieved_count,
+                created_at=str(publication.created_at),
+                believed=publication.believed,
+            )
+
     @handle_grpc_request_error(Empty)
     @inject_session
     @inject
@@ -98,3 +173,28 @@ class GRPCPublisher(publisher_pb2_grpc.PublisherServicer):
             schema=VoteSchema(believed=request.believed),
         )
         return Empty()
+
+    @handle_grpc_request_error(VoteBatchResponse)
+    @inject_session
+    @inject
+    async def publications_vote_batch(
+        self,
+        request,
+        context,
+        session: AsyncSession,
+        service: IVote = Provide[Container.create_vote],
+    ):
+        results = await service.many(
+            session=session,
+            votes=[
+                VoteData(
+                    user_id=vote.user_id,
+                    publication_id=vote.publication_id,
+                    believed=vote.believed,
+                )
+                for vote in request.votes
+            ],
+        )
+        return VoteBatchResponse(
+            items=[VoteBatchItemResponse(detail=result.detail) for result in results]
+        )
@@ -1,16 +1,22 @@
 import asyncio
 import grpc
+import multiprocessing
+import os
+import signal
 import sys
+import time
 import logging
 import logging.config
-from concurrent import futures
+from multiprocessing.connection import wait
 
 from protobufs.compiled import publisher_pb2_grpc
 from config import settings
 from config.di import Container
+from config.i18n import load_catalogs
 
-from grpc_services import GRPCPublisher
-from utils.logging import get_config
+from grpc_services import GRPCPublisher, MetricsInterceptor
+from utils.logging import get_config, start_logging_queue, stop_logging_queue
+from utils.metrics import start_metrics_server
 
 
 formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
@@ -25,12 +31,23 @@ logger.addHandler(handler)
 
 
 class GRPCServer:
+    _log_listener = None
+    _metrics_server = None
+
+    def __init__(self, worker: int | None = None) -> None:
+        """`worker` - номер процесса в режиме нескольких воркеров"""
+        self.worker = worker
+
     async def run(self):
         logger.info("Auth GRPC Start Up...")
         self._init_di()
         logger.info("DI Container Successfully Initialized...")
         self._init_logging()
         logger.info("Logging Successfully Initialized...")
+        self._init_i18n()
+        logger.info("Translations Successfully Loaded...")
+        await self._init_db()
+        logger.info("Database Pool Successfully Warmed Up...")
         server = self._create_server()
         logger.info("gRPC Server Successfully Created...")
         self._add_services(server)
@@ -39,16 +56,60 @@ class GRPCServer:
         logger.info("Server Port Successfully Initialized...")
         await self._start_server(server)
         logger.info(f"Running at {self._get_address()}")
+        await self._start_metrics_server()
+        self._init_signal_handlers(server)
         await self._wait_for_termination(server)
+        await self._shutdown()
+        logger.info("Server Successfully Stopped...")
 
     def _init_di(self):
         Container()
 
     def _init_logging(self):
-        logging.config.dictConfig(get_config(settings.LOG_PATH))
+        # Воркеры пишут в свои файлы, иначе ротация одного файла
+        # из нескольких процессов теряет записи
+        log_path = settings.LOG_PATH
+        if self.worker is not None:
+            log_path = os.path.join(log_path, f"worker-{self.worker}")
+        config = get_config(log_path)
+        logging.config.dictConfig(config)
+        if settings.LOGGING_QUEUE_ENABLED:
+            self._log_listener = start_logging_queue(config["loggers"])
+
+    def _init_i18n(self):
+        load_catalogs()
+
+    async def _init_db(self):
+        await Container.db().warm_up(settings.DB_POOL_WARM_UP)
 
     def _create_server(self) -> grpc.aio.Server:
-        return grpc.aio.server(futures.ThreadPoolExecutor(max_workers=10))
+        # All handlers are coroutines, so the server needs no thread pool
+        return grpc.aio.server(
+            interceptors=[MetricsInterceptor()],
+            options=self._get_server_options(),
+            maximum_concurrent_rpcs=settings.GRPC_MAXIMUM_CONCURRENT_RPCS,
+        )
+
+    def _get_server_options(self) -> list:
+        return [
+            # Воркеры слушают один адрес, ядро распределяет соединения
+            ("grpc.so_reuseport", int(self.worker is not None)),
+            ("grpc.keepalive_time_ms", settings.GRPC_KEEPALIVE_TIME_MS),
+            ("grpc.keepalive_timeout_ms", settings.GRPC_KEEPALIVE_TIMEOUT_MS),
+            (
+                "grpc.keepalive_permit_without_calls",
+                int(settings.GRPC_KEEPALIVE_PERMIT_WITHOUT_CALLS),
+            ),
+            (
+                "grpc.http2.min_ping_interval_without_data_ms",
+                settings.GRPC_MIN_PING_INTERVAL_MS,
+            ),
+            (
+                "grpc.max_receive_message_length",
+                settings.GRPC_MAX_RECEIVE_MESSAGE_LENGTH,
+            ),
+            ("grpc.max_send_message_length", settings.GRPC_MAX_SEND_MESSAGE_LENGTH),
+        ]
 
     def _add_services(self, server: grpc.aio.Server) -> None:
         publisher_pb2_grpc.add_PublisherServicer_to_server(GRPCPublisher(), server)
@@ -62,9 +123,129 @@ class GRPCServer:
     async def _start_server(self, server: grpc.aio.Server) -> None:
         await server.start()
 
+    async def _start_metrics_server(self) -> None:
+        if not settings.METRICS_PORT:
+            return
+        # Метрики каждого воркера на своем порту: METRICS_PORT + номер
+        port = settings.METRICS_PORT + (self.worker or 0)
+        self._metrics_server = await start_metrics_server(settings.METRICS_HOST, port)
+        logger.info(f"Metrics at http://{settings.METRICS_HOST}:{port}/metrics")
+
     async def _wait_for_termination(self, server: grpc.aio.Server) -> None:
         await server.wait_for_termination()
 
+    def _init_signal_handlers(self, server: grpc.aio.Server) -> None:
+        loop = asyncio.get_running_loop()
+        # Воркер останавливает супервизор, SIGINT от терминала игнорируется
+        signals = (
+            (signal.SIGTERM,)
+            if self.worker is not None
+            else (signal.SIGTERM, signal.SIGINT)
+        )
+        for sig in signals:
+            loop.add_signal_handler(
+                sig, lambda: asyncio.ensure_future(self._stop_server(server))
+            )
+
+    async def _stop_server(self, server: grpc.aio.Server) -> None:
+        logger.info("Stopping Server...")
+        await server.stop(grace=settings.GRPC_SHUTDOWN_GRACE)
+
+    async def _shutdown(self) -> None:
+        if self._metrics_server is not None:
+            self._metrics_server.close()
+            await self._metrics_server.wait_closed()
+        if settings.VOTE_BUFFER_ENABLED:
+            await Container.vote_counter_buffer().close()
+        if settings.SELECTION_CACHE_ENABLED:
+            await Container.selection_cache_backend().close()
+        if self._log_listener is not None:
+            stop_logging_queue(self._log_listener)
+
+
+class GRPCSupervisor:
+    """
+    Запуск `workers` процессов с `GRPCServer`, которые слушают один
+    адрес через SO_REUSEPORT.
+
+    Упавший воркер перезапускается, по SIGTERM/SIGINT всем воркерам
+    отправляется SIGTERM, и они завершают текущие запросы
+    в пределах GRPC_SHUTDOWN_GRACE.
+    """
+
+    restart_delay = 1
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: dict[int, multiprocessing.Process] = {}
+        self._stopping = False
+
+    def run(self) -> None:
+        logger.info(f"Starting {self.workers} Workers...")
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._stop)
+        for worker in range(self.workers):
+            self._start(worker)
+
+        while not self._stopping:
+            wait([process.sentinel for process in self._processes.values()], timeout=1)
+            for worker, process in list(self._processes.items()):
+                if process.is_alive() or self._stopping:
+                    continue
+                logger.error(
+                    f"Worker {worker} exited with code {process.exitcode}, restarting"
+                )
+                time.sleep(self.restart_delay)
+                self._start(worker)
+
+        self._drain()
+        logger.info("All Workers Successfully Stopped...")
+
+    def _start(self, worker: int) -> None:
+        process = self._context.Process(
+            target=run_worker, args=(worker,), name=f"grpc-worker-{worker}"
+        )
+        process.start()
+        self._processes[worker] = process
+
+    def _stop(self, signum, frame) -> None:
+        logger.info("Stopping Workers...")
+        self._stopping = True
+
+    def _drain(self) -> None:
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + settings.GRPC_SHUTDOWN_GRACE + 5
+        for worker, process in self._processes.items():
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.error(f"Worker {worker} did not stop in time, killing")
+                process.kill()
+                process.join()
+
+
+def run_worker(worker: int) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    install_event_loop()
+    asyncio.run(GRPCServer(worker=worker).run())
+
+
+def install_event_loop() -> None:
+    if not settings.GRPC_UVLOOP:
+        return
+    try:
+        import uvloop
+    except ImportError as e:
+        # GRPC_UVLOOP is opt-in, so a silent fallback would hide a broken image
+        raise RuntimeError("GRPC_UVLOOP=1 but uvloop is not installed") from e
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 
 if __name__ == "__main__":
-    asyncio.run(GRPCServer().run())
+    if settings.GRPC_WORKERS > 1:
+        GRPCSupervisor(settings.GRPC_WORKERS).run()
+    else:
+        install_event_loop()
+        asyncio.run(GRPCServer().run())
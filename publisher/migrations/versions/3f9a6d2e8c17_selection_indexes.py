@@ -0,0 +1,54 @@
+"""Selection indexes
+
+Revision ID: 3f9a6d2e8c17
+Revises: 7b3e2c91a4d5
+Create Date: 2026-10-18 14:37:52.904116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a6d2e8c17'
+down_revision: Union[str, None] = '7b3e2c91a4d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (publication_id, user_id) is covered by the unique index
+    # ix_publisher_vote_publication_id_user_id from 7b3e2c91a4d5.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_publisher_publication_created_at_id',
+            'publisher_publication',
+            ['created_at', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_publisher_vote_user_id',
+            'publisher_vote',
+            ['user_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_publisher_vote_user_id',
+            table_name='publisher_vote',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_publisher_publication_created_at_id',
+            table_name='publisher_publication',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,83 @@
+"""Vote upsert
+
+Revision ID: 7b3e2c91a4d5
+Revises: cfe517fbdba2
+Create Date: 2026-10-18 12:04:11.318402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e2c91a4d5'
+down_revision: Union[str, None] = 'cfe517fbdba2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX = 'ix_publisher_vote_publication_id_user_id'
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # A failed CONCURRENTLY build leaves an invalid index behind,
+        # which if_not_exists would then skip on the next run.
+        invalid = op.get_bind().execute(
+            sa.text(
+                "SELECT NOT indisvalid FROM pg_index "
+                "WHERE indexrelid = to_regclass(:name)"
+            ),
+            {"name": INDEX},
+        ).scalar()
+        if invalid:
+            op.drop_index(
+                INDEX, table_name='publisher_vote', postgresql_concurrently=True
+            )
+        # Keep only the latest vote of each user for a publication,
+        # otherwise the unique index can not be built. Runs right before
+        # the build to also drop duplicates written since the last attempt.
+        op.execute(
+            """
+            DELETE FROM publisher_vote AS v
+            USING publisher_vote AS newer
+            WHERE v.publication_id = newer.publication_id
+              AND v.user_id = newer.user_id
+              AND v.id < newer.id
+            """
+        )
+        op.create_index(
+            INDEX,
+            'publisher_vote',
+            ['publication_id', 'user_id'],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Counters were never maintained before, rebuild them from votes
+        # once the index rules out new duplicates.
+        op.execute(
+            """
+            UPDATE publisher_publication AS p
+            SET believed_count = (
+                    SELECT COUNT(*) FROM publisher_vote AS v
+                    WHERE v.publication_id = p.id AND v.believed IS TRUE
+                ),
+                disbelieved_count = (
+                    SELECT COUNT(*) FROM publisher_vote AS v
+                    WHERE v.publication_id = p.id AND v.believed IS FALSE
+                )
+            """
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX,
+            table_name='publisher_vote',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,156 @@
+"""Publication canonical id
+
+Revision ID: 9c4e1b7a2f60
+Revises: 3f9a6d2e8c17
+Create Date: 2026-10-18 17:21:40.118532
+
+"""
+import re
+from typing import Sequence, Union
+from urllib.parse import SplitResult, parse_qs, parse_qsl, urlencode, urlsplit
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e1b7a2f60'
+down_revision: Union[str, None] = '3f9a6d2e8c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+# Frozen copy of utils.canonical as of this revision: the backfill
+# must not change when the application code does.
+YOUTUBE_ID = re.compile(r"[A-Za-z0-9_-]{11}")
+YOUTUBE_PATH = re.compile(r"/(?:shorts|embed|live|v)/([A-Za-z0-9_-]{11})(?:[/?]|$)")
+TIKTOK_PATH = re.compile(r"/(?:@[^/]+/)?(?:video|photo)/(\d+)")
+VK_ID = re.compile(r"(video|clip|wall|photo)(-?\d+_\d+)")
+TWITCH_CLIP_PATH = re.compile(r"/(?:[^/]+/clip/)?([A-Za-z0-9_-]+)")
+TWITCH_VIDEO_PATH = re.compile(r"/videos/(\d+)")
+TWITCH_CHANNEL_PATH = re.compile(r"/([A-Za-z0-9_]+)/?$")
+TRACKING_PARAMS = re.compile(r"utm_.*|fbclid|gclid|yclid|si")
+
+
+def _youtube(parsed: SplitResult) -> str | None:
+    host = parsed.hostname or ""
+    if host == "youtu.be":
+        id = parsed.path.strip("/").split("/")[0]
+    elif parsed.path == "/watch":
+        id = parse_qs(parsed.query).get("v", [""])[0]
+    else:
+        match = YOUTUBE_PATH.match(parsed.path)
+        id = match.group(1) if match else ""
+    return id if YOUTUBE_ID.fullmatch(id) else None
+
+
+def _tiktok(parsed: SplitResult) -> str | None:
+    match = TIKTOK_PATH.match(parsed.path)
+    return match.group(1) if match else None
+
+
+def _vk(parsed: SplitResult) -> str | None:
+    query = parse_qs(parsed.query)
+    for value in (*query.get("z", ()), *query.get("w", ()), parsed.path):
+        match = VK_ID.search(value)
+        if match is not None:
+            return match.group(0)
+    return None
+
+
+def _twitch(parsed: SplitResult) -> str | None:
+    host = parsed.hostname or ""
+    if host == "clips.twitch.tv" or "/clip/" in parsed.path:
+        match = TWITCH_CLIP_PATH.match(parsed.path)
+        return f"clip/{match.group(1)}" if match else None
+    match = TWITCH_VIDEO_PATH.match(parsed.path)
+    if match is not None:
+        return f"video/{match.group(1)}"
+    match = TWITCH_CHANNEL_PATH.match(parsed.path)
+    if match is not None:
+        return f"channel/{match.group(1).lower()}"
+    return None
+
+
+def _default(parsed: SplitResult) -> str:
+    host = (parsed.hostname or "").removeprefix("www.").removeprefix("m.")
+    path = parsed.path.rstrip("/")
+    query = urlencode(
+        sorted(
+            (name, value)
+            for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if not TRACKING_PARAMS.fullmatch(name)
+        )
+    )
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+CANONICALIZERS = {
+    "YOUTUBE": _youtube,
+    "TIKTOK": _tiktok,
+    "VK": _vk,
+    "TWITCH": _twitch,
+}
+
+
+def canonical_id(url: str, type: str) -> str:
+    parsed = urlsplit(url)
+    return CANONICALIZERS[type](parsed) or _default(parsed)
+
+
+def upgrade() -> None:
+    op.add_column(
+        'publisher_publication',
+        sa.Column('canonical_id', sa.String(), nullable=True),
+    )
+    # Only the oldest publication of the same content gets the id,
+    # later duplicates keep NULL together with their votes.
+    conn = op.get_bind()
+    seen = set()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, url, type FROM publisher_publication "
+                "WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        params = []
+        for row in rows:
+            key = (row.type, canonical_id(row.url, row.type))
+            if key not in seen:
+                seen.add(key)
+                params.append({"id": row.id, "canonical_id": key[1]})
+        if params:
+            conn.execute(
+                sa.text(
+                    "UPDATE publisher_publication SET canonical_id = :canonical_id "
+                    "WHERE id = :id"
+                ),
+                params,
+            )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_publisher_publication_type_canonical_id',
+            'publisher_publication',
+            ['type', 'canonical_id'],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_publisher_publication_type_canonical_id',
+            table_name='publisher_publication',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('publisher_publication', 'canonical_id')
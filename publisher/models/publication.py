@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, DateTime, func
+from sqlalchemy import Table, Column, Integer, String, DateTime, Index, func
 from sqlalchemy.orm import relationship
 
 from models import mapper_registry
@@ -13,6 +13,7 @@ publication_table = Table(
     Column("user_id", Integer, nullable=False),
     Column("url", String, nullable=False),
     Column("type", String, nullable=False),
+    Column("canonical_id", String, nullable=True),
     Column("believed_count", Integer, default=0, nullable=False),
     Column("disbelieved_count", Integer, default=0, nullable=False),
     Column(
@@ -25,6 +26,13 @@ publication_table = Table(
         onupdate=func.now(),
         nullable=False,
     ),
+    Index("ix_publisher_publication_created_at_id", "created_at", "id"),
+    Index(
+        "ix_publisher_publication_type_canonical_id",
+        "type",
+        "canonical_id",
+        unique=True,
+    ),
 )
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, Boolean, ForeignKey
+from sqlalchemy import Table, Column, Integer, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from models import mapper_registry
@@ -20,6 +20,13 @@ vote_table = Table(
     ),
     Column("user_id", Integer, nullable=False),
     Column("believed", Boolean, nullable=True),
+    Index(
+        "ix_publisher_vote_publication_id_user_id",
+        "publication_id",
+        "user_id",
+        unique=True,
+    ),
+    Index("ix_publisher_vote_user_id", "user_id"),
 )
 
 
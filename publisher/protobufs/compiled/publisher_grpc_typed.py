@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, asdict
-from typing import List
+from typing import AsyncIterator, List
 
 from config.grpc import GRPCConnection
 from utils.decorators import handle_grpc_response_error
@@ -14,6 +14,12 @@ class CreatePublicationRequest:
     url: str
 
 
+@dataclass
+class CreatePublicationBatchRequest:
+    user_id: int
+    urls: List[str]
+
+
 @dataclass
 class PublicationResponse:
     id: int
@@ -26,6 +32,12 @@ class PublicationResponse:
     detail: str | None
 
 
+@dataclass
+class CreatePublicationBatchResponse:
+    items: List[PublicationResponse]
+    detail: str | None
+
+
 @dataclass
 class VoteRequest:
     user_id: int
@@ -33,21 +45,46 @@ class VoteRequest:
     believed: bool
 
 
+@dataclass
+class VoteBatchRequest:
+    votes: List[VoteRequest]
+
+
+@dataclass
+class VoteBatchItemResponse:
+    detail: str | None
+
+
+@dataclass
+class VoteBatchResponse:
+    items: List[VoteBatchItemResponse]
+    detail: str | None
+
+
 @dataclass
 class PaginationRequest:
     user_id: int
     page: int
     size: int
+    cursor: str | None = None
+    count: int = 0
+
+
+@dataclass
+class PublicationsStreamRequest:
+    user_id: int
+    after_id: int | None = None
 
 
 @dataclass
 class PublicationsSelectionResponse:
     items: List[PublicationResponse]
-    total: int
+    total: int | None
     page: int
     size: int
-    pages: int
+    pages: int | None
     detail: str | None
+    next_cursor: str | None = None
 
 
 class IPublisherStub(ABC):
@@ -56,14 +93,29 @@ class IPublisherStub(ABC):
         self, request: CreatePublicationRequest
     ) -> PublicationResponse: ...
 
+    @abstractmethod
+    async def publications_create_batch(
+        self, request: CreatePublicationBatchRequest
+    ) -> CreatePublicationBatchResponse: ...
+
     @abstractmethod
     async def publications_selection(
         self, request: PaginationRequest
     ) -> PublicationsSelectionResponse: ...
 
+    @abstractmethod
+    def publications_stream(
+        self, request: PublicationsStreamRequest
+    ) -> AsyncIterator[PublicationResponse]: ...
+
     @abstractmethod
     async def publications_vote(self, request: VoteRequest) -> Empty: ...
 
+    @abstractmethod
+    async def publications_vote_batch(
+        self, request: VoteBatchRequest
+    ) -> VoteBatchResponse: ...
+
 
 class PublisherStub(IPublisherStub):
     def __init__(self, connection: GRPCConnection) -> None:
@@ -91,6 +143,34 @@ class PublisherStub(IPublisherStub):
             detail=response.detail,
         )
 
+    @handle_grpc_response_error
+    async def publications_create_batch(
+        self, request: CreatePublicationBatchRequest
+    ) -> CreatePublicationBatchResponse:
+        from protobufs.compiled.publisher_pb2 import (
+            CreatePublicationBatchRequest as _CreatePublicationBatchRequest,
+        )
+
+        response = await self.connection.stub.publications_create_batch(
+            _CreatePublicationBatchRequest(**asdict(request))
+        )
+        return CreatePublicationBatchResponse(
+            items=[
+                PublicationResponse(
+                    id=publication.id,
+                    url=publication.url,
+                    type=publication.type,
+                    believed_count=publication.believed_count,
+                    disbelieved_count=publication.disbelieved_count,
+                    created_at=publication.created_at,
+                    believed=publication.believed,
+                    detail=publication.detail,
+                )
+                for publication in response.items
+            ],
+            detail=response.detail,
+        )
+
     @handle_grpc_response_error
     async def publications_selection(
         self, request: PaginationRequest
@@ -116,13 +196,36 @@ class PublisherStub(IPublisherStub):
                 )
                 for publication in response.items
             ],
-            total=response.total,
+            total=response.total if response.HasField("total") else None,
             page=response.page,
             size=response.size,
-            pages=response.pages,
+            pages=response.pages if response.HasField("pages") else None,
             detail=response.detail,
+            next_cursor=response.next_cursor,
+        )
+
+    @handle_grpc_response_error
+    async def publications_stream(
+        self, request: PublicationsStreamRequest
+    ) -> AsyncIterator[PublicationResponse]:
+        from protobufs.compiled.publisher_pb2 import (
+            PublicationsStreamRequest as _PublicationsStreamRequest,
         )
 
+        async for publication in self.connection.stub.publications_stream(
+            _PublicationsStreamRequest(**asdict(request))
+        ):
+            yield PublicationResponse(
+                id=publication.id,
+                url=publication.url,
+                type=publication.type,
+                believed_count=publication.believed_count,
+                disbelieved_count=publication.disbelieved_count,
+                created_at=publication.created_at,
+                believed=publication.believed,
+                detail=publication.detail,
+            )
+
     @handle_grpc_response_error
     async def publications_vote(self, request: VoteRequest) -> Empty:
         from protobufs.compiled.publisher_pb2 import VoteRequest as _VoteRequest
@@ -131,3 +234,24 @@ class PublisherStub(IPublisherStub):
             _VoteRequest(**asdict(request))
         )
         return Empty(detail=response.detail)
+
+    @handle_grpc_response_error
+    async def publications_vote_batch(
+        self, request: VoteBatchRequest
+    ) -> VoteBatchResponse:
+        from protobufs.compiled.publisher_pb2 import (
+            VoteBatchRequest as _VoteBatchRequest,
+            VoteRequest as _VoteRequest,
+        )
+
+        response = await self.connection.stub.publications_vote_batch(
+            _VoteBatchRequest(
+                votes=[_VoteRequest(**asdict(vote)) for vote in request.votes]
+            )
+        )
+        return VoteBatchResponse(
+            items=[
+                VoteBatchItemResponse(detail=item.detail) for item in response.items
+            ],
+            detail=response.detail,
+        )
@@ -3,6 +3,7 @@
 # source: publisher.proto
 # Protobuf Python Version: 4.25.0
 """Generated protocol buffer code."""
+
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import descriptor_pool as _descriptor_pool
 from google.protobuf import symbol_database as _symbol_database
@@ -15,27 +16,8 @@ _sym_db = _symbol_database.Default()
 
 import protobufs.compiled.auth_pb2 as auth__pb2
 
-
 DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
-    b'\n\x0fpublisher.proto\x12\tpublisher\x1a\nauth.proto"8\n\x18\x43reatePublicationRequest\x12\x0f\n\x07user_id\x18\x01'
-    b" \x01(\x05\x12\x0b\n\x03url\x18\x02"
-    b' \x01(\t"\xb5\x01\n\x13PublicationResponse\x12\n\n\x02id\x18\x01'
-    b" \x01(\x05\x12\x0b\n\x03url\x18\x02 \x01(\t\x12\x0c\n\x04type\x18\x03"
-    b" \x01(\t\x12\x16\n\x0e\x62\x65lieved_count\x18\x04"
-    b" \x01(\x05\x12\x19\n\x11\x64isbelieved_count\x18\x05"
-    b" \x01(\x05\x12\x12\n\ncreated_at\x18\x06"
-    b" \x01(\t\x12\x10\n\x08\x62\x65lieved\x18\x07"
-    b" \x01(\x08\x12\x13\n\x06\x64\x65tail\x18\x08"
-    b' \x01(\tH\x00\x88\x01\x01\x42\t\n\x07_detail"H\n\x0bVoteRequest\x12\x0f\n\x07user_id\x18\x01'
-    b" \x01(\x05\x12\x16\n\x0epublication_id\x18\x02"
-    b" \x01(\x05\x12\x10\n\x08\x62\x65lieved\x18\x03"
-    b' \x01(\x08"@\n\x11PaginationRequest\x12\x0f\n\x07user_id\x18\x01'
-    b" \x01(\x05\x12\x0c\n\x04page\x18\x02 \x01(\x05\x12\x0c\n\x04size\x18\x03"
-    b' \x01(\x05"\xa8\x01\n\x1dPublicationsSelectionResponse\x12-\n\x05items\x18\x01'
-    b" \x03(\x0b\x32\x1e.publisher.PublicationResponse\x12\r\n\x05total\x18\x02"
-    b" \x01(\x05\x12\x0c\n\x04page\x18\x03 \x01(\x05\x12\x0c\n\x04size\x18\x04"
-    b" \x01(\x05\x12\r\n\x05pages\x18\x05 \x01(\x05\x12\x13\n\x06\x64\x65tail\x18\x06"
-    b" \x01(\tH\x00\x88\x01\x01\x42\t\n\x07_detail2\x83\x02\n\tPublisher\x12Z\n\x13publications_create\x12#.publisher.CreatePublicationRequest\x1a\x1e.publisher.PublicationResponse\x12`\n\x16publications_selection\x12\x1c.publisher.PaginationRequest\x1a(.publisher.PublicationsSelectionResponse\x12\x38\n\x11publications_vote\x12\x16.publisher.VoteRequest\x1a\x0b.auth.Emptyb\x06proto3"
+    b'\n\x0fpublisher.proto\x12\tpublisher\x1a\nauth.proto"8\n\x18\x43reatePublicationRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0b\n\x03url\x18\x02 \x01(\t">\n\x1d\x43reatePublicationBatchRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0c\n\x04urls\x18\x02 \x03(\t"\xb5\x01\n\x13PublicationResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0b\n\x03url\x18\x02 \x01(\t\x12\x0c\n\x04type\x18\x03 \x01(\t\x12\x16\n\x0e\x62\x65lieved_count\x18\x04 \x01(\x05\x12\x19\n\x11\x64isbelieved_count\x18\x05 \x01(\x05\x12\x12\n\ncreated_at\x18\x06 \x01(\t\x12\x10\n\x08\x62\x65lieved\x18\x07 \x01(\x08\x12\x13\n\x06\x64\x65tail\x18\x08 \x01(\tH\x00\x88\x01\x01\x42\t\n\x07_detail"o\n\x1e\x43reatePublicationBatchResponse\x12-\n\x05items\x18\x01 \x03(\x0b\x32\x1e.publisher.PublicationResponse\x12\x13\n\x06\x64\x65tail\x18\x02 \x01(\tH\x00\x88\x01\x01\x42\t\n\x07_detail"H\n\x0bVoteRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x16\n\x0epublication_id\x18\x02 \x01(\x05\x12\x10\n\x08\x62\x65lieved\x18\x03 \x01(\x08"9\n\x10VoteBatchRequest\x12%\n\x05votes\x18\x01 \x03(\x0b\x32\x16.publisher.VoteRequest"7\n\x15VoteBatchItemResponse\x12\x13\n\x06\x64\x65tail\x18\x01 \x01(\tH\x00\x88\x01\x01\x42\t\n\x07_detail"d\n\x11VoteBatchResponse\x12/\n\x05items\x18\x01 \x03(\x0b\x32 .publisher.VoteBatchItemResponse\x12\x13\n\x06\x64\x65tail\x18\x02 \x01(\tH\x00\x88\x01\x01\x42\t\n\x07_detail"\xaf\x01\n\x11PaginationRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0c\n\x04page\x18\x02 \x01(\x05\x12\x0c\n\x04size\x18\x03 \x01(\x05\x12\x13\n\x06\x63ursor\x18\x04 \x01(\tH\x00\x88\x01\x01\x12#\n\x05\x63ount\x18\x05 \x01(\x0e\x32\x14.publisher.CountMode\x12(\n\x05order\x18\x06 \x01(\x0e\x32\x19.publisher.SelectionOrderB\t\n\x07_cursor"P\n\x19PublicationsStreamRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x15\n\x08\x61\x66ter_id\x18\x02 \x01(\x05H\x00\x88\x01\x01\x42\x0b\n\t_after_id"\xf0\x01\n\x1dPublicationsSelectionResponse\x12-\n\x05items\x18\x01 \x03(\x0b\x32\x1e.publisher.PublicationResponse\x12\x12\n\x05total\x18\x02 \x01(\x05H\x00\x88\x01\x01\x12\x0c\n\x04page\x18\x03 \x01(\x05\x12\x0c\n\x04size\x18\x04 \x01(\x05\x12\x12\n\x05pages\x18\x05 \x01(\x05H\x01\x88\x01\x01\x12\x13\n\x06\x64\x65tail\x18\x06 \x01(\tH\x02\x88\x01\x01\x12\x18\n\x0bnext_cursor\x18\x07 \x01(\tH\x03\x88\x01\x01\x42\x08\n\x06_totalB\x08\n\x06_pagesB\t\n\x07_detailB\x0e\n\x0c_next_cursor*S\n\tCountMode\x12\x0f\n\x0b\x43OUNT_EXACT\x10\x00\x12\x10\n\x0c\x43OUNT_CACHED\x10\x01\x12\x13\n\x0f\x43OUNT_ESTIMATED\x10\x02\x12\x0e\n\nCOUNT_NONE\x10\x03*4\n\x0eSelectionOrder\x12\x10\n\x0cORDER_RANKED\x10\x00\x12\x10\n\x0cORDER_LATEST\x10\x01\x32\xaa\x04\n\tPublisher\x12Z\n\x13publications_create\x12#.publisher.CreatePublicationRequest\x1a\x1e.publisher.PublicationResponse\x12p\n\x19publications_create_batch\x12(.publisher.CreatePublicationBatchRequest\x1a).publisher.CreatePublicationBatchResponse\x12`\n\x16publications_selection\x12\x1c.publisher.PaginationRequest\x1a(.publisher.PublicationsSelectionResponse\x12]\n\x13publications_stream\x12$.publisher.PublicationsStreamRequest\x1a\x1e.publisher.PublicationResponse0\x01\x12\x38\n\x11publications_vote\x12\x16.publisher.VoteRequest\x1a\x0b.auth.Empty\x12T\n\x17publications_vote_batch\x12\x1b.publisher.VoteBatchRequest\x1a\x1c.publisher.VoteBatchResponseb\x06proto3'
 )
 
 _globals = globals()
@@ -43,16 +25,32 @@ _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, "publisher_pb2", _globals)
 if _descriptor._USE_C_DESCRIPTORS == False:
     DESCRIPTOR._options = None
+    _globals["_COUNTMODE"]._serialized_start = 1256
+    _globals["_COUNTMODE"]._serialized_end = 1339
+    _globals["_SELECTIONORDER"]._serialized_start = 1341
+    _globals["_SELECTIONORDER"]._serialized_end = 1393
     _globals["_CREATEPUBLICATIONREQUEST"]._serialized_start = 42
     _globals["_CREATEPUBLICATIONREQUEST"]._serialized_end = 98
-    _globals["_PUBLICATIONRESPONSE"]._serialized_start = 101
-    _globals["_PUBLICATIONRESPONSE"]._serialized_end = 282
-    _globals["_VOTEREQUEST"]._serialized_start = 284
-    _globals["_VOTEREQUEST"]._serialized_end = 356
-    _globals["_PAGINATIONREQUEST"]._serialized_start = 358
-    _globals["_PAGINATIONREQUEST"]._serialized_end = 422
-    _globals["_PUBLICATIONSSELECTIONRESPONSE"]._serialized_start = 425
-    _globals["_PUBLICATIONSSELECTIONRESPONSE"]._serialized_end = 593
-    _globals["_PUBLISHER"]._serialized_start = 596
-    _globals["_PUBLISHER"]._serialized_end = 855
+    _globals["_CREATEPUBLICATIONBATCHREQUEST"]._serialized_start = 100
+    _globals["_CREATEPUBLICATIONBATCHREQUEST"]._serialized_end = 162
+    _globals["_PUBLICATIONRESPONSE"]._serialized_start = 165
+    _globals["_PUBLICATIONRESPONSE"]._serialized_end = 346
+    _globals["_CREATEPUBLICATIONBATCHRESPONSE"]._serialized_start = 348
+    _globals["_CREATEPUBLICATIONBATCHRESPONSE"]._serialized_end = 459
+    _globals["_VOTEREQUEST"]._serialized_start = 461
+    _globals["_VOTEREQUEST"]._serialized_end = 533
+    _globals["_VOTEBATCHREQUEST"]._serialized_start = 535
+    _globals["_VOTEBATCHREQUEST"]._serialized_end = 592
+    _globals["_VOTEBATCHITEMRESPONSE"]._serialized_start = 594
+    _globals["_VOTEBATCHITEMRESPONSE"]._serialized_end = 649
+    _globals["_VOTEBATCHRESPONSE"]._serialized_start = 651
+    _globals["_VOTEBATCHRESPONSE"]._serialized_end = 751
+    _globals["_PAGINATIONREQUEST"]._serialized_start = 754
+    _globals["_PAGINATIONREQUEST"]._serialized_end = 929
+    _globals["_PUBLICATIONSSTREAMREQUEST"]._serialized_start = 931
+    _globals["_PUBLICATIONSSTREAMREQUEST"]._serialized_end = 1011
+    _globals["_PUBLICATIONSSELECTIONRESPONSE"]._serialized_start = 1014
+    _globals["_PUBLICATIONSSELECTIONRESPONSE"]._serialized_end = 1254
+    _globals["_PUBLISHER"]._serialized_start = 1396
+    _globals["_PUBLISHER"]._serialized_end = 1950
 # @@protoc_insertion_point(module_scope)
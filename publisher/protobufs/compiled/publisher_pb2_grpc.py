@@ -1,5 +1,6 @@
 # Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
 """Client and server classes corresponding to protobuf-defined services."""
+
 import grpc
 
 import protobufs.compiled.auth_pb2 as auth__pb2
@@ -20,16 +21,31 @@ class PublisherStub(object):
             request_serializer=publisher__pb2.CreatePublicationRequest.SerializeToString,
             response_deserializer=publisher__pb2.PublicationResponse.FromString,
         )
+        self.publications_create_batch = channel.unary_unary(
+            "/publisher.Publisher/publications_create_batch",
+            request_serializer=publisher__pb2.CreatePublicationBatchRequest.SerializeToString,
+            response_deserializer=publisher__pb2.CreatePublicationBatchResponse.FromString,
+        )
         self.publications_selection = channel.unary_unary(
             "/publisher.Publisher/publications_selection",
             request_serializer=publisher__pb2.PaginationRequest.SerializeToString,
             response_deserializer=publisher__pb2.PublicationsSelectionResponse.FromString,
         )
+        self.publications_stream = channel.unary_stream(
+            "/publisher.Publisher/publications_stream",
+            request_serializer=publisher__pb2.PublicationsStreamRequest.SerializeToString,
+            response_deserializer=publisher__pb2.PublicationResponse.FromString,
+        )
         self.publications_vote = channel.unary_unary(
             "/publisher.Publisher/publications_vote",
             request_serializer=publisher__pb2.VoteRequest.SerializeToString,
             response_deserializer=auth__pb2.Empty.FromString,
         )
+        self.publications_vote_batch = channel.unary_unary(
+            "/publisher.Publisher/publications_vote_batch",
+            request_serializer=publisher__pb2.VoteBatchRequest.SerializeToString,
+            response_deserializer=publisher__pb2.VoteBatchResponse.FromString,
+        )
 
 
 class PublisherServicer(object):
@@ -41,18 +57,36 @@ class PublisherServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def publications_create_batch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def publications_selection(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def publications_stream(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def publications_vote(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def publications_vote_batch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
 
 def add_PublisherServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -61,16 +95,31 @@ def add_PublisherServicer_to_server(servicer, server):
             request_deserializer=publisher__pb2.CreatePublicationRequest.FromString,
             response_serializer=publisher__pb2.PublicationResponse.SerializeToString,
         ),
+        "publications_create_batch": grpc.unary_unary_rpc_method_handler(
+            servicer.publications_create_batch,
+            request_deserializer=publisher__pb2.CreatePublicationBatchRequest.FromString,
+            response_serializer=publisher__pb2.CreatePublicationBatchResponse.SerializeToString,
+        ),
         "publications_selection": grpc.unary_unary_rpc_method_handler(
             servicer.publications_selection,
             request_deserializer=publisher__pb2.PaginationRequest.FromString,
             response_serializer=publisher__pb2.PublicationsSelectionResponse.SerializeToString,
         ),
+        "publications_stream": grpc.unary_stream_rpc_method_handler(
+            servicer.publications_stream,
+            request_deserializer=publisher__pb2.PublicationsStreamRequest.FromString,
+            response_serializer=publisher__pb2.PublicationResponse.SerializeToString,
+        ),
         "publications_vote": grpc.unary_unary_rpc_method_handler(
             servicer.publications_vote,
             request_deserializer=publisher__pb2.VoteRequest.FromString,
             response_serializer=auth__pb2.Empty.SerializeToString,
         ),
+        "publications_vote_batch": grpc.unary_unary_rpc_method_handler(
+            servicer.publications_vote_batch,
+            request_deserializer=publisher__pb2.VoteBatchRequest.FromString,
+            response_serializer=publisher__pb2.VoteBatchResponse.SerializeToString,
+        ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
         "publisher.Publisher", rpc_method_handlers
@@ -111,6 +160,35 @@ class Publisher(object):
             metadata,
         )
 
+    @staticmethod
+    def publications_create_batch(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/publisher.Publisher/publications_create_batch",
+            publisher__pb2.CreatePublicationBatchRequest.SerializeToString,
+            publisher__pb2.CreatePublicationBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
     @staticmethod
     def publications_selection(
         request,
@@ -140,6 +218,35 @@ class Publisher(object):
             metadata,
         )
 
+    @staticmethod
+    def publications_stream(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/publisher.Publisher/publications_stream",
+            publisher__pb2.PublicationsStreamRequest.SerializeToString,
+            publisher__pb2.PublicationResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
     @staticmethod
     def publications_vote(
         request,
@@ -168,3 +275,32 @@ class Publisher(object):
             timeout,
             metadata,
         )
+
+    @staticmethod
+    def publications_vote_batch(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/publisher.Publisher/publications_vote_batch",
+            publisher__pb2.VoteBatchRequest.SerializeToString,
+            publisher__pb2.VoteBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
@@ -1,2 +1,4 @@
 from .publication import PublicationRepo
 from .vote import VoteRepo
+from .buffer import BufferedVoteRepo, VoteCounterBuffer
+from .cache import CachedPublicationRepo, SelectionCache
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+from typing import Dict, List, Sequence
+
+from sqlalchemy import Integer, column, update, values
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.db import Database
+from models.publication import Publication
+from services.entries import VoteData
+from utils.types import VoteType
+from utils.decorators import handle_orm_error
+
+from .cache import SelectionCache
+from .vote import VoteRepo, lock_publications
+
+
+logger = logging.getLogger("orm")
+
+
+class VoteCounterBuffer:
+    """
+    Write-behind буфер изменений счетчиков публикаций.
+
+    Голоса по одной публикации складываются в памяти процесса
+    и записываются одним `UPDATE ... FROM (VALUES ...)` раз в
+    `flush_interval` секунд или после `max_events` голосов, поэтому
+    популярная публикация не блокируется каждым голосом.
+    """
+
+    def __init__(self, db: Database, flush_interval: float, max_events: int) -> None:
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self._deltas: Dict[int, List[int]] = {}
+        self._events = 0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+        self._closed = False
+
+    def add(
+        self, publication_id: int, believed_delta: int, disbelieved_delta: int
+    ) -> None:
+        if not believed_delta and not disbelieved_delta:
+            return
+        self._merge(publication_id, believed_delta, disbelieved_delta)
+        self._events += 1
+
+        if not self._closed and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        if self._events >= self.max_events:
+            self._wakeup.set()
+
+    def add_on_commit(
+        self,
+        session: AsyncSession,
+        publication_id: int,
+        believed_delta: int,
+        disbelieved_delta: int,
+    ) -> None:
+        """Буферизация изменений только после фиксации транзакции голоса"""
+        event.listen(
+            session.sync_session,
+            "after_commit",
+            lambda _: self.add(publication_id, believed_delta, disbelieved_delta),
+            once=True,
+        )
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            deltas, self._deltas, self._events = self._deltas, {}, 0
+            if not deltas:
+                return
+            try:
+                async with self.db.session() as session:
+                    await lock_publications(session, deltas)
+                    await session.execute(self._flush_statement(deltas))
+                    # `Database.session` only logs commit errors, and the
+                    # deltas must be queued again
+                    await session.commit()
+            except Exception as e:
+                logger.error(
+                    f"Failed to flush vote counters, retrying later - {str(e)}",
+                    exc_info=e,
+                )
+                self._requeue(deltas)
+            except BaseException:
+                # Отмененная запись тоже не должна терять изменения
+                self._requeue(deltas)
+                raise
+
+    async def close(self) -> None:
+        """
+        Остановка фоновой записи и запись оставшихся изменений.
+
+        Фоновая задача не отменяется, а дожидается окончания текущей
+        записи, иначе ее изменения были бы потеряны.
+        """
+        self._closed = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def _requeue(self, deltas: Dict[int, List[int]]) -> None:
+        for publication_id, (believed, disbelieved) in deltas.items():
+            self._merge(publication_id, believed, disbelieved)
+
+    def _merge(
+        self, publication_id: int, believed_delta: int, disbelieved_delta: int
+    ) -> None:
+        deltas = self._deltas.setdefault(publication_id, [0, 0])
+        deltas[0] += believed_delta
+        deltas[1] += disbelieved_delta
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    @staticmethod
+    def _flush_statement(deltas: Dict[int, List[int]]):
+        publication = Publication.__table__
+        rows = values(
+            column("id", Integer),
+            column("believed", Integer),
+            column("disbelieved", Integer),
+            name="deltas",
+        ).data(
+            [
+                (publication_id, believed, disbelieved)
+                for publication_id, (believed, disbelieved) in sorted(deltas.items())
+            ]
+        )
+        return (
+            update(publication)
+            .where(publication.c.id == rows.c.id)
+            .values(
+                believed_count=publication.c.believed_count + rows.c.believed,
+                disbelieved_count=publication.c.disbelieved_count
+                + rows.c.disbelieved,
+            )
+        )
+
+
+class BufferedVoteRepo(VoteRepo):
+    """Голоса пишутся сразу, а счетчики публикаций - через `VoteCounterBuffer`"""
+
+    def __init__(
+        self, buffer: VoteCounterBuffer, cache: SelectionCache | None = None
+    ) -> None:
+        super().__init__(cache)
+        self.buffer = buffer
+
+    @handle_orm_error
+    async def upsert(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        publication_id: int,
+        believed: bool | None,
+    ) -> VoteType | None:
+        await self._lock(session, [(publication_id, user_id)])
+        result = await session.execute(
+            self._upsert_statement(user_id, publication_id, believed, counters=False)
+        )
+        vote = result.first()
+        if vote is None:
+            return None
+
+        self._on_voted(session, [user_id])
+        self.buffer.add_on_commit(
+            session,
+            vote.publication_id,
+            int(vote.believed is True) - int(vote.previous_believed is True),
+            int(vote.believed is False) - int(vote.previous_believed is False),
+        )
+        return vote
+
+    @handle_orm_error
+    async def upsert_many(
+        self, session: AsyncSession, votes: Sequence[VoteData]
+    ) -> List[VoteType]:
+        if not votes:
+            return []
+        await self._lock(
+            session, ((item.publication_id, item.user_id) for item in votes)
+        )
+        result = await session.execute(
+            self._upsert_many_statement(votes, counters=False)
+        )
+        upserted = result.all()
+        self._on_voted(session, [vote.user_id for vote in upserted])
+        for vote in upserted:
+            self.buffer.add_on_commit(
+                session,
+                vote.publication_id,
+                int(vote.believed is True) - int(vote.previous_believed is True),
+                int(vote.believed is False) - int(vote.previous_believed is False),
+            )
+        return upserted
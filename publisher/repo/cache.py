@@ -0,0 +1,126 @@
+import asyncio
+from typing import Any, Iterable, Set, Tuple
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.entries import CountMode
+from services.publications.entries import PublicationsSelectionData
+from utils.cache import CachedValue, ICache
+from utils.metrics import Counter
+
+from .publication import PublicationRepo
+
+
+HIT = "hit"
+MISS = "miss"
+GLOBAL_GENERATION = "selection:generation"
+
+lookups_counter = Counter(
+    "publication_selection_cache_total",
+    "Publication selection cache lookups by result: hit or miss.",
+    ["result"],
+)
+
+
+class SelectionCache:
+    """
+    Кеш выборок публикаций с инвалидацией по поколениям.
+
+    В ключ выборки входят общее поколение и поколение пользователя.
+    Новая публикация меняет общее поколение, голос - поколение
+    проголосовавшего пользователя, после чего прежние выборки больше
+    не читаются и вытесняются по TTL. Свой голос пользователь видит
+    сразу, а счетчики голосов у чужих публикаций отстают не больше
+    чем на `ttl`.
+    """
+
+    def __init__(self, backend: ICache, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def get(
+        self, user_id: int | None, params: Tuple[Any, ...]
+    ) -> Tuple[str, Any]:
+        """Ключ выборки с параметрами `params` и значение по нему, если есть"""
+        user_id = user_id or 0
+        global_generation, user_generation = await self.backend.get_many(
+            [GLOBAL_GENERATION, self._user_generation(user_id)]
+        )
+        parts = (global_generation or 0, user_generation or 0, user_id, *params)
+        key = "selection:" + ":".join(map(str, parts))
+        (value,) = await self.backend.get_many([key])
+        lookups_counter.inc(result=MISS if value is None else HIT)
+        return key, value
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.backend.set(key, value, self.ttl)
+
+    def invalidate_on_commit(
+        self, session: AsyncSession, user_ids: Iterable[int] | None = None
+    ) -> None:
+        """
+        Смена поколения после фиксации транзакции: общего, если
+        `user_ids` не переданы, иначе каждого из пользователей.
+        """
+        keys = (
+            [GLOBAL_GENERATION]
+            if user_ids is None
+            else [self._user_generation(user_id) for user_id in set(user_ids)]
+        )
+        event.listen(
+            session.sync_session,
+            "after_commit",
+            lambda _: self._schedule(keys),
+            once=True,
+        )
+
+    def _schedule(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            # Поколение хранится дольше выборок: иначе выборка, записанная
+            # под старым поколением во время смены, стала бы снова видна
+            task = asyncio.get_running_loop().create_task(
+                self.backend.set(key, uuid4().hex, self.ttl * 2)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _user_generation(user_id: int) -> str:
+        return f"selection:generation:{user_id}"
+
+
+class CachedPublicationRepo(PublicationRepo):
+    """Выборки публикаций читаются через `SelectionCache`"""
+
+    def __init__(self, counter: CachedValue[int], cache: SelectionCache) -> None:
+        super().__init__(counter)
+        self.cache = cache
+
+    async def _page(
+        self,
+        session: AsyncSession,
+        user_id: int | None,
+        size: int,
+        page: int | None,
+        cursor: str | None,
+        count: CountMode,
+    ) -> PublicationsSelectionData:
+        """
+        Страница до наложения голосов: страница в порядке `LATEST`
+        запрашивается без пользователя и хранится одна для всех.
+        """
+        key, selection = await self.cache.get(
+            user_id, (size, page or 0, count.value, cursor or "")
+        )
+        if selection is not None:
+            return selection
+        selection = await super()._page(session, user_id, size, page, cursor, count)
+        await self.cache.set(key, selection)
+        return selection
+
+    def _on_created(self, session: AsyncSession) -> None:
+        super()._on_created(session)
+        self.cache.invalidate_on_commit(session)
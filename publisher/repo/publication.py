@@ -1,17 +1,27 @@
-from dataclasses import asdict
+import math
+from dataclasses import asdict, replace
+from datetime import datetime
+from typing import AsyncIterator, Collection, Dict, List, Sequence, Set, Tuple
 
-from sqlalchemy import and_, select, Result
+from sqlalchemy import Integer, and_, any_, case, exists, func, literal, null, select
+from sqlalchemy import Row, Select, event, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi_pagination.ext.sqlalchemy import paginate
-from fastapi_pagination.default import Params
 
 from config import settings
+from config.i18n import _
 from models.publication import Publication
 from models.vote import Vote
+from services.entries import CountMode, SelectionOrder
+from services.publications.entries import (
+    CreatePublicationData,
+    PublicationsSelectionData,
+)
 from services.repo import IPublicationRepo
 from schemas.publication import PublicationSchema
-from services.publications.entries import CreatePublicationData
-from utils.repo import pagination_transformer
+from utils.cache import CachedValue
+from utils.exceptions import Custom400Exception
+from utils.repo import pagination_transformer, encode_cursor, decode_cursor
 from utils.types import PublicationType
 from utils.decorators import handle_orm_error, row_to_model
 
@@ -19,16 +29,93 @@ from utils.decorators import handle_orm_error, row_to_model
 class PublicationRepo(IPublicationRepo):
     model = Publication
 
+    def __init__(self, counter: CachedValue[int]) -> None:
+        self.counter = counter
+
     @handle_orm_error
     async def create(
         self, session: AsyncSession, user_id: int, entry: CreatePublicationData
     ) -> PublicationType:
+        """
+        Создание публикации. Если публикация с тем же контентом уже есть,
+        новая строка не создается и возвращается существующая.
+        """
         entry.type = entry.type.value
-        publication = self.model(user_id=user_id, **asdict(entry))
-        session.add(publication)
-        await session.flush([publication])
-        await session.refresh(publication)
-        return publication
+        table = self.model.__table__
+        result = await session.execute(
+            insert(table)
+            .values(user_id=user_id, **asdict(entry))
+            .on_conflict_do_nothing(index_elements=["type", "canonical_id"])
+            .returning(*table.c)
+        )
+        publication = result.one_or_none()
+        if publication is not None:
+            self._on_created(session)
+            return publication
+
+        result = await session.execute(
+            select(*table.c).where(
+                table.c.type == entry.type,
+                table.c.canonical_id == entry.canonical_id,
+            )
+        )
+        return result.one()
+
+    @handle_orm_error
+    async def create_many(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        entries: Sequence[CreatePublicationData],
+    ) -> List[PublicationType]:
+        """
+        Создание публикаций одним запросом, результат возвращается
+        в порядке `entries`.
+
+        Для контента, который уже есть в базе или повторяется
+        в `entries`, возвращается одна и та же публикация.
+        """
+        if not entries:
+            return []
+        table = self.model.__table__
+        unique: Dict[Tuple[str, str], CreatePublicationData] = {}
+        for entry in entries:
+            unique.setdefault((entry.type.value, entry.canonical_id), entry)
+        # Sorted rows take unique index locks in the same order in every
+        # batch, so overlapping batches wait for each other instead of deadlocking
+        result = await session.execute(
+            insert(table)
+            .values(
+                [
+                    {
+                        "user_id": user_id,
+                        "url": entry.url,
+                        "type": content_type,
+                        "canonical_id": canonical_id,
+                    }
+                    for (content_type, canonical_id), entry in sorted(unique.items())
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["type", "canonical_id"])
+            .returning(*table.c)
+        )
+        publications: Dict[Tuple[str, str], PublicationType] = {
+            (row.type, row.canonical_id): row for row in result.all()
+        }
+        if publications:
+            self._on_created(session)
+
+        missing = [key for key in unique if key not in publications]
+        if missing:
+            result = await session.execute(
+                select(*table.c).where(
+                    tuple_(table.c.type, table.c.canonical_id).in_(missing)
+                )
+            )
+            publications.update(
+                ((row.type, row.canonical_id), row) for row in result.all()
+            )
+        return [publications[(e.type.value, e.canonical_id)] for e in entries]
 
     @handle_orm_error
     async def selection(
@@ -37,12 +124,246 @@ class PublicationRepo(IPublicationRepo):
         user_id: int | None,
         size: int | None,
         page: int | None,
-    ) -> Result[Publication]:
+        cursor: str | None = None,
+        count: CountMode = CountMode.EXACT,
+        order: SelectionOrder = SelectionOrder.RANKED,
+    ) -> PublicationsSelectionData:
+        """
+        Страница публикаций с голосами пользователя.
+
+        В порядке `RANKED` страница своя у каждого пользователя.
+        В порядке `LATEST` страница одна для всех, голоса пользователя
+        накладываются на нее отдельным запросом по ее публикациям.
+        """
         size = size or settings.PAGINATION_DEFAULT_PAGE_SIZE
-        page = page or settings.PAGINATION_DEFAULT_PAGE
-        return await paginate(
-            conn=session,
-            query=select(
+        if order is SelectionOrder.LATEST:
+            selection = await self._page(session, None, size, page, cursor, count)
+            return await self._with_believed(session, user_id, selection)
+        return await self._page(session, user_id, size, page, cursor, count)
+
+    @handle_orm_error
+    async def stream(
+        self, session: AsyncSession, user_id: int | None, after_id: int | None = None
+    ) -> AsyncIterator[Row]:
+        """
+        Все публикации по возрастанию `id`, начиная после `after_id`.
+
+        Строки читаются серверным курсором пачками по
+        `PUBLICATION_STREAM_BATCH_SIZE`, поэтому память не зависит от
+        размера выборки. Курсору нужна транзакция, поэтому она открывается
+        и в read-only сессии, с REPEATABLE READ для согласованного снимка.
+        """
+        await session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+        query = self._stream_query(user_id)
+        if after_id is not None:
+            query = query.where(self.model.id > after_id)
+        result = await session.stream(
+            query.execution_options(yield_per=settings.PUBLICATION_STREAM_BATCH_SIZE)
+        )
+        async for row in result:
+            yield row
+
+    @handle_orm_error
+    async def count(
+        self, session: AsyncSession, mode: CountMode = CountMode.EXACT
+    ) -> int | None:
+        """
+        Общее количество публикаций.
+
+        Выборка соединяется с голосами только одного пользователя
+        по уникальному ключу, поэтому ее размер равен числу публикаций
+        и может быть взят из кеша или статистики планировщика.
+        """
+        if mode == CountMode.NONE:
+            return None
+        if mode == CountMode.ESTIMATED:
+            estimate = await self._estimated_count(session)
+            if estimate is not None:
+                return estimate
+        if mode == CountMode.CACHED:
+            cached = self.counter.get()
+            if cached is not None:
+                return cached
+
+        total = await self._exact_count(session)
+        self.counter.set(total)
+        return total
+
+    @handle_orm_error
+    @row_to_model()
+    async def get_by_id(
+        self, session: AsyncSession, publication_id: int
+    ) -> Publication | None:
+        result = await session.execute(
+            select(self.model).filter(self.model.id == publication_id)
+        )
+        return result.first()
+
+    @handle_orm_error
+    async def existing_ids(
+        self, session: AsyncSession, publication_ids: Collection[int]
+    ) -> Set[int]:
+        """Идентификаторы существующих публикаций из `publication_ids`"""
+        if not publication_ids:
+            return set()
+        result = await session.execute(
+            select(self.model.id).where(
+                self.model.id == any_(literal(list(publication_ids), ARRAY(Integer)))
+            )
+        )
+        return set(result.scalars())
+
+    def _on_created(self, session: AsyncSession) -> None:
+        """
+        Вызывается, если запрос создал хотя бы одну публикацию.
+
+        Счетчик сбрасывается после фиксации: до нее параллельный запрос
+        сохранил бы в него количество без новых публикаций.
+        """
+        event.listen(
+            session.sync_session,
+            "after_commit",
+            lambda _: self.counter.invalidate(),
+            once=True,
+        )
+
+    async def _page(
+        self,
+        session: AsyncSession,
+        user_id: int | None,
+        size: int,
+        page: int | None,
+        cursor: str | None,
+        count: CountMode,
+    ) -> PublicationsSelectionData:
+        if cursor is not None:
+            selection = await self._keyset_selection(session, user_id, size, cursor)
+        else:
+            page = page or settings.PAGINATION_DEFAULT_PAGE
+            selection = await self._offset_selection(session, user_id, size, page)
+
+        selection.total = await self.count(session, count)
+        if selection.total is not None:
+            selection.pages = math.ceil(selection.total / size)
+        return selection
+
+    async def _with_believed(
+        self,
+        session: AsyncSession,
+        user_id: int | None,
+        selection: PublicationsSelectionData,
+    ) -> PublicationsSelectionData:
+        """
+        Копия страницы с голосами пользователя `user_id`.
+
+        Страница может быть общей для всех пользователей, поэтому
+        не изменяется.
+        """
+        if not user_id or not selection.items:
+            return selection
+        result = await session.execute(
+            select(Vote.publication_id, Vote.believed).where(
+                Vote.user_id == user_id,
+                Vote.publication_id
+                == any_(literal([item.id for item in selection.items], ARRAY(Integer))),
+            )
+        )
+        believed = dict(result.tuples().all())
+        if not believed:
+            return selection
+        return replace(
+            selection,
+            items=tuple(
+                replace(item, believed=believed[item.id])
+                if item.id in believed
+                else item
+                for item in selection.items
+            ),
+        )
+
+    async def _offset_selection(
+        self, session: AsyncSession, user_id: int | None, size: int, page: int
+    ) -> PublicationsSelectionData:
+        result = await session.execute(
+            self._selection_query(user_id).limit(size).offset((page - 1) * size)
+        )
+        return PublicationsSelectionData(
+            items=pagination_transformer(PublicationSchema)(result.all()),
+            size=size,
+            page=page,
+        )
+
+    async def _keyset_selection(
+        self, session: AsyncSession, user_id: int | None, size: int, cursor: str
+    ) -> PublicationsSelectionData:
+        """
+        Выборка страницы по ключу сортировки последней записи предыдущей
+        страницы вместо OFFSET.
+
+        Выборка пользователя проходит по частям из `_segments`, каждая
+        из которых читается по индексу в порядке `(created_at, id)`,
+        поэтому стоимость страницы не зависит от глубины. Курсор хранит
+        номер части и ключ последней записи, пустой курсор означает
+        первую страницу.
+        """
+        segments = self._segments(user_id)
+        segment, key = 0, None
+        if cursor:
+            segment, created_at, publication_id = decode_cursor(cursor, length=3)
+            try:
+                segment = int(segment)
+                key = (datetime.fromisoformat(created_at), int(publication_id))
+            except (TypeError, ValueError):
+                raise Custom400Exception(_("Invalid cursor."))
+            if not 0 <= segment < len(segments):
+                raise Custom400Exception(_("Invalid cursor."))
+
+        rows: List[Tuple[int, Row]] = []
+        for index in range(segment, len(segments)):
+            query = segments[index]
+            if index == segment and key is not None:
+                query = query.filter(
+                    tuple_(self.model.created_at, self.model.id) < tuple_(*key)
+                )
+            result = await session.execute(query.limit(size + 1 - len(rows)))
+            rows.extend((index, row) for row in result.all())
+            if len(rows) > size:
+                break
+
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            index, last = rows[-1]
+            next_cursor = encode_cursor(index, last.created_at.isoformat(), last.id)
+        return PublicationsSelectionData(
+            items=pagination_transformer(PublicationSchema)(row for _, row in rows),
+            size=size,
+            next_cursor=next_cursor,
+        )
+
+    async def _exact_count(self, session: AsyncSession) -> int:
+        result = await session.execute(select(func.count()).select_from(self.model))
+        return result.scalar_one()
+
+    async def _estimated_count(self, session: AsyncSession) -> int | None:
+        result = await session.execute(
+            text(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = CAST(:table AS regclass)"
+            ),
+            {"table": self.model.__table__.name},
+        )
+        estimate = result.scalar_one_or_none()
+        # -1 until the table has been vacuumed or analyzed at least once
+        if estimate is None or estimate < 0:
+            return None
+        return estimate
+
+    def _stream_query(self, user_id: int | None) -> Select:
+        return (
+            select(
                 self.model.id,
                 self.model.url,
                 self.model.type,
@@ -55,18 +376,75 @@ class PublicationRepo(IPublicationRepo):
                 Vote,
                 and_(Vote.publication_id == self.model.id, Vote.user_id == user_id),
             )
-            .add_columns(Vote.believed)
-            .order_by(Vote.believed.desc()),
-            params=Params(page=page, size=size),
-            transformer=pagination_transformer(PublicationSchema),
+            .order_by(self.model.id)
         )
 
-    @handle_orm_error
-    @row_to_model()
-    async def get_by_id(
-        self, session: AsyncSession, publication_id: int
-    ) -> Publication | None:
-        result = await session.execute(
-            select(self.model).filter(self.model.id == publication_id)
+    def _selection_query(self, user_id: int | None) -> Select:
+        """
+        Запрос страницы для OFFSET: без пользователя - от новых к старым,
+        иначе сначала публикации без его голоса, затем те, которым
+        он верит, затем остальные.
+        """
+        if not user_id:
+            return self._latest_query()
+        believed_rank = self._believed_rank()
+        return (
+            select(*self._columns(), Vote.believed)
+            .outerjoin(
+                Vote,
+                and_(Vote.publication_id == self.model.id, Vote.user_id == user_id),
+            )
+            .order_by(
+                believed_rank.desc(),
+                self.model.created_at.desc(),
+                self.model.id.desc(),
+            )
+        )
+
+    def _segments(self, user_id: int | None) -> List[Select]:
+        """
+        Части выборки в порядке `_selection_query`, каждая отсортирована
+        по `(created_at, id)` и читается по индексу: публикации без голоса
+        пользователя - антиджойном по индексу `created_at`, с голосом -
+        по индексу голосов пользователя.
+        """
+        if not user_id:
+            return [self._latest_query()]
+        voted = and_(Vote.publication_id == self.model.id, Vote.user_id == user_id)
+        order = (self.model.created_at.desc(), self.model.id.desc())
+        return [
+            self._latest_query().where(
+                ~exists().where(voted, Vote.believed.is_not(None))
+            ),
+            *(
+                select(*self._columns(), Vote.believed)
+                .join(Vote, voted)
+                .where(Vote.believed.is_(believed))
+                .order_by(*order)
+                for believed in (True, False)
+            ),
+        ]
+
+    def _latest_query(self) -> Select:
+        return select(*self._columns(), null().label("believed")).order_by(
+            self.model.created_at.desc(), self.model.id.desc()
+        )
+
+    def _columns(self) -> tuple:
+        return (
+            self.model.id,
+            self.model.url,
+            self.model.type,
+            self.model.believed_count,
+            self.model.disbelieved_count,
+            self.model.created_at,
+        )
+
+    @staticmethod
+    def _believed_rank():
+        # Same order as `believed DESC` in PostgreSQL (NULLS FIRST)
+        return case(
+            (Vote.believed.is_(None), 2),
+            (Vote.believed.is_(True), 1),
+            else_=0,
         )
-        return result.first()
@@ -1,47 +1,275 @@
-from sqlalchemy import select, update
+from typing import Iterable, List, Sequence, Tuple
+
+from sqlalchemy import Boolean, Integer, Select, and_, any_, cast, column, func
+from sqlalchemy import literal, select, update, values
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from services.entries import VoteData
 from services.repo import IVoteRepo
+from models.publication import Publication
 from models.vote import Vote
 from utils.types import VoteType
-from utils.decorators import handle_orm_error, row_to_model
+from utils.decorators import handle_orm_error
+
+from .cache import SelectionCache
+
+
+async def lock_publications(
+    session: AsyncSession, publication_ids: Iterable[int]
+) -> None:
+    """
+    Блокировка строк публикаций до конца транзакции в порядке `id`.
+
+    Порядок, в котором `UPDATE` счетчиков обходит строки, зависит
+    от плана запроса, поэтому пакеты с общими публикациями блокируют
+    их заранее в одном порядке и не вызывают deadlock.
+    """
+    publication = Publication.__table__
+    await session.execute(
+        select(publication.c.id)
+        .where(
+            publication.c.id
+            == any_(literal(sorted(set(publication_ids)), ARRAY(Integer)))
+        )
+        .order_by(publication.c.id)
+        .with_for_update(key_share=True)
+    )
 
 
 class VoteRepo(IVoteRepo):
     model = Vote
 
-    @handle_orm_error
-    @row_to_model()
-    async def get(
-        self, session: AsyncSession, user_id: int, publication_id: int
-    ) -> VoteType | None:
-        result = await session.execute(
-            select(self.model).filter(
-                Vote.user_id == user_id, Vote.publication_id == publication_id
-            )
-        )
-        return result.first()
+    def __init__(self, cache: SelectionCache | None = None) -> None:
+        self.cache = cache
 
     @handle_orm_error
-    async def create(
+    async def upsert(
         self,
         session: AsyncSession,
         user_id: int,
         publication_id: int,
         believed: bool | None,
-    ) -> VoteType:
-        vote = self.model(
-            user_id=user_id, publication_id=publication_id, believed=believed
+    ) -> VoteType | None:
+        """
+        Создание или изменение голоса и пересчет счетчиков публикации
+        одним запросом.
+
+        Возвращает `None`, если публикация не существует.
+        """
+        await self._lock(session, [(publication_id, user_id)])
+        result = await session.execute(
+            self._upsert_statement(user_id, publication_id, believed)
         )
-        session.add(vote)
-        await session.flush([vote])
-        await session.refresh(vote)
+        vote = result.first()
+        if vote is not None:
+            self._on_voted(session, [user_id])
         return vote
 
     @handle_orm_error
-    async def update(
-        self, session: AsyncSession, vote_id: int, believed: bool | None
-    ) -> None:
+    async def upsert_many(
+        self, session: AsyncSession, votes: Sequence[VoteData]
+    ) -> List[VoteType]:
+        """
+        Создание или изменение голосов и пересчет счетчиков их публикаций
+        одним запросом.
+
+        Публикации должны существовать, пара (публикация, пользователь)
+        не должна повторяться.
+        """
+        if not votes:
+            return []
+        await self._lock(
+            session, ((item.publication_id, item.user_id) for item in votes)
+        )
+        await lock_publications(session, (item.publication_id for item in votes))
+        result = await session.execute(self._upsert_many_statement(votes))
+        upserted = result.all()
+        self._on_voted(session, [vote.user_id for vote in upserted])
+        return upserted
+
+    def _on_voted(self, session: AsyncSession, user_ids: Sequence[int]) -> None:
+        """Вызывается после записи голосов пользователей `user_ids`"""
+        if self.cache is not None and user_ids:
+            self.cache.invalidate_on_commit(session, user_ids)
+
+    @staticmethod
+    async def _lock(session: AsyncSession, pairs: Iterable[Tuple[int, int]]) -> None:
+        """
+        Блокировка пар (публикация, пользователь) до конца транзакции.
+
+        Запрос upsert вычисляет изменение счетчиков по снимку, сделанному
+        до его выполнения, и не видит голос параллельной незафиксированной
+        транзакции. Под блокировкой следующий запрос (READ COMMITTED)
+        получает новый снимок, в котором этот голос уже зафиксирован.
+        Пары блокируются в одном порядке, чтобы пакеты не вызывали deadlock.
+        """
+        pairs = values(
+            column("publication_id", Integer), column("user_id", Integer), name="pairs"
+        ).data(sorted(pairs))
         await session.execute(
-            update(self.model).filter(Vote.id == vote_id).values(believed=believed)
+            select(func.pg_advisory_xact_lock(pairs.c.publication_id, pairs.c.user_id))
+        )
+
+    def _upsert_statement(
+        self,
+        user_id: int,
+        publication_id: int,
+        believed: bool | None,
+        counters: bool = True,
+    ) -> Select:
+        """
+        Запрос создания или изменения голоса.
+
+        Без `counters` счетчики публикации не изменяются, а вместо этого
+        возвращается прежнее значение голоса в `previous_believed`.
+        """
+        vote = self.model.__table__
+        publication = Publication.__table__
+
+        # Every CTE sees the snapshot taken before the statement,
+        # so this is the vote as it was before the upsert below;
+        # `_lock` keeps concurrent votes of the pair out of it.
+        previous = (
+            select(vote.c.believed)
+            .where(vote.c.publication_id == publication_id, vote.c.user_id == user_id)
+            .cte("previous")
+        )
+        previous_believed = select(previous.c.believed).scalar_subquery()
+        statement = insert(vote).from_select(
+            ["publication_id", "user_id", "believed"],
+            select(
+                publication.c.id,
+                literal(user_id, Integer),
+                literal(believed, Boolean),
+            ).where(publication.c.id == publication_id),
+        )
+        upserted = (
+            statement.on_conflict_do_update(
+                index_elements=[vote.c.publication_id, vote.c.user_id],
+                set_={"believed": statement.excluded.believed},
+            )
+            .returning(*vote.c)
+            .cte("upserted")
+        )
+        if not counters:
+            return select(upserted, previous_believed.label("previous_believed"))
+
+        counters_update = (
+            update(publication)
+            .where(publication.c.id == upserted.c.publication_id)
+            .values(
+                believed_count=publication.c.believed_count
+                + self._delta(
+                    upserted.c.believed.is_(True), previous_believed.is_(True)
+                ),
+                disbelieved_count=publication.c.disbelieved_count
+                + self._delta(
+                    upserted.c.believed.is_(False), previous_believed.is_(False)
+                ),
+            )
+            .returning(publication.c.id)
+            .cte("counters")
+        )
+        return select(upserted).add_cte(counters_update)
+
+    def _upsert_many_statement(
+        self, votes: Sequence[VoteData], counters: bool = True
+    ) -> Select:
+        """
+        Запрос создания или изменения нескольких голосов, аналог
+        `_upsert_statement`. Счетчики каждой публикации изменяются
+        один раз на сумму изменений всех ее голосов, строки публикаций
+        должны быть заблокированы `lock_publications`.
+        """
+        vote = self.model.__table__
+        publication = Publication.__table__
+
+        rows = select(
+            values(
+                column("publication_id", Integer),
+                column("user_id", Integer),
+                column("believed", Boolean),
+                name="batch_rows",
+            ).data(
+                sorted(
+                    (item.publication_id, item.user_id, item.believed)
+                    for item in votes
+                )
+            )
+        ).cte("batch")
+        previous = (
+            select(vote.c.publication_id, vote.c.user_id, vote.c.believed)
+            .join(
+                rows,
+                and_(
+                    vote.c.publication_id == rows.c.publication_id,
+                    vote.c.user_id == rows.c.user_id,
+                ),
+            )
+            .cte("previous")
+        )
+        # A column of VALUES with only NULLs is typed as text
+        statement = insert(vote).from_select(
+            ["publication_id", "user_id", "believed"],
+            select(
+                cast(rows.c.publication_id, Integer),
+                cast(rows.c.user_id, Integer),
+                cast(rows.c.believed, Boolean),
+            ),
+        )
+        upserted = (
+            statement.on_conflict_do_update(
+                index_elements=[vote.c.publication_id, vote.c.user_id],
+                set_={"believed": statement.excluded.believed},
+            )
+            .returning(*vote.c)
+            .cte("upserted")
+        )
+        with_previous = upserted.outerjoin(
+            previous,
+            and_(
+                previous.c.publication_id == upserted.c.publication_id,
+                previous.c.user_id == upserted.c.user_id,
+            ),
         )
+        if not counters:
+            return select(
+                upserted, previous.c.believed.label("previous_believed")
+            ).select_from(with_previous)
+
+        deltas = (
+            select(
+                upserted.c.publication_id,
+                func.sum(
+                    self._delta(
+                        upserted.c.believed.is_(True), previous.c.believed.is_(True)
+                    )
+                ).label("believed_delta"),
+                func.sum(
+                    self._delta(
+                        upserted.c.believed.is_(False), previous.c.believed.is_(False)
+                    )
+                ).label("disbelieved_delta"),
+            )
+            .select_from(with_previous)
+            .group_by(upserted.c.publication_id)
+            .cte("deltas")
+        )
+        counters_update = (
+            update(publication)
+            .where(publication.c.id == deltas.c.publication_id)
+            .values(
+                believed_count=publication.c.believed_count + deltas.c.believed_delta,
+                disbelieved_count=publication.c.disbelieved_count
+                + deltas.c.disbelieved_delta,
+            )
+            .returning(publication.c.id)
+            .cte("counters")
+        )
+        return select(upserted).add_cte(counters_update)
+
+    @staticmethod
+    def _delta(current, before):
+        # NULL IS TRUE/FALSE is false, so a missing previous vote counts as 0
+        return cast(current, Integer) - cast(before, Integer)
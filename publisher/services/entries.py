@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from enum import Enum
 
 
@@ -6,3 +7,27 @@ class ContentType(str, Enum):
     VK = "VK"
     TIKTOK = "TIKTOK"
     TWITCH = "TWITCH"
+
+
+class CountMode(str, Enum):
+    EXACT = "EXACT"
+    CACHED = "CACHED"
+    ESTIMATED = "ESTIMATED"
+    NONE = "NONE"
+
+
+class SelectionOrder(str, Enum):
+    RANKED = "RANKED"
+    LATEST = "LATEST"
+
+
+@dataclass
+class VoteData:
+    user_id: int
+    publication_id: int
+    believed: bool | None
+
+
+@dataclass
+class VoteResultData:
+    detail: str | None = None
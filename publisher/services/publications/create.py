@@ -1,15 +1,22 @@
 from abc import ABC, abstractmethod
+from typing import List, Sequence
 
+from pydantic import HttpUrl, TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config import settings
 from config.i18n import _
 from schemas import CreatePublicationSchema
 from utils.types import PublicationType
-from utils.domains import get_content_type
+from utils.canonical import canonicalize
+from utils.domains import classify_many, get_content_type
 from utils.exceptions import Custom400Exception
 
 from ..repo import IPublicationRepo
-from .entries import CreatePublicationData, PublicationData
+from .entries import CreatePublicationData, CreatePublicationResultData, PublicationData
+
+
+_url_adapter = TypeAdapter(HttpUrl)
 
 
 class ICreatePublication(ABC):
@@ -18,6 +25,11 @@ class ICreatePublication(ABC):
         self, session: AsyncSession, user_id: int, schema: CreatePublicationSchema
     ) -> PublicationData: ...
 
+    @abstractmethod
+    async def many(
+        self, session: AsyncSession, user_id: int, urls: Sequence[str]
+    ) -> List[CreatePublicationResultData]: ...
+
 
 class CreatePublication(ICreatePublication):
     def __init__(self, repo: IPublicationRepo) -> None:
@@ -31,6 +43,61 @@ class CreatePublication(ICreatePublication):
         publication = await self._create(session, user_id, schema)
         return self._to_schema(publication)
 
+    async def many(
+        self, session: AsyncSession, user_id: int, urls: Sequence[str]
+    ) -> List[CreatePublicationResultData]:
+        """
+        Создание публикаций пачкой: ссылки проверяются и классифицируются
+        без обращения к базе, корректные записываются одним запросом.
+        Ошибка в отдельной ссылке возвращается в `detail` ее элемента
+        и не прерывает остальные.
+        """
+        if len(urls) > settings.PUBLICATION_BATCH_MAX_SIZE:
+            raise Custom400Exception(_("Too many publications in one request."))
+        results = [CreatePublicationResultData() for _url in urls]
+        cleaned = self._clean_many(urls, results)
+        entries = self._to_entries(cleaned, results)
+
+        publications = await self._create_many(
+            session, user_id, [entry for _index, entry in entries]
+        )
+        for (index, _entry), publication in zip(entries, publications):
+            results[index].publication = self._to_schema(publication)
+        return results
+
+    def _clean_many(
+        self, urls: Sequence[str], results: List[CreatePublicationResultData]
+    ) -> List[tuple[int, str]]:
+        cleaned = []
+        for index, url in enumerate(urls):
+            try:
+                cleaned.append((index, str(_url_adapter.validate_python(url))))
+            except ValidationError:
+                results[index].detail = _("Invalid URL.")
+        return cleaned
+
+    def _to_entries(
+        self,
+        cleaned: List[tuple[int, str]],
+        results: List[CreatePublicationResultData],
+    ) -> List[tuple[int, CreatePublicationData]]:
+        types = classify_many(url for _index, url in cleaned)
+        entries = []
+        for (index, url), type in zip(cleaned, types):
+            if type is None:
+                results[index].detail = _("Platform is not supported.")
+                continue
+            canonical = canonicalize(url, type)
+            entries.append(
+                (
+                    index,
+                    CreatePublicationData(
+                        url=canonical.url, type=type, canonical_id=canonical.id
+                    ),
+                )
+            )
+        return entries
+
     def _clean(self, schema: CreatePublicationSchema) -> CreatePublicationSchema:
         schema.url = str(schema.url)
         return schema
@@ -39,13 +106,24 @@ class CreatePublication(ICreatePublication):
         type = get_content_type(schema.url)
         if type is None:
             raise Custom400Exception(_("Platform is not supported."))
-        return CreatePublicationData(url=schema.url, type=type)
+        canonical = canonicalize(schema.url, type)
+        return CreatePublicationData(
+            url=canonical.url, type=type, canonical_id=canonical.id
+        )
 
     async def _create(
         self, session: AsyncSession, user_id: int, entry: CreatePublicationData
     ) -> PublicationType:
         return await self.repo.create(session, user_id, entry)
 
+    async def _create_many(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        entries: Sequence[CreatePublicationData],
+    ) -> List[PublicationType]:
+        return await self.repo.create_many(session, user_id, entries)
+
     def _to_schema(self, publication: PublicationType) -> PublicationData:
         return PublicationData(
             id=publication.id,
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Any, Sequence
 
 from ..entries import ContentType
 
@@ -7,6 +8,7 @@ from ..entries import ContentType
 class CreatePublicationData:
     url: str
     type: ContentType
+    canonical_id: str
 
 
 @dataclass
@@ -17,3 +19,19 @@ class PublicationData:
     believed_count: int
     disbelieved_count: int
     created_at: str
+
+
+@dataclass
+class CreatePublicationResultData:
+    publication: PublicationData | None = None
+    detail: str | None = None
+
+
+@dataclass
+class PublicationsSelectionData:
+    items: Sequence[Any]
+    size: int
+    total: int | None = None
+    page: int | None = None
+    pages: int | None = None
+    next_cursor: str | None = None
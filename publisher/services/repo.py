@@ -1,13 +1,15 @@
 from abc import abstractmethod
+from typing import AsyncIterator, Collection, List, Sequence, Set
 
-from sqlalchemy import Result
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.publication import Publication
 from utils.repo import IRepo
 from utils.types import PublicationType, VoteType
 
-from .publications.entries import CreatePublicationData
+from .entries import CountMode, SelectionOrder, VoteData
+from .publications.entries import CreatePublicationData, PublicationsSelectionData
 
 
 class IPublicationRepo(IRepo):
@@ -16,6 +18,14 @@ class IPublicationRepo(IRepo):
         self, session: AsyncSession, user_id: int, entry: CreatePublicationData
     ) -> PublicationType: ...
 
+    @abstractmethod
+    async def create_many(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        entries: Sequence[CreatePublicationData],
+    ) -> List[PublicationType]: ...
+
     @abstractmethod
     async def selection(
         self,
@@ -23,30 +33,43 @@ class IPublicationRepo(IRepo):
         user_id: int | None,
         size: int | None,
         page: int | None,
-    ) -> Result[Publication]: ...
+        cursor: str | None = None,
+        count: CountMode = CountMode.EXACT,
+        order: SelectionOrder = SelectionOrder.RANKED,
+    ) -> PublicationsSelectionData: ...
+
+    @abstractmethod
+    def stream(
+        self, session: AsyncSession, user_id: int | None, after_id: int | None = None
+    ) -> AsyncIterator[Row]: ...
+
+    @abstractmethod
+    async def count(
+        self, session: AsyncSession, mode: CountMode = CountMode.EXACT
+    ) -> int | None: ...
 
     @abstractmethod
     async def get_by_id(
         self, session: AsyncSession, publication_id: int
     ) -> Publication | None: ...
 
-
-class IVoteRepo(IRepo):
     @abstractmethod
-    async def get(
-        self, session: AsyncSession, user_id: int, publication_id: int
-    ) -> VoteType | None: ...
+    async def existing_ids(
+        self, session: AsyncSession, publication_ids: Collection[int]
+    ) -> Set[int]: ...
 
+
+class IVoteRepo(IRepo):
     @abstractmethod
-    async def create(
+    async def upsert(
         self,
         session: AsyncSession,
         user_id: int,
         publication_id: int,
         believed: bool | None,
-    ) -> VoteType: ...
+    ) -> VoteType | None: ...
 
     @abstractmethod
-    async def update(
-        self, session: AsyncSession, vote_id: int, believed: bool | None
-    ) -> None: ...
+    async def upsert_many(
+        self, session: AsyncSession, votes: Sequence[VoteData]
+    ) -> List[VoteType]: ...
@@ -1,10 +1,14 @@
 from abc import ABC, abstractmethod
+from typing import Dict, List, Sequence, Set, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config import settings
 from config.i18n import _
 from schemas import VoteSchema
-from services.repo import IVoteRepo, IPublicationRepo
+from services.entries import VoteData, VoteResultData
+from services.repo import IPublicationRepo, IVoteRepo
+from utils.exceptions import Custom400Exception
 from utils.types import VoteType
 from utils.shortcuts import get_object_or_404
 
@@ -19,6 +23,11 @@ class IVote(ABC):
         schema: VoteSchema,
     ) -> None: ...
 
+    @abstractmethod
+    async def many(
+        self, session: AsyncSession, votes: Sequence[VoteData]
+    ) -> List[VoteResultData]: ...
+
 
 class Vote(IVote):
     def __init__(self, repo: IVoteRepo, publication_repo: IPublicationRepo) -> None:
@@ -32,36 +41,54 @@ class Vote(IVote):
         publication_id: int,
         schema: VoteSchema,
     ) -> None:
-        await self._validate_publication_id(session, publication_id)
-        vote = await self._get(session, user_id, publication_id)
-        if vote:
-            await self._update(session, vote, schema)
-        else:
-            await self._create(session, user_id, publication_id, schema)
-
-    async def _validate_publication_id(
-        self, session: AsyncSession, publication_id: int
-    ) -> None:
-        get_object_or_404(
-            await self.publication_repo.get_by_id(session, publication_id),
-            msg=_("Publication not found."),
-        )
-
-    async def _get(
-        self, session: AsyncSession, user_id: int, publication_id: int
-    ) -> VoteType | None:
-        return await self.repo.get(session, user_id, publication_id)
+        vote = await self._upsert(session, user_id, publication_id, schema)
+        get_object_or_404(vote, msg=_("Publication not found."))
 
-    async def _create(
+    async def _upsert(
         self,
         session: AsyncSession,
         user_id: int,
         publication_id: int,
         schema: VoteSchema,
-    ) -> VoteType:
-        return await self.repo.create(session, user_id, publication_id, schema.believed)
+    ) -> VoteType | None:
+        return await self.repo.upsert(
+            session, user_id, publication_id, schema.believed
+        )
 
-    async def _update(
-        self, session: AsyncSession, vote: VoteType, schema: VoteSchema
-    ) -> None:
-        await self.repo.update(session, vote.id, schema.believed)
+    async def many(
+        self, session: AsyncSession, votes: Sequence[VoteData]
+    ) -> List[VoteResultData]:
+        """
+        Голосование пачкой: все голоса записываются одним запросом,
+        результат возвращается для каждого голоса в порядке запроса.
+
+        Если пользователь голосовал за публикацию несколько раз,
+        сохраняется последний голос.
+        """
+        if len(votes) > settings.VOTE_BATCH_MAX_SIZE:
+            raise Custom400Exception(_("Too many votes in one request."))
+        existing = await self._existing_publication_ids(session, votes)
+        latest: Dict[Tuple[int, int], VoteData] = {
+            (vote.publication_id, vote.user_id): vote
+            for vote in votes
+            if vote.publication_id in existing
+        }
+        await self._upsert_many(session, list(latest.values()))
+        return [
+            VoteResultData()
+            if vote.publication_id in existing
+            else VoteResultData(detail=_("Publication not found."))
+            for vote in votes
+        ]
+
+    async def _existing_publication_ids(
+        self, session: AsyncSession, votes: Sequence[VoteData]
+    ) -> Set[int]:
+        return await self.publication_repo.existing_ids(
+            session, {vote.publication_id for vote in votes}
+        )
+
+    async def _upsert_many(
+        self, session: AsyncSession, votes: Sequence[VoteData]
+    ) -> List[VoteType]:
+        return await self.repo.upsert_many(session, votes)
@@ -0,0 +1,65 @@
+import asyncio
+import gettext
+from unittest import mock
+
+import pytest
+
+from config import i18n
+from config.i18n import DEFAULT_LANGUAGE, _, activate_translation
+
+
+class Catalog(gettext.NullTranslations):
+    def gettext(self, message):
+        return f"ru:{message}"
+
+
+@pytest.fixture
+def catalogs():
+    with mock.patch.dict(i18n._catalogs, {"ru": Catalog()}, clear=True):
+        yield
+
+
+def test_default_language(catalogs):
+    assert _("Hello") == "Hello"
+
+
+def test_activate_translation(catalogs):
+    token = activate_translation("ru")
+    try:
+        assert _("Hello") == "ru:Hello"
+    finally:
+        i18n._language.reset(token)
+
+
+def test_activate_unsupported_language(catalogs):
+    token = activate_translation("de")
+    try:
+        assert i18n._language.get() == DEFAULT_LANGUAGE
+    finally:
+        i18n._language.reset(token)
+
+
+def test_catalog_loaded_once():
+    with mock.patch.dict(i18n._catalogs, clear=True), mock.patch(
+        "config.i18n._load_catalog", return_value=Catalog()
+    ) as load:
+        token = activate_translation("ru")
+        try:
+            _("Hello")
+            _("World")
+        finally:
+            i18n._language.reset(token)
+
+        load.assert_called_once_with("ru")
+
+
+def test_language_is_isolated_between_tasks(catalogs):
+    async def translate(lang):
+        activate_translation(lang)
+        await asyncio.sleep(0)
+        return _("Hello")
+
+    async def main():
+        return await asyncio.gather(translate("ru"), translate("en"))
+
+    assert asyncio.run(main()) == ["ru:Hello", "Hello"]
@@ -0,0 +1,70 @@
+import importlib
+
+import pytest
+
+from config import settings
+
+
+@pytest.fixture
+def reload_settings(monkeypatch):
+    yield lambda: importlib.reload(settings)
+    monkeypatch.undo()
+    importlib.reload(settings)
+
+
+def test_selection_cache_memory_backend_single_worker(monkeypatch, reload_settings):
+    monkeypatch.setenv("SELECTION_CACHE_ENABLED", "1")
+    monkeypatch.setenv("SELECTION_CACHE_BACKEND", "memory")
+    monkeypatch.setenv("GRPC_WORKERS", "1")
+
+    assert reload_settings().SELECTION_CACHE_BACKEND == "memory"
+
+
+def test_selection_cache_memory_backend_many_workers(monkeypatch, reload_settings):
+    monkeypatch.setenv("SELECTION_CACHE_ENABLED", "1")
+    monkeypatch.setenv("SELECTION_CACHE_BACKEND", "memory")
+    monkeypatch.setenv("GRPC_WORKERS", "4")
+
+    with pytest.raises(RuntimeError):
+        reload_settings()
+
+
+def test_selection_cache_redis_backend_many_workers(monkeypatch, reload_settings):
+    monkeypatch.setenv("SELECTION_CACHE_ENABLED", "1")
+    monkeypatch.setenv("SELECTION_CACHE_BACKEND", "redis")
+    monkeypatch.setenv("GRPC_WORKERS", "4")
+
+    assert reload_settings().GRPC_WORKERS == 4
+
+
+def test_replicas_single_worker(monkeypatch, reload_settings):
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", "postgresql://replica/publisher")
+    monkeypatch.setenv("DB_READ_YOUR_WRITES_WINDOW", "5")
+    monkeypatch.setenv("GRPC_WORKERS", "1")
+
+    assert reload_settings().DATABASE_REPLICA_URLS == ["postgresql://replica/publisher"]
+
+
+def test_replicas_read_your_writes_many_workers(monkeypatch, reload_settings):
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", "postgresql://replica/publisher")
+    monkeypatch.setenv("DB_READ_YOUR_WRITES_WINDOW", "5")
+    monkeypatch.setenv("GRPC_WORKERS", "4")
+
+    with pytest.raises(RuntimeError):
+        reload_settings()
+
+
+def test_no_replicas_many_workers(monkeypatch, reload_settings):
+    monkeypatch.delenv("DATABASE_REPLICA_URLS", raising=False)
+    monkeypatch.setenv("DB_READ_YOUR_WRITES_WINDOW", "5")
+    monkeypatch.setenv("GRPC_WORKERS", "4")
+
+    assert reload_settings().DATABASE_REPLICA_URLS == []
+
+
+def test_replicas_without_read_your_writes(monkeypatch, reload_settings):
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", "postgresql://replica/publisher")
+    monkeypatch.setenv("DB_READ_YOUR_WRITES_WINDOW", "0")
+    monkeypatch.setenv("GRPC_WORKERS", "4")
+
+    assert reload_settings().DATABASE_REPLICA_URLS == ["postgresql://replica/publisher"]
@@ -0,0 +1,134 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+import grpc
+import pytest
+
+from grpc_services.interceptors import (
+    DETAIL,
+    ERROR,
+    OK,
+    MetricsInterceptor,
+    in_flight_gauge,
+    latency_histogram,
+    requests_counter,
+)
+
+
+class TestMetricsInterceptor:
+    def setup_method(self):
+        self.method = "test_method"
+        self.details = SimpleNamespace(method=f"/publisher.Publisher/{self.method}")
+        self.response = SimpleNamespace(detail=None)
+        self.behavior = mock.AsyncMock(return_value=self.response)
+        self.continuation = mock.AsyncMock(
+            return_value=grpc.unary_unary_rpc_method_handler(self.behavior)
+        )
+        self.interceptor = MetricsInterceptor()
+
+    def _call(self):
+        async def call():
+            handler = await self.interceptor.intercept_service(
+                self.continuation, self.details
+            )
+            return await handler.unary_unary(mock.Mock(), mock.Mock())
+
+        return asyncio.run(call())
+
+    def _handled(self, outcome):
+        return requests_counter.value(method=self.method, outcome=outcome)
+
+    def test_ok(self):
+        handled = self._handled(OK)
+        count = latency_histogram.count(method=self.method)
+
+        assert self._call() is self.response
+        assert self._handled(OK) == handled + 1
+        assert latency_histogram.count(method=self.method) == count + 1
+        assert in_flight_gauge.value(method=self.method) == 0
+
+    def test_detail(self):
+        self.response.detail = "Publication not found."
+        handled = self._handled(DETAIL)
+
+        self._call()
+
+        assert self._handled(DETAIL) == handled + 1
+
+    def test_error(self):
+        self.behavior.side_effect = ValueError
+        handled = self._handled(ERROR)
+
+        with pytest.raises(ValueError):
+            self._call()
+
+        assert self._handled(ERROR) == handled + 1
+        assert in_flight_gauge.value(method=self.method) == 0
+
+    def test_handler_wrapped_once(self):
+        self._call()
+        self._call()
+
+        self.continuation.assert_called_once()
+
+
+class TestMetricsInterceptorStream:
+    def setup_method(self):
+        self.method = "test_stream_method"
+        self.details = SimpleNamespace(method=f"/publisher.Publisher/{self.method}")
+        self.responses = [SimpleNamespace(detail=None) for _ in range(3)]
+        self.error = None
+
+        async def behavior(request, context):
+            for response in self.responses:
+                yield response
+            if self.error is not None:
+                raise self.error
+
+        self.continuation = mock.AsyncMock(
+            return_value=grpc.unary_stream_rpc_method_handler(behavior)
+        )
+        self.interceptor = MetricsInterceptor()
+
+    def _call(self):
+        async def call():
+            handler = await self.interceptor.intercept_service(
+                self.continuation, self.details
+            )
+            return [
+                response
+                async for response in handler.unary_stream(mock.Mock(), mock.Mock())
+            ]
+
+        return asyncio.run(call())
+
+    def _handled(self, outcome):
+        return requests_counter.value(method=self.method, outcome=outcome)
+
+    def test_ok(self):
+        handled = self._handled(OK)
+        count = latency_histogram.count(method=self.method)
+
+        assert self._call() == self.responses
+        assert self._handled(OK) == handled + 1
+        assert latency_histogram.count(method=self.method) == count + 1
+        assert in_flight_gauge.value(method=self.method) == 0
+
+    def test_detail(self):
+        self.responses[-1].detail = "Invalid cursor."
+        handled = self._handled(DETAIL)
+
+        self._call()
+
+        assert self._handled(DETAIL) == handled + 1
+
+    def test_error(self):
+        self.error = ValueError()
+        handled = self._handled(ERROR)
+
+        with pytest.raises(ValueError):
+            self._call()
+
+        assert self._handled(ERROR) == handled + 1
+        assert in_flight_gauge.value(method=self.method) == 0
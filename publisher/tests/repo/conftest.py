@@ -2,11 +2,8 @@ import subprocess
 
 from sqlalchemy.sql import text
 
-from config.di import get_di_test_container
 from models import mapper_registry
-
-
-container = get_di_test_container()
+from utils.test import RepoTestMixin
 
 
 def pytest_configure(config):
@@ -22,7 +19,11 @@ def pytest_unconfigure(config):
     """
     called before test process is exited.
     """
-    with container.db().session() as session:
+
+    async def truncate(session):
         for table in reversed(mapper_registry.metadata.sorted_tables):
-            session.execute(text(f"TRUNCATE {table.name} RESTART IDENTITY CASCADE;"))
-            session.commit()
+            await session.execute(
+                text(f"TRUNCATE {table.name} RESTART IDENTITY CASCADE;")
+            )
+
+    RepoTestMixin().run(truncate)
@@ -0,0 +1,175 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from repo.buffer import VoteCounterBuffer
+
+
+class TestVoteCounterBuffer:
+    def setup_method(self):
+        self.session = mock.AsyncMock()
+        self.sessions = 0
+
+        @asynccontextmanager
+        async def session():
+            self.sessions += 1
+            yield self.session
+
+        self.buffer = VoteCounterBuffer(
+            SimpleNamespace(session=session), flush_interval=60, max_events=100
+        )
+
+    def _run(self, func):
+        async def run():
+            try:
+                return await func()
+            finally:
+                if self.buffer._task is not None:
+                    self.buffer._task.cancel()
+
+        return asyncio.run(run())
+
+    def _statement(self):
+        (statement,), _ = self.session.execute.call_args
+        return statement.compile(dialect=postgresql.dialect())
+
+    def test_merge(self):
+        async def add():
+            self.buffer.add(1, 1, 0)
+            self.buffer.add(1, -1, 1)
+            self.buffer.add(2, 1, 0)
+            self.buffer.add(3, 0, 0)
+
+        self._run(add)
+
+        assert self.buffer._deltas == {1: [0, 1], 2: [1, 0]}
+        assert self.buffer._events == 3
+
+    def test_flush(self):
+        async def flush():
+            self.buffer.add(2, 1, 0)
+            self.buffer.add(1, 0, -1)
+            await self.buffer.flush()
+
+        self._run(flush)
+
+        statement = self._statement()
+        assert "UPDATE publisher_publication SET" in str(statement)
+        assert "FROM (VALUES" in str(statement)
+        assert list(statement.params.values())[:6] == [1, 0, -1, 2, 1, 0]
+        self.session.commit.assert_awaited_once()
+        assert self.buffer._deltas == {}
+
+    def test_flush_locks_publications(self):
+        async def flush():
+            self.buffer.add(2, 1, 0)
+            self.buffer.add(1, 0, -1)
+            await self.buffer.flush()
+
+        self._run(flush)
+
+        (lock,), _ = self.session.execute.call_args_list[0]
+        lock = lock.compile(dialect=postgresql.dialect())
+        assert "ORDER BY publisher_publication.id FOR NO KEY UPDATE" in str(lock)
+        assert list(lock.params.values()) == [[1, 2]]
+
+    def test_flush_empty(self):
+        self._run(self.buffer.flush)
+
+        assert self.sessions == 0
+
+    def test_flush_failed_requeues(self):
+        self.session.commit.side_effect = OperationalError("COMMIT", {}, None)
+
+        async def flush():
+            self.buffer.add(1, 1, 0)
+            await self.buffer.flush()
+            self.buffer.add(1, 1, 0)
+
+        self._run(flush)
+
+        assert self.buffer._deltas == {1: [2, 0]}
+
+    def test_flush_on_max_events(self):
+        self.buffer.max_events = 2
+
+        async def add():
+            self.buffer.add(1, 1, 0)
+            self.buffer.add(2, 1, 0)
+            for _ in range(5):
+                await asyncio.sleep(0)
+
+        self._run(add)
+
+        assert self.sessions == 1
+        assert self.buffer._deltas == {}
+
+    def test_add_on_commit(self):
+        session = SimpleNamespace(sync_session=Session())
+
+        async def commit():
+            self.buffer.add_on_commit(session, 1, 1, 0)
+            assert self.buffer._deltas == {}
+            session.sync_session.dispatch.after_commit(session.sync_session)
+
+        self._run(commit)
+
+        assert self.buffer._deltas == {1: [1, 0]}
+
+    def test_close_flushes(self):
+        async def close():
+            self.buffer.add(1, 1, 0)
+            await self.buffer.close()
+
+        self._run(close)
+
+        assert self.sessions == 1
+        assert self.buffer._task is None
+        assert self.buffer._deltas == {}
+
+    def _slow_execute(self):
+        started = asyncio.Event()
+        written = []
+
+        async def execute(statement):
+            started.set()
+            await asyncio.sleep(0.05)
+            written.append(statement.compile(dialect=postgresql.dialect()).params)
+
+        self.session.execute.side_effect = execute
+        return started, written
+
+    def test_close_during_flush(self):
+        self.buffer.max_events = 1
+        started, written = self._slow_execute()
+
+        async def close():
+            self.buffer.add(1, 5, 0)
+            await started.wait()
+            await self.buffer.close()
+
+        self._run(close)
+
+        assert len(written) == 2
+        assert list(written[1].values())[:3] == [1, 5, 0]
+        assert self.buffer._deltas == {}
+        assert self.buffer._task is None
+
+    def test_cancelled_flush_requeues(self):
+        started, _ = self._slow_execute()
+
+        async def cancel():
+            self.buffer.add(1, 5, 0)
+            flush = asyncio.create_task(self.buffer.flush())
+            await started.wait()
+            flush.cancel()
+            await asyncio.gather(flush, return_exceptions=True)
+
+        self._run(cancel)
+
+        assert self.buffer._deltas == {1: [5, 0]}
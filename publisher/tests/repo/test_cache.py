@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+from sqlalchemy.orm import Session
+
+from repo.cache import (
+    HIT,
+    MISS,
+    CachedPublicationRepo,
+    SelectionCache,
+    lookups_counter,
+)
+from repo.vote import VoteRepo
+from services.entries import CountMode, SelectionOrder
+from utils.cache import CachedValue, MemoryCache
+
+
+class TestCachedPublicationRepo:
+    def setup_method(self):
+        self.cache = SelectionCache(MemoryCache(max_size=100), ttl=60)
+        self.session = SimpleNamespace(sync_session=Session())
+        self.repo = CachedPublicationRepo(CachedValue(ttl=60), cache=self.cache)
+        self.selection = SimpleNamespace(items=[])
+
+    def _selection(self, user_id=None, order=SelectionOrder.RANKED):
+        async def page(session, user_id, size, page, cursor, count):
+            return self.selection
+
+        with mock.patch(
+            "repo.publication.PublicationRepo._page", side_effect=page
+        ) as query:
+            result = asyncio.run(
+                self.repo.selection(
+                    self.session, user_id, 20, 1, count=CountMode.EXACT, order=order
+                )
+            )
+        return result, query.called
+
+    def _commit(self):
+        async def commit():
+            self.session.sync_session.dispatch.after_commit(self.session.sync_session)
+            await asyncio.gather(*self.cache._tasks)
+
+        asyncio.run(commit())
+
+    def test_hit(self):
+        hits = lookups_counter.value(result=HIT)
+        misses = lookups_counter.value(result=MISS)
+
+        assert self._selection() == (self.selection, True)
+        assert self._selection() == (self.selection, False)
+        assert lookups_counter.value(result=HIT) == hits + 1
+        assert lookups_counter.value(result=MISS) == misses + 1
+
+    def test_user_entries(self):
+        assert self._selection(user_id=1)[1]
+        assert self._selection(user_id=2)[1]
+        assert not self._selection(user_id=1)[1]
+        assert not self._selection(user_id=2)[1]
+
+    def test_latest_shared(self):
+        assert self._selection(user_id=1, order=SelectionOrder.LATEST)[1]
+        assert not self._selection(user_id=2, order=SelectionOrder.LATEST)[1]
+        assert not self._selection(order=SelectionOrder.LATEST)[1]
+
+    def test_vote_invalidates_user(self):
+        repo = VoteRepo(cache=self.cache)
+        self._selection(user_id=1)
+        self._selection(user_id=2)
+
+        repo._on_voted(self.session, [1])
+        self._commit()
+
+        assert self._selection(user_id=1)[1]
+        assert not self._selection(user_id=2)[1]
+
+    def test_vote_not_invalidated_without_commit(self):
+        repo = VoteRepo(cache=self.cache)
+        self._selection(user_id=1)
+
+        repo._on_voted(self.session, [1])
+
+        assert not self._selection(user_id=1)[1]
+
+    def test_created_invalidates_all(self):
+        self._selection(user_id=1)
+        self._selection(user_id=2)
+
+        self.repo._on_created(self.session)
+        assert not self._selection(user_id=1)[1]
+
+        self._commit()
+        assert self._selection(user_id=1)[1]
+        assert self._selection(user_id=2)[1]
@@ -1,9 +1,17 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, func, select, text
+
 from config.di import get_di_test_container
 from models.publication import Publication
 from models.vote import Vote
+from services.entries import CountMode, SelectionOrder
 from services.repo import IPublicationRepo
 from services.publications.entries import CreatePublicationData, ContentType
 from schemas import PublicationSchema
+from utils.exceptions import Custom400Exception
+from utils.repo import encode_cursor
 from utils.test import RepoTestMixin
 
 
@@ -15,23 +23,57 @@ class TestPublicationRepo(RepoTestMixin):
 
     def setup_method(self):
         self.entry = CreatePublicationData(
-            url="https://example.com", type=ContentType.YOUTUBE
+            url="https://example.com",
+            type=ContentType.YOUTUBE,
+            canonical_id=str(uuid4()),
         )
         self.user_id = 1
 
         self.publication = self._create()
 
-    def _create(self) -> Publication:
-        return self.repo.create(self.user_id, self.entry)
+    def _create(self, entry: CreatePublicationData | None = None, user_id=None):
+        return self.run(
+            lambda session: self.repo.create(
+                session, user_id or self.user_id, entry or self.entry
+            )
+        )
 
-    def test_create(self):
-        assert isinstance(self.publication, Publication)
-        assert self.publication.user_id == self.user_id
-        assert self.publication.url == self.entry.url
-        assert self.publication.type == self.entry.type
+    def _entry(self, url: str = "https://example.com/new") -> CreatePublicationData:
+        return CreatePublicationData(
+            url=url, type=ContentType.YOUTUBE, canonical_id=str(uuid4())
+        )
 
-    def test_selection_no_vote(self):
-        selection = self.repo.selection(self.user_id, size=100, page=1)
+    def _vote(self, believed: bool | None):
+        vote = self.run(
+            lambda session: container._vote_repo().upsert(
+                session, self.user_id, self.publication.id, believed
+            )
+        )
+        # upsert updates the counters of the publication
+        async def get(session):
+            table = Publication.__table__
+            result = await session.execute(
+                select(table).where(table.c.id == self.publication.id)
+            )
+            return result.one()
+
+        self.publication = self.run(get)
+        return vote
+
+    def _delete_vote(self, vote) -> None:
+        self.run(
+            lambda session: session.execute(delete(Vote).where(Vote.id == vote.id))
+        )
+
+    def _selection(self, user_id: int | None, **kwargs):
+        kwargs.setdefault("size", 100)
+        kwargs.setdefault("page", 1)
+        return self.run(
+            lambda session: self.repo.selection(session, user_id, **kwargs)
+        )
+
+    def _selected(self, user_id: int | None) -> PublicationSchema:
+        selection = self._selection(user_id)
         for publication in selection.items:
             assert isinstance(publication, PublicationSchema)
 
@@ -44,171 +86,269 @@ class TestPublicationRepo(RepoTestMixin):
         assert publication.believed_count == self.publication.believed_count
         assert publication.disbelieved_count == self.publication.disbelieved_count
         assert publication.created_at == self.publication.created_at
-        assert publication.believed is None
+        return publication
 
-    def test_selection_no_vote_no_user(self):
-        selection = self.repo.selection(None, size=100, page=1)
-        for publication in selection.items:
-            assert isinstance(publication, PublicationSchema)
+    def test_create(self):
+        assert isinstance(self.publication.id, int)
+        assert self.publication.user_id == self.user_id
+        assert self.publication.url == self.entry.url
+        assert self.publication.type == self.entry.type
+        assert self.publication.believed_count == 0
+        assert self.publication.disbelieved_count == 0
+        assert self.publication.created_at is not None
+
+    def test_create_duplicate(self):
+        entry = CreatePublicationData(
+            url="https://example.com/duplicate",
+            type=ContentType.YOUTUBE,
+            canonical_id=self.entry.canonical_id,
+        )
+
+        publication = self._create(entry, user_id=self.user_id + 1)
 
-        publication = list(
-            filter(lambda item: item.id == self.publication.id, selection.items)
-        )[0]
         assert publication.id == self.publication.id
+        assert publication.user_id == self.user_id
         assert publication.url == self.publication.url
-        assert publication.type == self.publication.type
-        assert publication.believed_count == self.publication.believed_count
-        assert publication.disbelieved_count == self.publication.disbelieved_count
-        assert publication.created_at == self.publication.created_at
-        assert publication.believed is None
 
-    def test_selection_believed(self):
-        with container.db().session() as session:
-            vote = Vote(
-                user_id=self.user_id, publication_id=self.publication.id, believed=True
+    def test_create_many(self):
+        entry = self._entry()
+        existing = CreatePublicationData(
+            url=self.entry.url,
+            type=ContentType.YOUTUBE,
+            canonical_id=self.entry.canonical_id,
+        )
+
+        publications = self.run(
+            lambda session: self.repo.create_many(
+                session, self.user_id + 1, [entry, existing, entry]
             )
-            session.add(vote)
-            session.commit()
-            session.refresh(vote)
+        )
 
-        # voted user
-        selection = self.repo.selection(self.user_id, size=100, page=1)
-        for publication in selection.items:
-            assert isinstance(publication, PublicationSchema)
+        assert publications[0].id == publications[2].id
+        assert publications[0].user_id == self.user_id + 1
+        assert publications[0].url == entry.url
+        assert publications[1].id == self.publication.id
+        assert publications[1].user_id == self.user_id
 
-        publication = list(
-            filter(lambda item: item.id == self.publication.id, selection.items)
-        )[0]
-        assert publication.id == self.publication.id
-        assert publication.url == self.publication.url
-        assert publication.type == self.publication.type
-        assert publication.believed_count == self.publication.believed_count
-        assert publication.disbelieved_count == self.publication.disbelieved_count
-        assert publication.created_at == self.publication.created_at
-        assert publication.believed
+    def test_create_many_empty(self):
+        publications = self.run(
+            lambda session: self.repo.create_many(session, self.user_id, [])
+        )
 
-        # other user
-        selection = self.repo.selection(self.user_id + 1, size=100, page=1)
-        for publication in selection.items:
-            assert isinstance(publication, PublicationSchema)
+        assert publications == []
 
-        publication = list(
-            filter(lambda item: item.id == self.publication.id, selection.items)
-        )[0]
-        assert publication.id == self.publication.id
-        assert publication.url == self.publication.url
-        assert publication.type == self.publication.type
-        assert publication.believed_count == self.publication.believed_count
-        assert publication.disbelieved_count == self.publication.disbelieved_count
-        assert publication.created_at == self.publication.created_at
-        assert publication.believed is None
+    def test_stream(self):
+        async def stream(session):
+            return [
+                publication
+                async for publication in self.repo.stream(
+                    session, self.user_id, after_id=self.publication.id - 1
+                )
+            ]
 
-        with container.db().session() as session:
-            session.delete(vote)
+        publications = self.run(stream)
 
-    def test_selection_believed_no_user(self):
-        with container.db().session() as session:
-            vote = Vote(
-                user_id=self.user_id, publication_id=self.publication.id, believed=True
-            )
-            session.add(vote)
-            session.commit()
-            session.refresh(vote)
+        assert [publication.id for publication in publications] == [
+            self.publication.id
+        ]
+        assert publications[0].believed is None
 
-        selection = self.repo.selection(None, size=100, page=1)
-        for publication in selection.items:
-            assert isinstance(publication, PublicationSchema)
+    def test_selection_no_vote(self):
+        assert self._selected(self.user_id).believed is None
 
-        publication = list(
-            filter(lambda item: item.id == self.publication.id, selection.items)
-        )[0]
-        assert publication.id == self.publication.id
-        assert publication.url == self.publication.url
-        assert publication.type == self.publication.type
-        assert publication.believed_count == self.publication.believed_count
-        assert publication.disbelieved_count == self.publication.disbelieved_count
-        assert publication.created_at == self.publication.created_at
-        assert publication.believed is None
+    def test_selection_no_vote_no_user(self):
+        assert self._selected(None).believed is None
 
-        with container.db().session() as session:
-            session.delete(vote)
+    def test_selection_believed(self):
+        vote = self._vote(True)
 
-    def test_selection_disbelieved(self):
-        with container.db().session() as session:
-            vote = Vote(
-                user_id=self.user_id, publication_id=self.publication.id, believed=False
-            )
-            session.add(vote)
-            session.commit()
-            session.refresh(vote)
+        assert self._selected(self.user_id).believed
+        assert self._selected(self.user_id + 1).believed is None
 
-        # voted user
-        selection = self.repo.selection(self.user_id, size=100, page=1)
-        for publication in selection.items:
-            assert isinstance(publication, PublicationSchema)
+        self._delete_vote(vote)
 
-        publication = list(
-            filter(lambda item: item.id == self.publication.id, selection.items)
-        )[0]
-        assert publication.id == self.publication.id
-        assert publication.url == self.publication.url
-        assert publication.type == self.publication.type
-        assert publication.believed_count == self.publication.believed_count
-        assert publication.disbelieved_count == self.publication.disbelieved_count
-        assert publication.created_at == self.publication.created_at
-        assert not publication.believed
+    def test_selection_believed_no_user(self):
+        vote = self._vote(True)
 
-        # other user
-        selection = self.repo.selection(self.user_id + 1, size=100, page=1)
-        for publication in selection.items:
-            assert isinstance(publication, PublicationSchema)
+        assert self._selected(None).believed is None
 
-        publication = list(
-            filter(lambda item: item.id == self.publication.id, selection.items)
-        )[0]
-        assert publication.id == self.publication.id
-        assert publication.url == self.publication.url
-        assert publication.type == self.publication.type
-        assert publication.believed_count == self.publication.believed_count
-        assert publication.disbelieved_count == self.publication.disbelieved_count
-        assert publication.created_at == self.publication.created_at
-        assert publication.believed is None
+        self._delete_vote(vote)
+
+    def test_selection_disbelieved(self):
+        vote = self._vote(False)
+
+        assert self._selected(self.user_id).believed is False
+        assert self._selected(self.user_id + 1).believed is None
 
-        with container.db().session() as session:
-            session.delete(vote)
+        self._delete_vote(vote)
 
     def test_selection_disbelieved_no_user(self):
-        with container.db().session() as session:
-            vote = Vote(
-                user_id=self.user_id, publication_id=self.publication.id, believed=False
+        vote = self._vote(False)
+
+        assert self._selected(None).believed is None
+
+        self._delete_vote(vote)
+
+    def _ranked(self, user_id: int):
+        """Старая и новая публикации, пользователь верит новой"""
+        older = self._create(self._entry("https://example.com/older"))
+        newer = self._create(self._entry("https://example.com/newer"))
+        self.run(
+            lambda session: container._vote_repo().upsert(
+                session, user_id, newer.id, True
+            )
+        )
+        return older, newer
+
+    def test_selection_order(self):
+        user_id = uuid4().int % 10**9
+        older, newer = self._ranked(user_id)
+
+        ranked = [item.id for item in self._selection(user_id, size=1000).items]
+        latest = [item.id for item in self._selection(None, size=1000).items]
+
+        assert ranked.index(older.id) < ranked.index(newer.id)
+        assert latest.index(newer.id) < latest.index(older.id)
+
+    def test_selection_order_latest(self):
+        user_id = uuid4().int % 10**9
+        older, newer = self._ranked(user_id)
+
+        items = self._selection(user_id, size=1000, order=SelectionOrder.LATEST).items
+        ids = [item.id for item in items]
+
+        assert ids == [item.id for item in self._selection(None, size=1000).items]
+        assert ids.index(newer.id) < ids.index(older.id)
+        assert items[ids.index(newer.id)].believed
+        assert items[ids.index(older.id)].believed is None
+
+    def test_selection_cursor(self):
+        user_id = uuid4().int % 10**9
+        self._ranked(user_id)
+        expected = [item.id for item in self._selection(user_id, size=1000).items]
+
+        ids, cursor = [], ""
+        while cursor is not None:
+            selection = self._selection(user_id, size=2, page=None, cursor=cursor)
+            ids.extend(item.id for item in selection.items)
+            cursor = selection.next_cursor
+
+        assert ids == expected
+
+    def test_selection_cursor_segments(self):
+        user_id = uuid4().int % 10**9
+        older, newer = self._ranked(user_id)
+        disbelieved = self._create(self._entry("https://example.com/disbelieved"))
+        self.run(
+            lambda session: container._vote_repo().upsert(
+                session, user_id, disbelieved.id, False
             )
-            session.add(vote)
-            session.commit()
-            session.refresh(vote)
+        )
+        expected = [item.id for item in self._selection(user_id, size=1000).items]
+
+        items, cursor = [], ""
+        while cursor is not None:
+            selection = self._selection(user_id, size=1, page=None, cursor=cursor)
+            items.extend(selection.items)
+            cursor = selection.next_cursor
+
+        assert [item.id for item in items] == expected
+        assert [item.believed for item in items[-2:]] == [True, False]
+        assert items[-1].id == disbelieved.id
+
+    def test_selection_cursor_last_page(self):
+        self._create(self._entry())
+        total = len(self._selection(self.user_id, size=1000).items)
+
+        full = self._selection(self.user_id, size=total, page=None, cursor="")
+        first = self._selection(self.user_id, size=total - 1, page=None, cursor="")
+        last = self._selection(
+            self.user_id, size=total - 1, page=None, cursor=first.next_cursor
+        )
 
-        selection = self.repo.selection(None, size=100, page=1)
-        for publication in selection.items:
-            assert isinstance(publication, PublicationSchema)
+        assert len(full.items) == total and full.next_cursor is None
+        assert len(first.items) == total - 1 and first.next_cursor is not None
+        assert len(last.items) == 1 and last.next_cursor is None
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "garbage",
+            encode_cursor(2, "2024-01-01"),
+            encode_cursor("x", "y", "z"),
+            encode_cursor(3, "2024-01-01T00:00:00+00:00", 1),
+        ],
+    )
+    def test_selection_cursor_invalid(self, cursor):
+        with pytest.raises(Custom400Exception):
+            self._selection(self.user_id, size=1, page=None, cursor=cursor)
+
+    def _count(self, mode: CountMode):
+        return self.run(lambda session: self.repo.count(session, mode))
+
+    def _exact(self) -> int:
+        return self.run(
+            lambda session: session.scalar(select(func.count()).select_from(Publication))
+        )
 
-        publication = list(
-            filter(lambda item: item.id == self.publication.id, selection.items)
-        )[0]
-        assert publication.id == self.publication.id
-        assert publication.url == self.publication.url
-        assert publication.type == self.publication.type
-        assert publication.believed_count == self.publication.believed_count
-        assert publication.disbelieved_count == self.publication.disbelieved_count
-        assert publication.created_at == self.publication.created_at
-        assert publication.believed is None
+    def test_count_exact(self):
+        self.repo.counter.set(-1)
+
+        assert self._count(CountMode.EXACT) == self._exact()
+        assert self.repo.counter.get() == self._exact()
+
+    def test_count_cached(self):
+        self.repo.counter.set(-1)
+        assert self._count(CountMode.CACHED) == -1
+
+        self.repo.counter.invalidate()
+        assert self._count(CountMode.CACHED) == self._exact()
+
+    def test_count_estimated(self):
+        async def analyze(session):
+            await session.execute(text("ANALYZE publisher_publication"))
+
+        self.run(analyze)
+
+        assert self._count(CountMode.ESTIMATED) == self._exact()
+
+    def test_count_none(self):
+        assert self._count(CountMode.NONE) is None
+
+    def test_selection_count_none(self):
+        selection = self._selection(self.user_id, count=CountMode.NONE)
 
-        with container.db().session() as session:
-            session.delete(vote)
+        assert selection.items
+        assert selection.total is None
+        assert selection.pages is None
+
+    def test_selection_pages(self):
+        selection = self._selection(self.user_id, size=1)
+
+        assert selection.total == self._exact()
+        assert selection.pages == selection.total
+
+    def test_created_invalidates_count_after_commit(self):
+        async def create(session):
+            self.repo.counter.set(-1)
+            await self.repo.create(session, self.user_id, self._entry())
+            assert self.repo.counter.get() == -1
+
+        self.run(create)
+
+        assert self.repo.counter.get() is None
 
     def test_get_by_id(self):
-        publication = self.repo.get_by_id(self.publication.id)
+        async def get(session):
+            publication = await self.repo.get_by_id(session, self.publication.id)
+            assert isinstance(publication, Publication)
+            return publication.id
 
-        assert isinstance(publication, Publication)
-        assert publication.id == self.publication.id
+        assert self.run(get) == self.publication.id
 
     def test_get_by_id_not_found(self):
-        assert self.repo.get_by_id(self.publication.id + 1) is None
+        publication = self.run(
+            lambda session: self.repo.get_by_id(session, self.publication.id + 1)
+        )
+
+        assert publication is None
@@ -1,9 +1,17 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+
 from config.di import get_di_test_container
 from models.publication import Publication
-from models.vote import Vote
+from repo.cache import SelectionCache
+from repo.vote import VoteRepo
+from services.entries import VoteData
 from services.repo import IVoteRepo
 from services.publications.entries import CreatePublicationData, ContentType
-from schemas import PublicationSchema
+from utils.cache import MemoryCache
 from utils.test import RepoTestMixin
 
 
@@ -14,66 +22,193 @@ class TestVoteRepo(RepoTestMixin):
     repo: IVoteRepo = container._vote_repo()
 
     def setup_method(self):
-        self.entry = CreatePublicationData(
-            url="https://example.com", type=ContentType.YOUTUBE
-        )
         self.user_id = 1
 
         self.publication = self._create_publication()
-        self.vote = self._create()
 
-    def _create(self, believed: bool | None = None):
-        return self.repo.create(
-            user_id=self.user_id, publication_id=self.publication.id, believed=believed
+    def _create_publication(self):
+        entry = CreatePublicationData(
+            url="https://example.com",
+            type=ContentType.YOUTUBE,
+            canonical_id=str(uuid4()),
+        )
+        return self.run(
+            lambda session: container.publication_repo().create(
+                session, user_id=self.user_id, entry=entry
+            )
         )
 
-    def _create_publication(self):
-        return container.publication_repo().create(
-            user_id=self.user_id, entry=self.entry
+    def _get_publication(self, publication_id: int):
+        async def get(session):
+            result = await session.execute(
+                select(Publication.__table__).where(
+                    Publication.__table__.c.id == publication_id
+                )
+            )
+            return result.one()
+
+        return self.run(get)
+
+    def test_upsert(self):
+        publication = self._create_publication()
+
+        vote = self.run(
+            lambda session: self.repo.upsert(
+                session, self.user_id, publication.id, believed=True
+            )
         )
+        assert vote.user_id == self.user_id
+        assert vote.publication_id == publication.id
+        assert vote.believed
 
-    def test_get(self):
-        vote = self.repo.get(self.user_id, self.publication.id)
+        updated = self.run(
+            lambda session: self.repo.upsert(
+                session, self.user_id, publication.id, believed=False
+            )
+        )
+        assert updated.id == vote.id
+        assert not updated.believed
+
+        publication = self._get_publication(publication.id)
+        assert publication.believed_count == 0
+        assert publication.disbelieved_count == 1
+
+    def test_upsert_publication_not_found(self):
+        vote = self.run(
+            lambda session: self.repo.upsert(
+                session, self.user_id, self.publication.id + 1, True
+            )
+        )
 
-        assert isinstance(vote, Vote)
-        assert vote.id == self.vote.id
+        assert vote is None
 
-    def test_get_not_found(self):
-        assert self.repo.get(self.user_id + 1, self.publication.id) is None
+    def test_upsert_many(self):
+        publication = self._create_publication()
 
-    def test_create(self):
-        vote = self._create()
+        votes = self.run(
+            lambda session: self.repo.upsert_many(
+                session,
+                [
+                    VoteData(user_id=1, publication_id=publication.id, believed=True),
+                    VoteData(user_id=2, publication_id=publication.id, believed=False),
+                    VoteData(user_id=3, publication_id=publication.id, believed=True),
+                ],
+            )
+        )
+        assert len(votes) == 3
 
-        assert isinstance(vote, Vote)
-        assert vote.user_id == self.user_id
-        assert vote.publication_id == self.publication.id
-        assert vote.believed is None
+        self.run(
+            lambda session: self.repo.upsert_many(
+                session,
+                [VoteData(user_id=3, publication_id=publication.id, believed=None)],
+            )
+        )
 
-        vote = self._create(believed=True)
+        publication = self._get_publication(publication.id)
+        assert publication.believed_count == 1
+        assert publication.disbelieved_count == 1
+
+    def test_upsert_many_empty(self):
+        assert self.run(lambda session: self.repo.upsert_many(session, [])) == []
+
+    def _race(self, first, second):
+        """
+        `first` и `second` голосуют в разных транзакциях, `second` -
+        пока транзакция `first` еще не зафиксирована.
+        """
+        db = container.db()
+
+        async def race():
+            voted = asyncio.Event()
+            release = asyncio.Event()
+
+            async def run_first():
+                async with db.session() as session:
+                    await first(session)
+                    voted.set()
+                    await release.wait()
+
+            async def run_second():
+                await voted.wait()
+                async with db.session() as session:
+                    await second(session)
+
+            tasks = [
+                asyncio.create_task(run_first()),
+                asyncio.create_task(run_second()),
+            ]
+            await voted.wait()
+            await asyncio.sleep(0.2)
+            release.set()
+            await asyncio.gather(*tasks)
+
+        self.loop.run_until_complete(race())
+
+    def test_upsert_concurrent_first_votes(self):
+        publication = self._create_publication()
+
+        self._race(
+            lambda session: self.repo.upsert(
+                session, self.user_id, publication.id, believed=True
+            ),
+            lambda session: self.repo.upsert(
+                session, self.user_id, publication.id, believed=True
+            ),
+        )
 
-        assert isinstance(vote, Vote)
-        assert vote.user_id == self.user_id
-        assert vote.publication_id == self.publication.id
-        assert vote.believed
+        publication = self._get_publication(publication.id)
+        assert publication.believed_count == 1
+        assert publication.disbelieved_count == 0
 
-        vote = self._create(believed=False)
+    def test_upsert_concurrent_changes(self):
+        publication = self._create_publication()
+        self.run(
+            lambda session: self.repo.upsert(
+                session, self.user_id, publication.id, believed=True
+            )
+        )
 
-        assert isinstance(vote, Vote)
-        assert vote.user_id == self.user_id
-        assert vote.publication_id == self.publication.id
-        assert not vote.believed
+        self._race(
+            lambda session: self.repo.upsert(
+                session, self.user_id, publication.id, believed=False
+            ),
+            lambda session: self.repo.upsert_many(
+                session,
+                [
+                    VoteData(
+                        user_id=self.user_id,
+                        publication_id=publication.id,
+                        believed=None,
+                    )
+                ],
+            ),
+        )
 
-    def test_update(self):
-        vote = self._create()
+        publication = self._get_publication(publication.id)
+        assert publication.believed_count == 0
+        assert publication.disbelieved_count == 0
 
-        assert vote.believed is None
+    def test_upsert_invalidates_user_selections_after_commit(self):
+        publication = self._create_publication()
+        cache = SelectionCache(MemoryCache(max_size=10), ttl=60)
+        repo = VoteRepo(cache=cache)
 
-        self.repo.update(vote.id, believed=True)
-        with container.db().session() as session:
-            vote = session.query(Vote).filter(Vote.id == vote.id).first()
-            assert vote.believed
+        async def generation():
+            await asyncio.gather(*cache._tasks)
+            keys = [cache._user_generation(self.user_id)]
+            return (await cache.backend.get_many(keys))[0]
 
-        self.repo.update(vote.id, believed=False)
-        with container.db().session() as session:
-            vote = session.query(Vote).filter(Vote.id == vote.id).first()
-            assert not vote.believed
+        async def rollback(session):
+            await repo.upsert(session, self.user_id, publication.id, believed=True)
+            raise RuntimeError("rollback")
+
+        with pytest.raises(RuntimeError):
+            self.run(rollback)
+        assert self.loop.run_until_complete(generation()) is None
+
+        self.run(
+            lambda session: repo.upsert(
+                session, self.user_id, publication.id, believed=True
+            )
+        )
+        assert self.loop.run_until_complete(generation()) is not None
@@ -1,3 +1,4 @@
+import asyncio
 from unittest import mock
 from types import SimpleNamespace
 from datetime import datetime
@@ -22,7 +23,7 @@ class TestCreatePublication(ServiceTestMixin):
         self.publication = SimpleNamespace(
             **{
                 "id": 1,
-                "url": "https://example.com",
+                "url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
                 "type": ContentType.YOUTUBE,
                 "believed_count": 0,
                 "disbelieved_count": 0,
@@ -30,21 +31,28 @@ class TestCreatePublication(ServiceTestMixin):
             }
         )
         self.schema = CreatePublicationSchema(url=self.publication.url)
+        self.session = mock.Mock()
 
-        self.repo = mock.Mock()
+        self.repo = mock.AsyncMock()
         self.repo.create.return_value = self.publication
+        self.repo.create_many.return_value = [self.publication]
 
         self.context = container.create_publication.override(
             CreatePublication(repo=self.repo)
         )
 
+    def _create(self):
+        return asyncio.run(
+            container.create_publication()(
+                self.session, user_id=self.user.id, schema=self.schema
+            )
+        )
+
     def test_create(self, mocker: MockerFixture):
         get_content_type = mocker.patch("services.publications.create.get_content_type")
         get_content_type.return_value = ContentType.YOUTUBE
         with self.context:
-            publication = container.create_publication()(
-                user_id=self.user.id, schema=self.schema
-            )
+            publication = self._create()
 
             assert isinstance(publication, PublicationData)
             assert isinstance(self.schema.url, str)
@@ -56,15 +64,84 @@ class TestCreatePublication(ServiceTestMixin):
             assert publication.created_at == str(self.publication.created_at)
             get_content_type.assert_called_once_with(self.schema.url)
             self.repo.create.assert_called_once_with(
+                self.session,
+                self.user.id,
+                CreatePublicationData(
+                    url=self.publication.url,
+                    type=ContentType.YOUTUBE,
+                    canonical_id="dQw4w9WgXcQ",
+                ),
+            )
+
+    def test_create_canonical_url(self, mocker: MockerFixture):
+        self.schema = CreatePublicationSchema(
+            url="https://youtu.be/dQw4w9WgXcQ?t=10&si=tracking"
+        )
+        with self.context:
+            self._create()
+
+            self.repo.create.assert_called_once_with(
+                self.session,
                 self.user.id,
-                CreatePublicationData(url=self.schema.url, type=ContentType.YOUTUBE),
+                CreatePublicationData(
+                    url=self.publication.url,
+                    type=ContentType.YOUTUBE,
+                    canonical_id="dQw4w9WgXcQ",
+                ),
             )
 
     def test_create_bad_content_type(self, mocker: MockerFixture):
         get_content_type = mocker.patch("services.publications.create.get_content_type")
         get_content_type.return_value = None
-        with self.context, pytest.raises(Custom400Exception):
-            container.create_publication()(user_id=self.user.id, schema=self.schema)
+        with self.context:
+            with pytest.raises(Custom400Exception):
+                self._create()
 
             get_content_type.assert_called_once_with(self.schema.url)
             self.repo.create.assert_not_called()
+
+    def _create_many(self, urls):
+        return asyncio.run(
+            container.create_publication().many(
+                self.session, user_id=self.user.id, urls=urls
+            )
+        )
+
+    def test_create_many(self):
+        urls = [
+            "not a url",
+            "https://youtu.be/dQw4w9WgXcQ?t=10",
+            "https://example.com/video",
+        ]
+        with self.context:
+            results = self._create_many(urls)
+
+            assert [result.detail for result in results] == [
+                "Invalid URL.",
+                None,
+                "Platform is not supported.",
+            ]
+            assert results[0].publication is None
+            assert results[1].publication.id == self.publication.id
+            assert results[2].publication is None
+            self.repo.create_many.assert_called_once_with(
+                self.session,
+                self.user.id,
+                [
+                    CreatePublicationData(
+                        url=self.publication.url,
+                        type=ContentType.YOUTUBE,
+                        canonical_id="dQw4w9WgXcQ",
+                    )
+                ],
+            )
+
+    def test_create_many_too_many(self, mocker: MockerFixture):
+        mocker.patch(
+            "services.publications.create.settings.PUBLICATION_BATCH_MAX_SIZE", 1
+        )
+        with self.context:
+            with pytest.raises(Custom400Exception):
+                self._create_many([self.publication.url] * 2)
+
+            self.repo.create_many.assert_not_called()
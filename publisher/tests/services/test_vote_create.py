@@ -1,13 +1,15 @@
+import asyncio
 from unittest import mock
 from types import SimpleNamespace
 
 import pytest
 
 from config.di import get_di_test_container
+from services.entries import VoteData
 from services.votes import Vote
 from schemas import VoteSchema
 from utils.test import ServiceTestMixin
-from utils.exceptions import Custom404Exception
+from utils.exceptions import Custom400Exception, Custom404Exception
 
 
 container = get_di_test_container()
@@ -16,55 +18,79 @@ container = get_di_test_container()
 class TestVote(ServiceTestMixin):
     def setup_method(self):
         self.schema = VoteSchema(believed=True)
+        self.session = mock.Mock()
 
         self.vote = SimpleNamespace(**{"id": 1})
         self.publication = SimpleNamespace(**{"id": 1})
 
-        self.repo = mock.Mock()
-        self.repo.get.return_value = None
+        self.repo = mock.AsyncMock()
+        self.repo.upsert.return_value = self.vote
 
-        self.publication_repo = mock.Mock()
-        self.publication_repo.get_by_id.return_value = self.publication
+        self.publication_repo = mock.AsyncMock()
+        self.publication_repo.existing_ids.return_value = {self.publication.id}
 
         self.context = container.create_vote.override(
             Vote(repo=self.repo, publication_repo=self.publication_repo)
         )
 
-    def test_create(self):
-        with self.context:
-            assert (
-                container.create_vote()(self.user.id, self.publication.id, self.schema)
-                is None
-            )
-
-            self.repo.create.assert_called_once_with(
-                self.user.id, self.publication.id, self.schema.believed
+    def _vote(self):
+        return asyncio.run(
+            container.create_vote()(
+                self.session, self.user.id, self.publication.id, self.schema
             )
-            self.repo.update.assert_not_called()
+        )
 
-    def test_create_bad_publication_id(self):
-        self.publication_repo.get_by_id.return_value = None
-        with self.context, pytest.raises(Custom404Exception):
-            container.create_vote()(self.user.id, self.publication.id, self.schema)
+    def test_vote(self):
+        with self.context:
+            assert self._vote() is None
 
+            self.repo.upsert.assert_called_once_with(
+                self.session, self.user.id, self.publication.id, self.schema.believed
+            )
+            self.repo.get.assert_not_called()
             self.repo.create.assert_not_called()
             self.repo.update.assert_not_called()
 
-    def test_update(self):
-        self.repo.get.return_value = self.vote
-        with self.context:
-            assert (
-                container.create_vote()(self.user.id, self.publication.id, self.schema)
-                is None
-            )
+    def test_vote_bad_publication_id(self):
+        self.repo.upsert.return_value = None
+        with self.context, pytest.raises(Custom404Exception):
+            self._vote()
 
-            self.repo.create.assert_not_called()
-            self.repo.update.assert_called_once_with(self.vote.id, self.schema.believed)
+        self.repo.upsert.assert_called_once_with(
+            self.session, self.user.id, self.publication.id, self.schema.believed
+        )
 
-    def test_update_bad_publication_id(self):
-        self.publication_repo.get_by_id.return_value = None
-        with self.context, pytest.raises(Custom404Exception):
-            container.create_vote()(self.user.id, self.publication.id, self.schema)
+    def _vote_many(self, votes):
+        return asyncio.run(container.create_vote().many(self.session, votes))
 
-            self.repo.create.assert_not_called()
-            self.repo.update.assert_not_called()
+    def test_vote_many(self):
+        votes = [
+            VoteData(user_id=1, publication_id=self.publication.id, believed=True),
+            VoteData(user_id=2, publication_id=self.publication.id + 1, believed=True),
+            VoteData(user_id=1, publication_id=self.publication.id, believed=False),
+        ]
+        with self.context:
+            results = self._vote_many(votes)
+
+        assert [result.detail for result in results] == [
+            None,
+            "Publication not found.",
+            None,
+        ]
+        self.publication_repo.existing_ids.assert_called_once_with(
+            self.session, {self.publication.id, self.publication.id + 1}
+        )
+        self.repo.upsert_many.assert_called_once_with(self.session, [votes[2]])
+
+    def test_vote_many_too_many(self):
+        votes = [
+            VoteData(user_id=i, publication_id=self.publication.id, believed=True)
+            for i in range(3)
+        ]
+        with self.context, mock.patch(
+            "services.votes.create.settings.VOTE_BATCH_MAX_SIZE", 2
+        ), pytest.raises(Custom400Exception):
+            self._vote_many(votes)
+
+        self.publication_repo.existing_ids.assert_not_called()
+        self.repo.upsert_many.assert_not_called()
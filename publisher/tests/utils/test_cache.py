@@ -0,0 +1,112 @@
+import asyncio
+from unittest import mock
+from uuid import uuid4
+
+import pytest
+from redis import Redis, RedisError
+
+from config import settings
+from utils.cache import CachedValue, MemoryCache, RedisCache
+
+
+class TestCachedValue:
+    def setup_method(self):
+        self.value = CachedValue[int](ttl=60)
+
+    def test_empty(self):
+        assert self.value.get() is None
+
+    def test_get_set(self):
+        self.value.set(10)
+
+        assert self.value.get() == 10
+
+    def test_expired(self):
+        with mock.patch("utils.cache.time.monotonic", return_value=100.0):
+            self.value.set(10)
+        with mock.patch("utils.cache.time.monotonic", return_value=159.9):
+            assert self.value.get() == 10
+        with mock.patch("utils.cache.time.monotonic", return_value=160.0):
+            assert self.value.get() is None
+
+    def test_invalidate(self):
+        self.value.set(10)
+
+        self.value.invalidate()
+
+        assert self.value.get() is None
+
+
+class TestMemoryCache:
+    def setup_method(self):
+        self.cache = MemoryCache(max_size=2)
+
+    def _get(self, *keys):
+        return asyncio.run(self.cache.get_many(keys))
+
+    def _set(self, key, value, ttl=60):
+        asyncio.run(self.cache.set(key, value, ttl))
+
+    def test_get_set(self):
+        self._set("a", 1)
+
+        assert self._get("a", "b") == [1, None]
+
+    def test_expired(self):
+        with mock.patch("utils.cache.time.monotonic", return_value=0):
+            self._set("a", 1, ttl=10)
+        with mock.patch("utils.cache.time.monotonic", return_value=10):
+            assert self._get("a") == [None]
+
+    def test_evicts_least_recently_used(self):
+        self._set("a", 1)
+        self._set("b", 2)
+        self._get("a")
+        self._set("c", 3)
+
+        assert self._get("a", "b", "c") == [1, None, 3]
+
+
+def test_redis_cache_unavailable():
+    cache = RedisCache(settings.SELECTION_CACHE_REDIS_URL)
+    cache._client = mock.AsyncMock()
+    cache._client.mget.side_effect = RedisError
+    cache._client.set.side_effect = RedisError
+
+    async def func():
+        await cache.set("a", 1, ttl=60)
+        return await cache.get_many(["a", "b"])
+
+    assert asyncio.run(func()) == [None, None]
+
+
+@pytest.fixture(scope="class")
+def redis_url():
+    try:
+        Redis.from_url(settings.SELECTION_CACHE_REDIS_URL).ping()
+    except RedisError:
+        pytest.skip("Redis is not available")
+    return settings.SELECTION_CACHE_REDIS_URL
+
+
+@pytest.mark.usefixtures("redis_url")
+class TestRedisCache:
+    def setup_method(self):
+        self.prefix = f"test:{uuid4().hex}:"
+
+    def _run(self, func):
+        async def run():
+            cache = RedisCache(settings.SELECTION_CACHE_REDIS_URL, prefix=self.prefix)
+            try:
+                return await func(cache)
+            finally:
+                await cache.close()
+
+        return asyncio.run(run())
+
+    def test_get_set(self):
+        async def func(cache):
+            await cache.set("a", {"value": 1}, ttl=60)
+            return await cache.get_many(["a", "b"])
+
+        assert self._run(func) == [{"value": 1}, None]
@@ -0,0 +1,106 @@
+import pytest
+
+from services.entries import ContentType
+from utils.canonical import canonicalize
+
+
+@pytest.mark.parametrize(
+    "url,type,id,canonical_url",
+    [
+        (
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10",
+            ContentType.YOUTUBE,
+            "dQw4w9WgXcQ",
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        ),
+        (
+            "https://youtu.be/dQw4w9WgXcQ?si=tracking",
+            ContentType.YOUTUBE,
+            "dQw4w9WgXcQ",
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        ),
+        (
+            "https://m.youtube.com/shorts/dQw4w9WgXcQ",
+            ContentType.YOUTUBE,
+            "dQw4w9WgXcQ",
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        ),
+        (
+            "https://www.tiktok.com/@user/video/7212345678901234567?is_from_webapp=1",
+            ContentType.TIKTOK,
+            "7212345678901234567",
+            "https://www.tiktok.com/@user/video/7212345678901234567",
+        ),
+        (
+            "https://m.tiktok.com/@user/photo/7212345678901234568?utm_source=share&_r=1",
+            ContentType.TIKTOK,
+            "7212345678901234568",
+            "https://m.tiktok.com/@user/photo/7212345678901234568",
+        ),
+        (
+            "https://vk.com/feed?z=video-123_456%2Fpl_cat",
+            ContentType.VK,
+            "video-123_456",
+            "https://vk.com/video-123_456",
+        ),
+        (
+            "https://m.vk.com/wall-1_2?from=feed",
+            ContentType.VK,
+            "wall-1_2",
+            "https://vk.com/wall-1_2",
+        ),
+        (
+            "https://www.twitch.tv/streamer/clip/FunnyClipSlug?filter=clips",
+            ContentType.TWITCH,
+            "clip/FunnyClipSlug",
+            "https://clips.twitch.tv/FunnyClipSlug",
+        ),
+        (
+            "https://clips.twitch.tv/FunnyClipSlug",
+            ContentType.TWITCH,
+            "clip/FunnyClipSlug",
+            "https://clips.twitch.tv/FunnyClipSlug",
+        ),
+        (
+            "https://www.twitch.tv/videos/123456",
+            ContentType.TWITCH,
+            "video/123456",
+            "https://www.twitch.tv/videos/123456",
+        ),
+        (
+            "https://twitch.tv/Streamer/",
+            ContentType.TWITCH,
+            "channel/streamer",
+            "https://www.twitch.tv/streamer",
+        ),
+        (
+            "https://vt.tiktok.com/ZSabcdef/?utm_source=share",
+            ContentType.TIKTOK,
+            "vt.tiktok.com/ZSabcdef",
+            "https://vt.tiktok.com/ZSabcdef",
+        ),
+        (
+            "https://www.youtube.com/playlist?list=PLa&utm_source=share",
+            ContentType.YOUTUBE,
+            "youtube.com/playlist?list=PLa",
+            "https://youtube.com/playlist?list=PLa",
+        ),
+        (
+            "https://m.youtube.com/playlist?list=PLb&si=tracking",
+            ContentType.YOUTUBE,
+            "youtube.com/playlist?list=PLb",
+            "https://youtube.com/playlist?list=PLb",
+        ),
+        (
+            "https://vk.com/club1?w=about&a=2",
+            ContentType.VK,
+            "vk.com/club1?a=2&w=about",
+            "https://vk.com/club1?a=2&w=about",
+        ),
+    ],
+)
+def test_canonicalize(url, type, id, canonical_url):
+    canonical = canonicalize(url, type)
+
+    assert canonical.id == id
+    assert canonical.url == canonical_url
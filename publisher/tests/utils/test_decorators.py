@@ -0,0 +1,109 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+from config.di import Container
+from utils.decorators import handle_grpc_request_error, inject_session
+from utils.exceptions import Custom400Exception
+
+
+class Response(SimpleNamespace):
+    def __init__(self, value=None, detail=None):
+        super().__init__(value=value, detail=detail)
+
+
+def _collect(stream):
+    async def collect():
+        return [item async for item in stream]
+
+    return asyncio.run(collect())
+
+
+class TestHandleGrpcRequestErrorStream:
+    def test_stream(self):
+        @handle_grpc_request_error(Response)
+        async def handler(self, request, context):
+            yield Response(1)
+            yield Response(2)
+
+        assert _collect(handler(None, None, None)) == [Response(1), Response(2)]
+
+    def test_stream_error(self):
+        @handle_grpc_request_error(Response)
+        async def handler(self, request, context):
+            yield Response(1)
+            raise Custom400Exception("Invalid cursor.")
+
+        assert _collect(handler(None, None, None)) == [
+            Response(1),
+            Response(detail="Invalid cursor."),
+        ]
+
+
+class TestInjectSession:
+    def setup_method(self):
+        self.sessions = []
+
+        @asynccontextmanager
+        async def session(readonly, key):
+            self.sessions.append((readonly, key))
+            yield mock.Mock()
+
+        self.db = SimpleNamespace(session=session)
+
+    def _call(self, decorator, request):
+        @decorator
+        async def handler(servicer, request, context, session):
+            return session
+
+        with Container.db.override(self.db):
+            return asyncio.run(handler(None, request, None))
+
+    def test_default(self):
+        self._call(inject_session, SimpleNamespace(user_id=1))
+
+        assert self.sessions == [(False, 1)]
+
+    def test_readonly(self):
+        self._call(inject_session(readonly=True), SimpleNamespace(user_id=1))
+
+        assert self.sessions == [(True, 1)]
+
+    def test_no_user(self):
+        self._call(inject_session(readonly=True), SimpleNamespace(user_id=0))
+
+        assert self.sessions == [(True, None)]
+
+
+class TestInjectSessionStream:
+    def setup_method(self):
+        self.session = mock.Mock()
+        self.events = []
+
+        @asynccontextmanager
+        async def session(readonly, key):
+            self.events.append(("open", readonly, key))
+            yield self.session
+            self.events.append(("close",))
+
+        self.db = SimpleNamespace(session=session)
+
+    def test_session_open_while_streaming(self):
+        with Container.db.override(self.db):
+
+            @inject_session(readonly=True)
+            async def handler(servicer, request, context, session):
+                for i in range(2):
+                    self.events.append(("yield", session))
+                    yield i
+
+            items = _collect(handler(None, SimpleNamespace(user_id=1), None))
+
+        assert items == [0, 1]
+        assert self.events == [
+            ("open", True, 1),
+            ("yield", self.session),
+            ("yield", self.session),
+            ("close",),
+        ]
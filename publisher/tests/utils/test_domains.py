@@ -0,0 +1,43 @@
+import pytest
+
+from services.entries import ContentType
+from utils.domains import DomainClassifier, classify_many, get_content_type
+
+
+@pytest.mark.parametrize(
+    "url,type",
+    [
+        ("https://www.youtube.com/watch?v=id", ContentType.YOUTUBE),
+        ("https://m.youtube.com/watch?v=id", ContentType.YOUTUBE),
+        ("https://youtube.com/watch?v=id", ContentType.YOUTUBE),
+        ("https://youtu.be/id", ContentType.YOUTUBE),
+        ("https://vt.tiktok.com/id", ContentType.TIKTOK),
+        ("https://m.vk.com/wall1_1", ContentType.VK),
+        ("https://clips.twitch.tv/id", ContentType.TWITCH),
+        ("https://WWW.YouTube.com:443/watch?v=id", ContentType.YOUTUBE),
+        ("https://youtube.com.example.org/", None),
+        ("https://notyoutube.com/", None),
+        ("https://www.youtu.be/id", None),
+        ("not a url", None),
+        ("http://[::1", None),
+    ],
+)
+def test_get_content_type(url, type):
+    assert get_content_type(url) == type
+
+
+def test_exact_match_has_priority_over_wildcard():
+    classifier = DomainClassifier(
+        {"*.example.com": ContentType.VK, "www.example.com": ContentType.YOUTUBE}
+    )
+
+    assert classifier.match("www.example.com") == ContentType.YOUTUBE
+    assert classifier.match("m.example.com") == ContentType.VK
+    assert classifier.match("a.www.example.com") == ContentType.VK
+    assert classifier.match("example.com") is None
+
+
+def test_classify_many():
+    urls = ["https://vk.com/id", "https://example.com/", "https://vk.com/id"]
+
+    assert classify_many(urls) == [ContentType.VK, None, ContentType.VK]
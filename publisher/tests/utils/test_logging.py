@@ -0,0 +1,145 @@
+import json
+import logging
+import queue
+import sys
+
+from utils.logging import (
+    BLOCK,
+    DROP_OLDEST,
+    SAMPLE,
+    FastJSONLogFormatter,
+    JSONLogFormatter,
+    OverflowQueueHandler,
+    RoutingHandler,
+    dropped_records_counter,
+    start_logging_queue,
+    stop_logging_queue,
+)
+
+
+def _record(msg, level=logging.INFO, name="test", args=None, exc_info=None):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, exc_info)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_drop_oldest():
+    log_queue = queue.Queue(maxsize=2)
+    handler = OverflowQueueHandler(log_queue, policy=DROP_OLDEST)
+    dropped = dropped_records_counter.value(logger="test", policy=DROP_OLDEST)
+
+    for i in range(3):
+        handler.handle(_record(f"message {i}"))
+
+    assert [log_queue.get_nowait().msg for _ in range(2)] == [
+        "message 1",
+        "message 2",
+    ]
+    assert (
+        dropped_records_counter.value(logger="test", policy=DROP_OLDEST)
+        == dropped + 1
+    )
+
+
+def test_sample():
+    log_queue = queue.Queue(maxsize=4)
+    handler = OverflowQueueHandler(log_queue, policy=SAMPLE, sample_rate=2)
+
+    for i in range(6):
+        handler.handle(_record(f"message {i}"))
+    handler.handle(_record("error", level=logging.ERROR))
+
+    messages = [log_queue.get_nowait().msg for _ in range(log_queue.qsize())]
+    assert messages == ["message 0", "message 1", "message 2", "message 4"]
+
+
+def test_block():
+    log_queue = queue.Queue(maxsize=1)
+    handler = OverflowQueueHandler(log_queue, policy=BLOCK)
+
+    handler.handle(_record("message"))
+
+    assert log_queue.get_nowait().msg == "message"
+
+
+def test_prepare_keeps_exc_info():
+    handler = OverflowQueueHandler(queue.Queue(maxsize=1))
+    try:
+        raise ValueError("error")
+    except ValueError:
+        record = _record("message %s", args=("arg",), exc_info=sys.exc_info())
+
+    prepared = handler.prepare(record)
+
+    assert prepared.msg == "message arg"
+    assert prepared.args is None
+    assert prepared.exc_info is record.exc_info
+
+
+def test_routing():
+    info, errors = ListHandler(logging.INFO), ListHandler(logging.ERROR)
+    handler = RoutingHandler({"orm": [info, errors]})
+
+    handler.handle(_record("info", name="orm.pool"))
+    handler.handle(_record("error", level=logging.ERROR, name="orm"))
+    handler.handle(_record("other", name="grpc"))
+
+    assert [record.msg for record in info.records] == ["info", "error"]
+    assert [record.msg for record in errors.records] == ["error"]
+
+
+def test_start_logging_queue():
+    target = ListHandler()
+    logger = logging.getLogger("test-queue")
+    logger.addHandler(target)
+    logger.propagate = False
+
+    listener = start_logging_queue(["test-queue"], size=10)
+    try:
+        assert target not in logger.handlers
+        logger.warning("message")
+    finally:
+        stop_logging_queue(listener)
+        logger.handlers.clear()
+
+    assert [record.msg for record in target.records] == ["message"]
+
+
+class TestFastJSONLogFormatter:
+    def setup_method(self):
+        self.formatter = FastJSONLogFormatter()
+        self.formatter.sensitive_fields = frozenset({"password"})
+        self.record = _record("message %s", args=("arg",))
+        self.record.duration = 10
+
+    def test_same_fields_as_json_formatter(self):
+        expected = json.loads(JSONLogFormatter().format(self.record))
+
+        assert json.loads(self.formatter.format(self.record)) == expected
+
+    def test_exceptions(self):
+        try:
+            raise ValueError("error")
+        except ValueError:
+            self.record.exc_info = sys.exc_info()
+
+        log_object = json.loads(self.formatter.format(self.record))
+
+        assert "ValueError: error" in log_object["exceptions"][-1]
+
+    def test_sensitive_fields(self):
+        body = {"password": "secret", "login": "user"}
+        self.record.request_json_fields = {"request_body": body, "Password": "x"}
+
+        log_object = json.loads(self.formatter.format(self.record))
+
+        assert log_object["Password"] == "..."
+        assert log_object["request_body"] == {"password": "...", "login": "user"}
+        assert body["password"] == "secret"
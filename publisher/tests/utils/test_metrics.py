@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from utils.metrics import Counter, Metric, Registry, start_metrics_server
+
+
+async def _get(port: int, path: str) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+def test_metrics_server():
+    registry = Registry()
+    counter = Counter("test_requests_total", "Requests.", registry=registry)
+    counter.inc()
+
+    async def main():
+        server = await start_metrics_server("127.0.0.1", 0, registry=registry)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await _get(port, "/metrics"), await _get(port, "/")
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    metrics, not_found = asyncio.run(main())
+
+    assert metrics.startswith(b"HTTP/1.1 200 OK")
+    assert metrics.endswith(b"test_requests_total 1\n")
+    assert not_found.startswith(b"HTTP/1.1 404 Not Found")
+
+
+def test_registry_duplicate_name():
+    registry = Registry()
+    Counter("test_duplicate_total", "Requests.", registry=registry)
+
+    with pytest.raises(ValueError):
+        Counter("test_duplicate_total", "Requests.", registry=registry)
+
+    assert "test_duplicate_total" in registry.render()
+
+
+def test_metric_abstract():
+    with pytest.raises(TypeError):
+        Metric("test_untyped", "Untyped.", registry=Registry())
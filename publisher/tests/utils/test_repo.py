@@ -0,0 +1,39 @@
+import base64
+
+import pytest
+
+from utils.exceptions import Custom400Exception
+from utils.repo import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        (2, "2024-01-01T00:00:00+00:00", 1),
+        (0, "2024-01-01T00:00:00.123456+03:00", 2**31 - 1),
+        ("", None),
+    ],
+)
+def test_cursor_round_trip(values):
+    cursor = encode_cursor(*values)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, length=len(values)) == list(values)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "garbage!",
+        "%%%",
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        base64.urlsafe_b64encode(b"not json").decode(),
+        base64.urlsafe_b64encode(b'{"rank": 2}').decode(),
+        encode_cursor(2, "2024-01-01T00:00:00+00:00"),
+    ],
+)
+def test_cursor_invalid(cursor):
+    with pytest.raises(Custom400Exception) as error:
+        decode_cursor(cursor, length=3)
+
+    assert error.value.detail == "Invalid cursor."
@@ -0,0 +1,118 @@
+import logging
+from types import SimpleNamespace
+from unittest import mock
+
+from sqlalchemy.orm import Session
+
+from utils.tracing import (
+    NULL_SESSION_TRACE,
+    QueryTracer,
+    SessionTracer,
+    queries_per_call_histogram,
+    session_phase_histogram,
+    track_queries,
+)
+
+
+class TestSessionTracer:
+    def setup_method(self):
+        self.logger = logging.getLogger("test_session_tracer")
+        self.logger.setLevel(logging.INFO)
+        self.session = SimpleNamespace(sync_session=Session())
+
+    def test_disabled(self):
+        tracer = SessionTracer(self.logger, enabled=False)
+
+        assert tracer.start(self.session, "primary") is NULL_SESSION_TRACE
+
+    def test_enabled_by_debug_level(self):
+        self.logger.setLevel(logging.DEBUG)
+        tracer = SessionTracer(self.logger, enabled=False)
+
+        assert tracer.start(self.session, "primary") is not NULL_SESSION_TRACE
+
+    def test_phases(self):
+        tracer = SessionTracer(self.logger, enabled=True)
+        calls = session_phase_histogram.count(database="test_db", phase="commit")
+
+        trace = tracer.start(self.session, "test_db")
+        self.session.sync_session.dispatch.after_begin(
+            self.session.sync_session, None, None
+        )
+        for phase in ("work", "commit", "close"):
+            trace.mark(phase)
+        trace.finish()
+
+        assert list(trace.phases) == ["acquire", "work", "commit", "close"]
+        assert all(duration >= 0 for duration in trace.phases.values())
+        assert (
+            session_phase_histogram.count(database="test_db", phase="commit")
+            == calls + 1
+        )
+
+    def test_debug_log(self, caplog):
+        self.logger.setLevel(logging.DEBUG)
+        tracer = SessionTracer(self.logger, enabled=False)
+
+        trace = tracer.start(self.session, "replica-0")
+        trace.mark("work")
+        with caplog.at_level(logging.DEBUG, logger=self.logger.name):
+            trace.finish()
+
+        assert "Session on replica-0 finished - work" in caplog.text
+
+    def test_no_log_without_debug(self, caplog):
+        tracer = SessionTracer(self.logger, enabled=True)
+
+        trace = tracer.start(self.session, "primary")
+        trace.mark("work")
+        with caplog.at_level(logging.INFO, logger=self.logger.name):
+            trace.finish()
+
+        assert caplog.text == ""
+
+
+class TestQueryTracer:
+    def setup_method(self):
+        self.logger = mock.Mock(spec=logging.Logger)
+        self.tracer = QueryTracer(self.logger, slow_query_threshold=10)
+        self.conn = SimpleNamespace(info={})
+
+    def _execute(self, statement="SELECT 1", parameters=(1,), executemany=False):
+        args = (self.conn, None, statement, parameters, None, executemany)
+        self.tracer._before(*args)
+        self.tracer._after("primary", *args)
+
+    def test_track_queries(self):
+        calls = queries_per_call_histogram.count(rpc="test_rpc")
+
+        with track_queries("test_rpc") as stats:
+            self._execute()
+            self._execute()
+        self._execute()
+
+        assert stats.statements == 2
+        assert stats.duration > 0
+        assert queries_per_call_histogram.count(rpc="test_rpc") == calls + 1
+        self.logger.warning.assert_not_called()
+
+    def test_slow_query(self):
+        self.tracer.slow_query_threshold = 0
+
+        with track_queries("test_rpc"):
+            self._execute(parameters=(1, "url"))
+
+        props = self.logger.warning.call_args.kwargs["extra"]["props"]
+        assert props["rpc"] == "test_rpc"
+        assert props["database"] == "primary"
+        assert props["statement"] == "SELECT 1"
+        assert props["parameters"] == (1, "url")
+
+    def test_slow_query_executemany(self):
+        self.tracer.slow_query_threshold = 0
+
+        self._execute(parameters=[(1,), (2,)], executemany=True)
+
+        props = self.logger.warning.call_args.kwargs["extra"]["props"]
+        assert props["rpc"] is None
+        assert props["parameters"] == "2 parameter sets"
@@ -0,0 +1,113 @@
+import logging
+import pickle
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Generic, List, Sequence, Tuple, TypeVar
+
+from redis import RedisError
+from redis.asyncio import Redis
+
+
+T = TypeVar("T")
+
+logger = logging.getLogger("grpc")
+
+
+class CachedValue(Generic[T]):
+    """Single value kept in process memory for `ttl` seconds"""
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._value: T | None = None
+        self._expires_at = 0.0
+
+    def get(self) -> T | None:
+        if time.monotonic() >= self._expires_at:
+            return None
+        return self._value
+
+    def set(self, value: T) -> None:
+        self._value = value
+        self._expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self) -> None:
+        self._value = None
+        self._expires_at = 0.0
+
+
+class ICache(ABC):
+    @abstractmethod
+    async def get_many(self, keys: Sequence[str]) -> List[Any | None]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCache(ICache):
+    """
+    Кеш в памяти процесса: не больше `max_size` значений, при
+    переполнении вытесняются давно не читавшиеся. Общий только
+    для запросов одного процесса.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+
+    async def get_many(self, keys: Sequence[str]) -> List[Any | None]:
+        now = time.monotonic()
+        return [self._get(key, now) for key in keys]
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _get(self, key: str, now: float) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+
+class RedisCache(ICache):
+    """
+    Кеш в Redis, общий для всех процессов сервиса.
+
+    Значения сериализуются pickle, поэтому Redis должен быть доступен
+    только сервису. Если Redis недоступен, чтение возвращает промахи,
+    а запись пропускается.
+    """
+
+    def __init__(self, url: str, prefix: str = "publisher:") -> None:
+        self.prefix = prefix
+        self._client = Redis.from_url(url)
+
+    async def get_many(self, keys: Sequence[str]) -> List[Any | None]:
+        try:
+            values = await self._client.mget([self.prefix + key for key in keys])
+        except RedisError as e:
+            logger.warning(f"Cache is unavailable - {str(e)}")
+            return [None] * len(keys)
+        return [None if value is None else pickle.loads(value) for value in values]
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            await self._client.set(
+                self.prefix + key, pickle.dumps(value), px=max(int(ttl * 1000), 1)
+            )
+        except RedisError as e:
+            logger.warning(f"Cache is unavailable - {str(e)}")
+
+    async def close(self) -> None:
+        await self._client.close()
@@ -0,0 +1,116 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict
+from urllib.parse import SplitResult, parse_qs, parse_qsl, urlencode, urlsplit
+
+from services.entries import ContentType
+
+
+YOUTUBE_ID = re.compile(r"[A-Za-z0-9_-]{11}")
+YOUTUBE_PATH = re.compile(r"/(?:shorts|embed|live|v)/([A-Za-z0-9_-]{11})(?:[/?]|$)")
+TIKTOK_PATH = re.compile(r"/(?:@[^/]+/)?(?:video|photo)/(\d+)")
+VK_ID = re.compile(r"(video|clip|wall|photo)(-?\d+_\d+)")
+TWITCH_CLIP_PATH = re.compile(r"/(?:[^/]+/clip/)?([A-Za-z0-9_-]+)")
+TWITCH_VIDEO_PATH = re.compile(r"/videos/(\d+)")
+TWITCH_CHANNEL_PATH = re.compile(r"/([A-Za-z0-9_]+)/?$")
+TRACKING_PARAMS = re.compile(r"utm_.*|fbclid|gclid|yclid|si")
+
+
+@dataclass
+class CanonicalUrl:
+    id: str
+    url: str
+
+
+def canonicalize(url: str, type: ContentType) -> CanonicalUrl:
+    """
+    Приведение ссылки к каноническому виду.
+
+    `id` - идентификатор контента на платформе, одинаковый для всех
+    вариантов ссылки на него (короткие ссылки, мобильные домены,
+    метки времени и трекинговые параметры). Если идентификатор
+    не удалось извлечь, используется ссылка без трекинговых параметров:
+    остальные параметры могут идентифицировать контент (`?list=...`).
+    """
+    parsed = urlsplit(url)
+    return _CANONICALIZERS[type](parsed) or _default(parsed)
+
+
+def _youtube(parsed: SplitResult) -> CanonicalUrl | None:
+    host = parsed.hostname or ""
+    if host == "youtu.be":
+        id = parsed.path.strip("/").split("/")[0]
+    elif parsed.path == "/watch":
+        id = parse_qs(parsed.query).get("v", [""])[0]
+    else:
+        match = YOUTUBE_PATH.match(parsed.path)
+        id = match.group(1) if match else ""
+    if not YOUTUBE_ID.fullmatch(id):
+        return None
+    return CanonicalUrl(id=id, url=f"https://www.youtube.com/watch?v={id}")
+
+
+def _tiktok(parsed: SplitResult) -> CanonicalUrl | None:
+    match = TIKTOK_PATH.match(parsed.path)
+    if match is None:
+        return None
+    # У TikTok нет ссылки на видео без автора, поэтому сохраняется
+    # исходная ссылка без параметров: в них только данные о репосте
+    return CanonicalUrl(
+        id=match.group(1), url=f"https://{parsed.hostname}{parsed.path}"
+    )
+
+
+def _vk(parsed: SplitResult) -> CanonicalUrl | None:
+    # Открытые поверх ленты записи и видео передаются в параметрах z и w
+    query = parse_qs(parsed.query)
+    for value in (*query.get("z", ()), *query.get("w", ()), parsed.path):
+        match = VK_ID.search(value)
+        if match is not None:
+            id = match.group(0)
+            return CanonicalUrl(id=id, url=f"https://vk.com/{id}")
+    return None
+
+
+def _twitch(parsed: SplitResult) -> CanonicalUrl | None:
+    host = parsed.hostname or ""
+    if host == "clips.twitch.tv" or "/clip/" in parsed.path:
+        match = TWITCH_CLIP_PATH.match(parsed.path)
+        if match is None:
+            return None
+        slug = match.group(1)
+        return CanonicalUrl(id=f"clip/{slug}", url=f"https://clips.twitch.tv/{slug}")
+    match = TWITCH_VIDEO_PATH.match(parsed.path)
+    if match is not None:
+        id = match.group(1)
+        return CanonicalUrl(id=f"video/{id}", url=f"https://www.twitch.tv/videos/{id}")
+    match = TWITCH_CHANNEL_PATH.match(parsed.path)
+    if match is not None:
+        channel = match.group(1).lower()
+        return CanonicalUrl(
+            id=f"channel/{channel}", url=f"https://www.twitch.tv/{channel}"
+        )
+    return None
+
+
+def _default(parsed: SplitResult) -> CanonicalUrl:
+    host = (parsed.hostname or "").removeprefix("www.").removeprefix("m.")
+    path = parsed.path.rstrip("/")
+    query = urlencode(
+        sorted(
+            (name, value)
+            for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if not TRACKING_PARAMS.fullmatch(name)
+        )
+    )
+    if query:
+        path = f"{path}?{query}"
+    return CanonicalUrl(id=f"{host}{path}", url=f"https://{host}{path}")
+
+
+_CANONICALIZERS: Dict[ContentType, Callable[[SplitResult], CanonicalUrl | None]] = {
+    ContentType.YOUTUBE: _youtube,
+    ContentType.TIKTOK: _tiktok,
+    ContentType.VK: _vk,
+    ContentType.TWITCH: _twitch,
+}
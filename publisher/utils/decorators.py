@@ -1,26 +1,55 @@
+import inspect
 import logging
 from typing import ClassVar, Dict, Protocol, Any
 
 from sqlalchemy.exc import SQLAlchemyError
 
 from utils.exceptions import CustomException, Custom400Exception
+from utils.tracing import track_queries
 
 
 orm_logger = logging.getLogger("orm")
 grpc_logger = logging.getLogger("grpc")
 
 
+def is_async_generator(func) -> bool:
+    """Является ли `func` или обернутая ей функция асинхронным генератором"""
+    return inspect.isasyncgenfunction(inspect.unwrap(func))
+
+
 def handle_grpc_request_error(return_class):
+    """
+    Ответ с `detail` вместо исключения `CustomException`.
+
+    Для потоковых обработчиков ответ с `detail` становится последним
+    сообщением потока.
+    """
+
+    def log(e: CustomException, args, kwargs) -> None:
+        grpc_logger.info(
+            f"Custom exception has occured - {str(e)}",
+            extra={"func_args": args, "func_kwargs": kwargs},
+            exc_info=e,
+        )
+
     def outer(func):
+        if is_async_generator(func):
+
+            async def stream(*args, **kwargs):
+                try:
+                    async for response in func(*args, **kwargs):
+                        yield response
+                except CustomException as e:
+                    log(e, args, kwargs)
+                    yield return_class(detail=e.detail)
+
+            return stream
+
         async def inner(*args, **kwargs):
             try:
                 return await func(*args, **kwargs)
             except CustomException as e:
-                grpc_logger.info(
-                    f"Custom exception has occured - {str(e)}",
-                    extra={"func_args": args, "func_kwargs": kwargs},
-                    exc_info=e,
-                )
+                log(e, args, kwargs)
                 return return_class(detail=e.detail)
 
         return inner
@@ -44,22 +73,42 @@ def handle_grpc_response_error(func):
             raise Custom400Exception(detail=response.detail)
         return response
 
+    if is_async_generator(func):
+
+        async def stream(*args, **kwargs):
+            async for response in func(*args, **kwargs):
+                if getattr(response, "detail", None):
+                    raise Custom400Exception(detail=response.detail)
+                yield response
+
+        return stream
     return wrapper
 
 
 def handle_orm_error(func):
+    def log(e: SQLAlchemyError, args, kwargs) -> None:
+        orm_logger.error(
+            f"Error while processing orm query - {str(e)}",
+            extra={"func_args": args, "func_kwargs": kwargs},
+            exc_info=e,
+        )
+
     async def wrapper(*args, **kwargs):
         try:
             return await func(*args, **kwargs)
         except SQLAlchemyError as e:
-            orm_logger.error(
-                f"Error while processing orm query - {str(e)}",
-                extra={"func_args": args, "func_kwargs": kwargs},
-                exc_info=e,
-            )
+            log(e, args, kwargs)
             raise
 
-    return wrapper
+    async def stream(*args, **kwargs):
+        try:
+            async for item in func(*args, **kwargs):
+                yield item
+        except SQLAlchemyError as e:
+            log(e, args, kwargs)
+            raise
+
+    return stream if is_async_generator(func) else wrapper
 
 
 class Dataclass(Protocol):
@@ -94,12 +143,44 @@ def row_to_model(wrapper_dataclass: Dataclass | None = None):
     return outer
 
 
-def inject_session(func):
-    async def wrapper(*args, **kwargs):
-        from config.di import Container
+def inject_session(func=None, *, readonly: bool = False):
+    """
+    Передача сессии БД в аргумент `session`.
+
+    С `readonly=True` сессия не открывает транзакцию и не делает COMMIT,
+    подходит только для обработчиков, которые ничего не пишут, и может
+    быть направлена на реплику. `user_id` запроса используется для
+    read-your-writes: после записи пользователь читает с основной БД.
+    Запросы к БД внутри обработчика засчитываются RPC с его именем.
+    Для потоковых обработчиков сессия открыта, пока отдается поток.
+    Применяется как `@inject_session` и как `@inject_session(readonly=True)`.
+    """
 
-        async with Container.db().session() as session:
-            kwargs["session"] = session
-            return await func(*args, **kwargs)
+    def outer(func):
+        from config.di import Container
 
-    return wrapper
+        db = Container.db
+        rpc = func.__name__
+
+        async def wrapper(*args, **kwargs):
+            request = args[1] if len(args) > 1 else None
+            key = getattr(request, "user_id", None) or None
+            with track_queries(rpc):
+                async with db().session(readonly=readonly, key=key) as session:
+                    kwargs["session"] = session
+                    return await func(*args, **kwargs)
+
+        async def stream(*args, **kwargs):
+            request = args[1] if len(args) > 1 else None
+            key = getattr(request, "user_id", None) or None
+            with track_queries(rpc):
+                async with db().session(readonly=readonly, key=key) as session:
+                    kwargs["session"] = session
+                    async for response in func(*args, **kwargs):
+                        yield response
+
+        return stream if is_async_generator(func) else wrapper
+
+    if func is not None:
+        return outer(func)
+    return outer
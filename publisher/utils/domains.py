@@ -1,20 +1,88 @@
-from urllib.parse import urlparse
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping
+from urllib.parse import urlsplit
 
 from services.entries import ContentType
 
 
+DOMAINS = {
+    "youtube.com": ContentType.YOUTUBE,
+    "*.youtube.com": ContentType.YOUTUBE,
+    "youtu.be": ContentType.YOUTUBE,
+    "tiktok.com": ContentType.TIKTOK,
+    "*.tiktok.com": ContentType.TIKTOK,
+    "vk.com": ContentType.VK,
+    "*.vk.com": ContentType.VK,
+    "twitch.tv": ContentType.TWITCH,
+    "*.twitch.tv": ContentType.TWITCH,
+}
+CACHE_SIZE = 4096
+
+_VALUE = object()
+_WILDCARD = "*"
+
+
+class DomainClassifier:
+    """
+    Определение платформы по домену.
+
+    Домены хранятся в префиксном дереве по меткам в обратном порядке
+    (`com -> youtube -> www`), поэтому поиск занимает столько шагов,
+    сколько меток в домене. `*.youtube.com` совпадает с любым
+    поддоменом `youtube.com`, но не с ним самим; точное совпадение
+    приоритетнее шаблона, более длинный шаблон приоритетнее короткого.
+    """
+
+    def __init__(self, domains: Mapping[str, ContentType]) -> None:
+        self._root: dict = {}
+        for pattern, type in domains.items():
+            self.add(pattern, type)
+
+    def add(self, pattern: str, type: ContentType) -> None:
+        node = self._root
+        for label in reversed(pattern.lower().split(".")):
+            node = node.setdefault(label, {})
+        node[_VALUE] = type
+
+    def match(self, host: str) -> ContentType | None:
+        node = self._root
+        result = None
+        for label in reversed(host.split(".")):
+            wildcard = node.get(_WILDCARD)
+            if wildcard is not None:
+                result = wildcard.get(_VALUE, result)
+            node = node.get(label)
+            if node is None:
+                return result
+        return node.get(_VALUE, result)
+
+    def classify(self, url: str) -> ContentType | None:
+        try:
+            host = urlsplit(url).hostname
+        except ValueError:
+            return None
+        if not host:
+            return None
+        return self.match(host.rstrip("."))
+
+
+classifier = DomainClassifier(DOMAINS)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
 def get_content_type(url: str) -> ContentType | None:
-    domain_map = {
-        "www.youtube.com": ContentType.YOUTUBE,
-        "youtu.be": ContentType.YOUTUBE,
-        "tiktok.com": ContentType.TIKTOK,
-        "www.tiktok.com": ContentType.TIKTOK,
-        "vt.tiktok.com": ContentType.TIKTOK,
-        "vk.com": ContentType.VK,
-        "www.vk.com": ContentType.VK,
-        "twitch.tv": ContentType.TWITCH,
-        "www.twitch.tv": ContentType.TWITCH,
-        "clips.twitch.tv": ContentType.TWITCH,
-    }
-    parsed_url = urlparse(url)
-    return domain_map.get(parsed_url.netloc, None)
+    return classifier.classify(url)
+
+
+def classify_many(urls: Iterable[str]) -> List[ContentType | None]:
+    """
+    Определение платформ для пачки ссылок. Повторы внутри пачки
+    разбираются один раз, общий LRU-кеш при этом не вытесняется.
+    """
+    seen: Dict[str, ContentType | None] = {}
+    result = []
+    for url in urls:
+        if url not in seen:
+            seen[url] = classifier.classify(url)
+        result.append(seen[url])
+    return result
@@ -1,20 +1,40 @@
 """Implementation from https://habr.com/ru/articles/575454/"""
 
+import copy
 import datetime
 import json
 import logging
+import queue
 import traceback
 import os
+from itertools import count
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Union, Dict
+from typing import Iterable, List, Union, Dict
 
 from pydantic import BaseModel, Field
 
 from config import settings
+from utils.metrics import Counter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 
 EMPTY_VALUE = ""
 
+DROP_OLDEST = "drop-oldest"
+SAMPLE = "sample"
+BLOCK = "block"
+
+dropped_records_counter = Counter(
+    "logging_dropped_records_total",
+    "Log records dropped because the logging queue was full.",
+    ["logger", "policy"],
+)
+
 
 class BaseJsonLogSchema(BaseModel):
     """
@@ -153,6 +173,80 @@ class JSONLogFormatter(logging.Formatter):
         return _filter_dict(data)
 
 
+class FastJSONLogFormatter(JSONLogFormatter):
+    """
+    Форматер логов в формате json без pydantic-схемы на каждую запись.
+
+    Выдает те же поля, что и `JSONLogFormatter`, но собирает словарь
+    напрямую, проверяет чувствительные ключи по заранее построенному
+    множеству и копирует только вложенные словари. Если установлен
+    orjson, сериализация выполняется им.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.sensitive_fields = (
+            frozenset(field.lower() for field in settings.LOGGING_SENSITIVE_FIELDS)
+            if not settings.DEBUG
+            else frozenset()
+        )
+        self._second = None
+        self._timestamp = EMPTY_VALUE
+
+    def format(self, record: logging.LogRecord, *args, **kwargs) -> str:
+        log_object = {
+            "thread": record.process,
+            "level": record.levelno,
+            "level_name": record.levelname,
+            "message": record.getMessage(),
+            "source": record.name,
+            "@timestamp": self._format_timestamp(record.created),
+            "app_name": "APP",
+            "app_version": "APP_VERSION",
+            "app_env": "ENVIRONMENT",
+            "duration": int(getattr(record, "duration", record.msecs)),
+        }
+        if record.exc_info:
+            log_object["exceptions"] = traceback.format_exception(*record.exc_info)
+        elif record.exc_text:
+            log_object["exceptions"] = record.exc_text
+
+        props = getattr(record, "props", None)
+        if props is not None:
+            log_object["props"] = props
+        request_json_fields = getattr(record, "request_json_fields", None)
+        if request_json_fields:
+            log_object.update(request_json_fields)
+
+        if self.sensitive_fields:
+            self._mask_sensitive_fields(log_object)
+        return self._dumps(log_object)
+
+    def _format_timestamp(self, created: float) -> str:
+        # Метка времени с точностью до секунды, одна на все записи секунды
+        second = int(created)
+        if second != self._second:
+            self._timestamp = (
+                datetime.datetime.fromtimestamp(second).astimezone().isoformat()
+            )
+            self._second = second
+        return self._timestamp
+
+    def _mask_sensitive_fields(self, data: Dict) -> None:
+        for key, value in data.items():
+            if key.lower() in self.sensitive_fields:
+                data[key] = "..."
+            elif isinstance(value, dict):
+                data[key] = value = dict(value)
+                self._mask_sensitive_fields(value)
+
+    @staticmethod
+    def _dumps(log_object: Dict) -> str:
+        if orjson is not None:
+            return orjson.dumps(log_object, default=str).decode()
+        return json.dumps(log_object, ensure_ascii=False, default=str)
+
+
 def get_config(log_path: str) -> Dict:
     default_hanlder_settings = {
         "class": "logging.handlers.RotatingFileHandler",
@@ -214,9 +308,144 @@ def get_config(log_path: str) -> Dict:
         "disable_existing_loggers": False,
         "formatters": {
             "json": {
-                "()": "utils.logging.JSONLogFormatter",
+                "()": "utils.logging.FastJSONLogFormatter",
             },
         },
         "handlers": handlers,
         "loggers": loggers,
     }
+
+
+class OverflowQueueHandler(QueueHandler):
+    """
+    Передача записей в ограниченную очередь, которую разбирает
+    `QueueListener` в отдельном потоке.
+
+    Поведение при переполнении очереди:
+    - `drop-oldest` - вытесняется самая старая запись;
+    - `sample` - при заполнении очереди больше чем наполовину проходит
+      только каждая `sample_rate` запись ниже ERROR, при полной очереди
+      новая запись отбрасывается;
+    - `block` - логгер ждет освобождения места в очереди.
+    """
+
+    def __init__(
+        self, queue: queue.Queue, policy: str = DROP_OLDEST, sample_rate: int = 10
+    ) -> None:
+        assert policy in (DROP_OLDEST, SAMPLE, BLOCK), f"Unknown policy {policy}."
+        super().__init__(queue)
+        self.policy = policy
+        self.sample_rate = sample_rate
+        self._sampled = count()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Сообщение собирается сразу: аргументы могут измениться, пока запись
+        # ждет в очереди. exc_info сохраняется для JSONLogFormatter.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.policy == BLOCK:
+            self.queue.put(record)
+            return
+        if self.policy == SAMPLE and not self._should_sample(record):
+            self._drop(record)
+            return
+
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                if self.policy == SAMPLE:
+                    self._drop(record)
+                    return
+            try:
+                self._drop(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+    def _should_sample(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+        if self.queue.qsize() * 2 < self.queue.maxsize:
+            return True
+        return next(self._sampled) % self.sample_rate == 0
+
+    def _drop(self, record: logging.LogRecord) -> None:
+        dropped_records_counter.inc(logger=record.name, policy=self.policy)
+
+
+class RoutingHandler(logging.Handler):
+    """
+    Передача записей из очереди файловым обработчикам их логгера.
+    Записи дочерних логгеров (`orm.pool`) идут обработчикам родителя.
+    """
+
+    def __init__(self, routes: Dict[str, List[logging.Handler]]) -> None:
+        super().__init__()
+        self.routes = routes
+        self._resolved: Dict[str, List[logging.Handler]] = {}
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        for handler in self._route(record.name):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.handle(record)
+
+    def close(self) -> None:
+        for handlers in self.routes.values():
+            for handler in handlers:
+                handler.close()
+        super().close()
+
+    def _route(self, name: str) -> List[logging.Handler]:
+        handlers = self._resolved.get(name)
+        if handlers is None:
+            parent = name
+            while parent not in self.routes and "." in parent:
+                parent = parent.rsplit(".", 1)[0]
+            handlers = self._resolved[name] = self.routes.get(parent, [])
+        return handlers
+
+
+def start_logging_queue(
+    logger_names: Iterable[str],
+    size: int = settings.LOGGING_QUEUE_SIZE,
+    policy: str = settings.LOGGING_QUEUE_OVERFLOW,
+    sample_rate: int = settings.LOGGING_QUEUE_SAMPLE_RATE,
+) -> QueueListener:
+    """
+    Перенос обработчиков логгеров в фоновый поток.
+
+    Обработчики, настроенные через `get_config`, снимаются с логгеров
+    и вызываются из `QueueListener`, а логгеры получают общий
+    `OverflowQueueHandler`, поэтому запись в лог не выполняет
+    файловый ввод-вывод в потоке event loop.
+    """
+    log_queue = queue.Queue(maxsize=size)
+    queue_handler = OverflowQueueHandler(log_queue, policy, sample_rate)
+    routes = {}
+    for name in logger_names:
+        logger = logging.getLogger(name)
+        routes[name] = list(logger.handlers)
+        for handler in routes[name]:
+            logger.removeHandler(handler)
+        logger.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, RoutingHandler(routes))
+    listener.start()
+    return listener
+
+
+def stop_logging_queue(listener: QueueListener) -> None:
+    """Запись оставшихся в очереди записей и закрытие файлов"""
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
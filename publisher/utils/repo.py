@@ -1,7 +1,13 @@
+import base64
+import binascii
+import json
 from abc import ABC
-from typing import Callable
+from typing import Any, Callable, List
 from dataclasses import fields
 
+from config.i18n import _
+from utils.exceptions import Custom400Exception
+
 
 class IRepo(ABC):
     pass
@@ -12,3 +18,28 @@ def pagination_transformer(schema: Callable) -> Callable:
         schema(**{field.name: getattr(item, field.name) for field in fields(schema)})
         for item in query
     )
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Упаковка значений ключа сортировки последней записи страницы
+    в непрозрачную строку курсора.
+    """
+    payload = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> List[Any]:
+    """
+    Распаковка курсора, созданного `encode_cursor`.
+
+    Любой поврежденный или чужой курсор приводит к ошибке запроса.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise Custom400Exception(_("Invalid cursor."))
+    if not isinstance(values, list) or len(values) != length:
+        raise Custom400Exception(_("Invalid cursor."))
+    return values
@@ -1,7 +1,12 @@
-from typing import Dict
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
 from types import SimpleNamespace
 
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+T = TypeVar("T")
 
 
 class SchemaTestMixin:
@@ -32,3 +37,16 @@ class ServiceTestMixin:
 
 class RepoTestMixin:
     repo = None
+    # Пул соединений asyncpg привязан к event loop, поэтому все тесты
+    # репозиториев выполняются в одном
+    loop = asyncio.new_event_loop()
+
+    def run(self, func: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """Выполнение `func(session)` в сессии тестовой БД с фиксацией"""
+        from config.di import get_di_test_container
+
+        async def run() -> T:
+            async with get_di_test_container().db().session() as session:
+                return await func(session)
+
+        return self.loop.run_until_complete(run())
@@ -0,0 +1,185 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from utils.metrics import Histogram
+
+
+session_phase_histogram = Histogram(
+    "db_session_phase_seconds",
+    "Time spent in each phase of a database session.",
+    ["database", "phase"],
+)
+queries_per_call_histogram = Histogram(
+    "db_queries_per_call",
+    "SQL statements executed while handling one RPC.",
+    ["rpc"],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+query_time_per_call_histogram = Histogram(
+    "db_query_seconds_per_call",
+    "Time spent executing SQL statements while handling one RPC.",
+    ["rpc"],
+)
+
+
+class SessionTrace:
+    """Длительности фаз одной сессии: acquire, work, commit/rollback, close"""
+
+    __slots__ = ("tracer", "database", "phases", "_mark")
+
+    def __init__(self, tracer: "SessionTracer", database: str) -> None:
+        self.tracer = tracer
+        self.database = database
+        self.phases: Dict[str, float] = {}
+        self._mark = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases[phase] = now - self._mark
+        self._mark = now
+
+    def finish(self) -> None:
+        self.tracer.record(self)
+
+
+class _NullSessionTrace:
+    __slots__ = ()
+
+    def mark(self, phase: str) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+NULL_SESSION_TRACE = _NullSessionTrace()
+
+
+class SessionTracer:
+    """
+    Трассировка жизненного цикла сессий.
+
+    Включается явно или уровнем DEBUG у логгера, в выключенном
+    состоянии возвращает пустую трассу без каких-либо затрат.
+    """
+
+    def __init__(self, logger: logging.Logger, enabled: bool) -> None:
+        self.logger = logger
+        self._enabled = enabled
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled or self.logger.isEnabledFor(logging.DEBUG)
+
+    def start(
+        self, session: AsyncSession, database: str
+    ) -> SessionTrace | _NullSessionTrace:
+        if not self.enabled:
+            return NULL_SESSION_TRACE
+        trace = SessionTrace(self, database)
+        event.listen(
+            session.sync_session,
+            "after_begin",
+            lambda *args: trace.mark("acquire"),
+            once=True,
+        )
+        return trace
+
+    def record(self, trace: SessionTrace) -> None:
+        for phase, duration in trace.phases.items():
+            session_phase_histogram.observe(
+                duration, database=trace.database, phase=phase
+            )
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Session on %s finished - %s",
+                trace.database,
+                ", ".join(
+                    f"{phase} {duration * 1000:.2f} ms"
+                    for phase, duration in trace.phases.items()
+                ),
+            )
+
+
+class QueryStats:
+    """Количество и суммарное время запросов к БД в рамках одного RPC"""
+
+    __slots__ = ("rpc", "statements", "duration")
+
+    def __init__(self, rpc: str) -> None:
+        self.rpc = rpc
+        self.statements = 0
+        self.duration = 0.0
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries(rpc: str) -> Iterator[QueryStats]:
+    """Учет запросов, выполненных внутри блока, за RPC `rpc`"""
+    stats = QueryStats(rpc)
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+        queries_per_call_histogram.observe(stats.statements, rpc=rpc)
+        query_time_per_call_histogram.observe(stats.duration, rpc=rpc)
+
+
+class QueryTracer:
+    """
+    Учет запросов через события движка.
+
+    Запросы засчитываются RPC из `track_queries`, запросы дольше
+    `slow_query_threshold` секунд пишутся в лог с текстом и параметрами.
+    """
+
+    def __init__(self, logger: logging.Logger, slow_query_threshold: float) -> None:
+        self.logger = logger
+        self.slow_query_threshold = slow_query_threshold
+
+    def instrument(self, engine: AsyncEngine, database: str) -> None:
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before)
+        event.listen(
+            engine.sync_engine,
+            "after_cursor_execute",
+            lambda *args: self._after(database, *args),
+        )
+
+    @staticmethod
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info["query_start"] = time.perf_counter()
+
+    def _after(
+        self, database, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        duration = time.perf_counter() - conn.info.pop("query_start")
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.duration += duration
+        if duration >= self.slow_query_threshold:
+            self.logger.warning(
+                f"Slow query - {duration * 1000:.2f} ms",
+                extra={
+                    "props": {
+                        "rpc": stats.rpc if stats is not None else None,
+                        "database": database,
+                        "duration": duration,
+                        "statement": statement,
+                        "parameters": (
+                            f"{len(parameters)} parameter sets"
+                            if executemany
+                            else parameters
+                        ),
+                    }
+                },
+            )
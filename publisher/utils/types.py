@@ -13,6 +13,7 @@ class PublicationType:
     user_id: int
     url: str
     type: ContentType
+    canonical_id: str | None
     believed_count: int
     disbelieved_count: int
     created_at: datetime